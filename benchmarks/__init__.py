@@ -0,0 +1,10 @@
+"""
+benchmarks — Timing suite for the CV generators.
+
+    synthetic.py  seeded generator for synthetic content bundles
+    run.py        times generate.py / layout.py / header.py on them,
+                  writes build/bench/results.json and compares against
+                  a saved baseline
+
+Run from the repo root:  python3 benchmarks/run.py --help
+"""
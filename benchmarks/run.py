@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+run.py — Time the CV generators on synthetic content and catch regressions.
+
+Times, for each bundle size in synthetic.SIZES:
+    generate.py  escape_latex, expand_acronyms, every gen_designed_* and
+                 ats_* generator
+    layout.py    find_split_boundaries, generate_layout_canvas (greedy and
+                 optimal breaker)
+    breaker.py   break_column on one box per job entry
+    header.py    render_name (5-row and 4-row fonts), generate_header_name_tex
+    font.py      measure, render_many over a batch of 1,000 names
+
+Each case is timed with timeit (GC disabled, loop count auto-ranged), and
+the best of --repeat runs is reported as seconds per call. A run leaves
+the build state alone: layout.py's split files and canvas and
+lib/params.py's params.tex and snapshot go to a temporary directory, never
+generated/ or build/cache/, and tracing is off (CV_TRACE=0), so nothing is
+appended to build/trace.json and no span is timed along with the code.
+
+Results go to build/bench/results.json. --save-baseline also copies them to
+the baseline file; --compare checks the run against it and exits 1 if any
+case is slower than the baseline by more than --threshold. Baselines are
+machine-specific, so keep them out of the repo (or pin one per CI runner).
+
+Usage:
+    python3 benchmarks/run.py [--sizes small,medium,large] [--repeat 5]
+                              [--seed 1] [--output PATH]
+                              [--save-baseline] [--compare]
+                              [--baseline PATH] [--threshold 0.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import os
+import time
+import timeit
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+# Before lib.trace is imported: benchmarks must not append to the build trace
+os.environ["CV_TRACE"] = "0"
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import generate  # noqa: E402
+import header  # noqa: E402
+import layout  # noqa: E402
+from font import measure, render_many  # noqa: E402
+from lib.config import BUILD_DIR, compute_grid, die  # noqa: E402
+from lib.breaker import break_column  # noqa: E402
+from lib import params as lib_params  # noqa: E402
+from lib.params import load_params  # noqa: E402
+from synthetic import SIZES, all_bullets, make_bundle  # noqa: E402
+
+RESULTS_PATH = BUILD_DIR / "bench" / "results.json"
+BASELINE_PATH = BUILD_DIR / "bench" / "baseline.json"
+
+# Same section set as the shipped content/layout.yaml, plus the optional
+# full-width sections so a band below the columns is exercised too.
+LAYOUT_SECTIONS = [
+    {"title": "SUMMARY", "content": "summary.tex", "column": "left"},
+    {"title": "RESEARCH EXPERIENCE", "content": "research_experience.tex", "column": "left"},
+    {"title": "WORK EXPERIENCE", "content": "work_experience.tex", "column": "left"},
+    {"title": "TECHNICAL SKILLS", "content": "skills.tex", "column": "right"},
+    {"title": "EDUCATION", "content": "education.tex", "column": "right"},
+    {"title": "PUBLICATIONS", "content": "publications.tex", "column": "full"},
+    {"title": "CERTIFICATIONS", "content": "certifications.tex", "column": "full"},
+]
+
+
+# ---------------------------------------------------------------------------
+# Case construction
+# ---------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def _sandbox(root: Path) -> Iterator[None]:
+    """Point the output paths of layout.py and lib/params.py at *root*."""
+    patches = {
+        layout: {
+            "ROOT": root,
+            "GENERATED_DIR": root / "generated",
+            "CANVAS_TEX_PATH": root / "generated" / "canvas.tex",
+            "REUSE_PASS1_PATH": root / "build" / "reuse-pass1",
+            "LAYOUT_PLAN_PATH": root / "build" / "layout-plan.json",
+        },
+        lib_params: {
+            "PARAMS_TEX_PATH": root / "generated" / "params.tex",
+            "PARAMS_CACHE_DIR": root / "build" / "cache" / "params",
+            "_snapshot": None,
+        },
+    }
+    saved = {
+        module: {name: getattr(module, name) for name in names}
+        for module, names in patches.items()
+    }
+    for module, values in patches.items():
+        for name, value in values.items():
+            setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for module, values in saved.items():
+            for name, value in values.items():
+                setattr(module, name, value)
+
+
+def _estimate_rows(tex: str) -> int:
+    """Rough content height in grid rows: one row per ~60 chars of text."""
+    return sum(1 + len(line) // 60 for line in tex.splitlines() if line.strip())
+
+
+def _drain(gen: Iterator[str]) -> str:
+    return "".join(gen)
+
+
+def build_cases(bundle: dict, sandbox: Path) -> dict[str, Callable[[], object]]:
+    """Return {case name: zero-argument callable} for one bundle."""
+    acronyms = bundle["acronyms"]["acronyms"]
+    bullets = all_bullets(bundle)
+    work = bundle["work_experience"]
+    research = bundle["research_experience"]
+    contact = bundle["contact"]
+
+    def expand_all() -> None:
+        seen: set[str] = set()
+        for b in bullets:
+            generate.expand_acronyms(b, acronyms, seen)
+
+    cases: dict[str, Callable[[], object]] = {
+        "escape_latex": lambda: [generate.escape_latex(b) for b in bullets],
+        "expand_acronyms": expand_all,
+        "gen_designed_contact": lambda: generate.gen_designed_contact(contact),
+        "gen_designed_acronyms": lambda: generate.gen_designed_acronyms(bundle["acronyms"]),
+        "gen_designed_summary": lambda: generate.gen_designed_summary(bundle["summary"]),
+        "gen_designed_work": lambda: generate.gen_designed_work(work),
+        "gen_designed_research": lambda: generate.gen_designed_research(research),
+        "gen_designed_education": lambda: generate.gen_designed_education(bundle["education"]),
+        "gen_designed_skills": lambda: generate.gen_designed_skills(bundle["skills"]),
+        "gen_designed_certifications":
+            lambda: generate.gen_designed_certifications(bundle["certifications"]),
+        "gen_designed_publications":
+            lambda: generate.gen_designed_publications(bundle["publications"]),
+        "ats_contact_block": lambda: _drain(generate.ats_contact_block(contact)),
+        "ats_summary": lambda: _drain(generate.ats_summary(bundle["summary"], acronyms)),
+        "ats_experience(research)": lambda: _drain(generate.ats_experience(
+            research, "RESEARCH EXPERIENCE", acronyms, flatten_subsections=True)),
+        "ats_experience(work)": lambda: _drain(generate.ats_experience(
+            work, "WORK EXPERIENCE", acronyms, flatten_subsections=False)),
+        "ats_skills": lambda: _drain(generate.ats_skills(bundle["skills"], acronyms)),
+        "ats_education": lambda: _drain(generate.ats_education(bundle["education"], acronyms)),
+        "ats_publications":
+            lambda: _drain(generate.ats_publications(bundle["publications"], acronyms)),
+        "ats_certifications":
+            lambda: _drain(generate.ats_certifications(bundle["certifications"], acronyms)),
+    }
+
+    # --- layout.py: write the designed components into the sandbox ---------
+    gen_dir = sandbox / "generated"
+    gen_dir.mkdir(parents=True, exist_ok=True)
+    designed = {
+        "summary.tex": generate.gen_designed_summary(bundle["summary"]),
+        "research_experience.tex": generate.gen_designed_research(research),
+        "work_experience.tex": generate.gen_designed_work(work),
+        "skills.tex": generate.gen_designed_skills(bundle["skills"]),
+        "education.tex": generate.gen_designed_education(bundle["education"]),
+        "publications.tex": generate.gen_designed_publications(bundle["publications"]),
+        "certifications.tex": generate.gen_designed_certifications(bundle["certifications"]),
+    }
+    for name, tex in designed.items():
+        (gen_dir / name).write_text(tex, encoding="utf-8")
+    heights = {f"generated/{name}": _estimate_rows(tex) for name, tex in designed.items()}
+    grid = compute_grid(contact, load_params(contact["header_theme"]))
+    work_tex = gen_dir / "work_experience.tex"
+
+    def layout_canvas(breaker: str) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            layout.generate_layout_canvas(
+                LAYOUT_SECTIONS, grid, heights, contact["header_theme"], breaker
+            )
+
+    # One breaker item per job entry, splittable every 4 lines
+    items = []
+    for entry in work["entries"]:
+        rows = _estimate_rows(generate.gen_designed_work({"entries": [entry]}))
+        items.append({
+            "rows": rows,
+            "total_lines": rows,
+            "boundaries": list(range(4, rows, 4)),
+        })
+    geom = {
+        "start_y": grid["content_start_y"],
+        "max_y": grid["max_page_y"],
+        "gap": grid["gap_box"],
+        "pad_top": grid["left_pad_top"],
+        "pad_bot": grid["left_pad_bot"],
+        "min_split": grid["min_split_rows"],
+    }
+
+    cases["find_split_boundaries"] = lambda: layout.find_split_boundaries(work_tex)
+    cases["generate_layout_canvas(greedy)"] = lambda: layout_canvas("greedy")
+    cases["generate_layout_canvas(optimal)"] = lambda: layout_canvas("optimal")
+    cases["break_column(job entries)"] = lambda: break_column(items, geom)
+
+    # --- header.py ----------------------------------------------------------
+    name = contact["name"]
+    header_width = max(grid["grid_cols"], measure(name, "5row") + 6)
+    cases["render_name(5row)"] = lambda: header.render_name(name, "5row")
+    cases["render_name(4row)"] = lambda: header.render_name(name, "4row")
+    cases["generate_header_name_tex"] = lambda: header.generate_header_name_tex(
+        name, "mainframe", header_width
+    )
+
+    # --- font.py: the batch path (rotations of the name, 1,000 of them) -----
+    names = [name[i % len(name):] + name[:i % len(name)] for i in range(1000)]
+    cases["measure(1000 names)"] = lambda: [measure(n, "5row") for n in names]
+    cases["render_many(1000 names)"] = lambda: render_many(names, "5row")
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+def time_case(fn: Callable[[], object], repeat: int) -> dict[str, float]:
+    """Best and median seconds per call over *repeat* auto-ranged runs."""
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    runs = [t / loops for t in timer.repeat(repeat=repeat, number=loops)]
+    return {
+        "best_s": min(runs),
+        "median_s": statistics.median(runs),
+        "loops": loops,
+    }
+
+
+def run(sizes: list[str], repeat: int, seed: int) -> dict:
+    results: dict[str, dict[str, float]] = {}
+    for size in sizes:
+        bundle = make_bundle(seed, **SIZES[size])
+        with tempfile.TemporaryDirectory(prefix="cv-bench-") as tmp, _sandbox(Path(tmp)):
+            for case, fn in build_cases(bundle, Path(tmp)).items():
+                key = f"{size}/{case}"
+                results[key] = time_case(fn, repeat)
+                print(f"  {key:<45} {results[key]['best_s'] * 1e3:12.4f} ms")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "sizes": {s: SIZES[s] for s in sizes},
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print a comparison table; return the keys that regressed."""
+    base = baseline.get("results", {})
+    regressed: list[str] = []
+    print(f"\n{'baseline ms':>12}  {'current ms':>12}  {'ratio':>6}  case")
+    for key, res in current["results"].items():
+        if key not in base:
+            print(f"{'—':>12}  {res['best_s'] * 1e3:12.4f}  {'new':>6}  {key}")
+            continue
+        ratio = res["best_s"] / base[key]["best_s"] if base[key]["best_s"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  << REGRESSION"
+            regressed.append(key)
+        print(
+            f"{base[key]['best_s'] * 1e3:12.4f}  {res['best_s'] * 1e3:12.4f}  "
+            f"{ratio:6.2f}  {key}{flag}"
+        )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="small,medium,large",
+                        help="comma-separated subset of: " + ", ".join(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        die(f"unknown size(s) {unknown} (must be one of: {', '.join(SIZES)})")
+    if args.compare and not args.baseline.exists():
+        die(f"{args.baseline} not found. Run with --save-baseline first.")
+
+    print(f"Benchmarking {', '.join(sizes)} (seed={args.seed}, repeat={args.repeat})")
+    current = run(sizes, args.repeat, args.seed)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+    print(f"Results: {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline saved: {args.baseline}")
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressed = compare(current, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} case(s) slower than baseline by "
+                  f">{args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
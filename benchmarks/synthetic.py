@@ -0,0 +1,226 @@
+"""
+synthetic.py — Seeded synthetic CV content for the benchmarks.
+
+make_bundle() returns the same dict shapes generate.py loads from
+content/*.yaml, so every generator can be timed on content far larger than
+the Fred Durst sample. The same (seed, size) always produces the same
+bundle, so timings from different runs and machines are comparable.
+
+Text deliberately exercises the slow paths: LaTeX specials (& $ % # _ ~ ×)
+for escape_latex, and acronyms embedded in bullets (some of them shared
+prefixes of longer ones) for expand_acronyms.
+"""
+
+from __future__ import annotations
+
+import random
+import string
+
+# Named sizes used by run.py. bullets are shared between work and research
+# experience; names are long enough to stress the ASCII-art header.
+SIZES: dict[str, dict[str, int]] = {
+    "small":  {"bullets": 10,     "publications": 1,    "acronyms": 20,  "name_chars": 10},
+    "medium": {"bullets": 500,    "publications": 100,  "acronyms": 200, "name_chars": 24},
+    "large":  {"bullets": 10_000, "publications": 2_000, "acronyms": 500, "name_chars": 40},
+}
+
+_WORDS = (
+    "architected delivered scaled pipeline distributed latency throughput "
+    "platform migrated observability reduced increased automated cluster "
+    "inference training dataset streaming orchestration deployment budget "
+    "stakeholders roadmap compliance resilient real-time analytics service "
+    "cost availability incident capacity benchmark regression model audio"
+).split()
+
+_SPECIALS = ["&", "$", "%", "#", "_", "~", "×", "---", "--"]
+
+_MONTHS = "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split()
+
+
+def _acronym_table(rng: random.Random, count: int) -> dict[str, str]:
+    """Build *count* unique acronyms; every fifth one extends an earlier one
+    (e.g. ML → MLOPS) so the longest-match-first ordering matters."""
+    table: dict[str, str] = {}
+    letters = string.ascii_uppercase
+    while len(table) < count:
+        if table and len(table) % 5 == 0:
+            base = rng.choice(list(table))
+            short = base + "".join(rng.choices(letters, k=rng.randint(1, 2)))
+        else:
+            short = "".join(rng.choices(letters, k=rng.randint(2, 4)))
+        if short in table:
+            continue
+        table[short] = " ".join(
+            w.capitalize() for w in rng.choices(_WORDS, k=len(short))
+        )
+    return table
+
+
+def _sentence(rng: random.Random, acronyms: list[str], words: int) -> str:
+    out = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.08 and acronyms:
+            out.append(rng.choice(acronyms))
+        elif roll < 0.12:
+            out.append(f"{rng.randint(2, 999)}{rng.choice(_SPECIALS)}")
+        else:
+            out.append(rng.choice(_WORDS))
+    text = " ".join(out)
+    return text[0].upper() + text[1:]
+
+
+def _dates(rng: random.Random) -> str:
+    start = rng.randint(1990, 2020)
+    end = start + rng.randint(0, 5)
+    return (
+        f"{rng.choice(_MONTHS)} {start} -- "
+        f"{'Present' if rng.random() < 0.1 else f'{rng.choice(_MONTHS)} {end}'}"
+    )
+
+
+def _name(rng: random.Random, chars: int) -> str:
+    """A space-separated name of exactly *chars* characters (A–Z only, so
+    every glyph exists in both header fonts)."""
+    parts: list[str] = []
+    remaining = chars
+    while remaining > 0:
+        n = min(remaining, rng.randint(3, 9))
+        parts.append("".join(rng.choices(string.ascii_uppercase, k=n)).capitalize())
+        remaining -= n + 1
+    return " ".join(parts)[:chars].strip()
+
+
+def make_bundle(
+    seed: int,
+    bullets: int,
+    publications: int,
+    acronyms: int,
+    name_chars: int,
+) -> dict:
+    """Return a synthetic content bundle (one dict per content/*.yaml)."""
+    rng = random.Random(seed)
+    acr = _acronym_table(rng, acronyms)
+    acr_keys = list(acr)
+
+    def bullet() -> str:
+        return _sentence(rng, acr_keys, rng.randint(12, 40))
+
+    # Split bullets: ~60% work (4 per job), ~40% research (3 per subsection).
+    work_bullets = max(1, bullets * 3 // 5)
+    research_bullets = max(1, bullets - work_bullets)
+
+    work = []
+    left = work_bullets
+    while left > 0:
+        n = min(left, rng.randint(2, 6))
+        work.append({
+            "role": _sentence(rng, acr_keys, 4),
+            "company": _sentence(rng, acr_keys, 2),
+            "dates": _dates(rng),
+            "location": _sentence(rng, [], 2),
+            "bullets": [bullet() for _ in range(n)],
+        })
+        left -= n
+
+    research = []
+    left = research_bullets
+    while left > 0:
+        subsections = []
+        for _ in range(rng.randint(1, 3)):
+            if left <= 0:
+                break
+            n = min(left, rng.randint(2, 4))
+            subsections.append({
+                "heading": _sentence(rng, acr_keys, 5),
+                "bullets": [bullet() for _ in range(n)],
+            })
+            left -= n
+        research.append({
+            "role": _sentence(rng, acr_keys, 5),
+            "company": _sentence(rng, acr_keys, 3),
+            "dates": _dates(rng),
+            "location": _sentence(rng, [], 2),
+            "description": _sentence(rng, acr_keys, 50),
+            "subsections": subsections,
+        })
+
+    education = [
+        {
+            "degree": _sentence(rng, acr_keys, 5),
+            "institution": _sentence(rng, [], 3),
+            "dates": f"{1990 + i} -- {1993 + i}",
+            "location": _sentence(rng, [], 2),
+            "details": _sentence(rng, acr_keys, 6),
+            "progress": rng.randint(0, 100),
+        }
+        for i in range(max(1, bullets // 100))
+    ]
+
+    skills = [
+        {
+            "category": _sentence(rng, [], 2),
+            "items": [_sentence(rng, acr_keys, 5) for _ in range(rng.randint(2, 5))],
+        }
+        for _ in range(max(1, bullets // 50))
+    ]
+
+    pubs = [
+        {
+            "authors": ", ".join(
+                f"{_name(rng, 8)}, {rng.choice(string.ascii_uppercase)}."
+                for _ in range(rng.randint(1, 8))
+            ),
+            "title": _sentence(rng, acr_keys, rng.randint(6, 16)),
+            "venue": _sentence(rng, acr_keys, 4),
+            "year": str(rng.randint(1990, 2026)),
+        }
+        for _ in range(publications)
+    ]
+
+    certifications = [
+        {
+            "name": _sentence(rng, acr_keys, 4),
+            "issuer": _sentence(rng, [], 3),
+            "year": str(rng.randint(2000, 2026)),
+        }
+        for _ in range(max(1, bullets // 200))
+    ]
+
+    contact = {
+        "paper_size": "a4",
+        "margin": 7.8,
+        "header_theme": "mainframe",
+        "name": _name(rng, name_chars),
+        "title": _sentence(rng, [], 4),
+        "email": "someone@example.com",
+        "phone": "+44 20 0000 0000",
+        "linkedin": "linkedin.com/in/someone",
+        "github": "github.com/someone",
+        "location": "London, UK",
+        "full_cv_url": "https://example.com/cv.pdf",
+    }
+
+    return {
+        "contact": contact,
+        "acronyms": {"acronyms": acr},
+        "summary": {"text": _sentence(rng, acr_keys, 80)},
+        "work_experience": {"entries": work},
+        "research_experience": {"entries": research},
+        "education": {"entries": education},
+        "skills": {"groups": skills},
+        "certifications": {"entries": certifications},
+        "publications": {"entries": pubs},
+    }
+
+
+def all_bullets(bundle: dict) -> list[str]:
+    """Every bullet in *bundle*, in document order (work, then research)."""
+    out = [b for e in bundle["work_experience"]["entries"] for b in e["bullets"]]
+    out += [
+        b
+        for e in bundle["research_experience"]["entries"]
+        for sub in e["subsections"]
+        for b in sub["bullets"]
+    ]
+    return out
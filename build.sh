@@ -8,6 +8,7 @@
 #    ./build.sh -a       ATS CV only (generate + pdfLaTeX)
 #    ./build.sh -b       Force-rebuild Docker image(s) first
 #    ./build.sh -c       Remove auxiliary / output files
+#    ./build.sh -p       Profile the designed build (build/boxprofile-*.dat)
 # ──────────────────────────────────────────────────────────────────
 set -euo pipefail
 
@@ -19,22 +20,25 @@ REBUILD=false
 CLEAN=false
 BUILD_DESIGNED=true
 BUILD_ATS=true
+PROFILE=false
 
 usage() {
-  echo "Usage: $0 [-b] [-c] [-d] [-a]"
+  echo "Usage: $0 [-b] [-c] [-d] [-a] [-p]"
   echo "  -b  Force-rebuild the Docker image(s)"
   echo "  -c  Remove auxiliary / output files"
   echo "  -d  Build designed CV only"
   echo "  -a  Build ATS CV only"
+  echo "  -p  Profile each box's TeX compile time (designed CV)"
   exit 1
 }
 
-while getopts "bcdah" opt; do
+while getopts "bcdaph" opt; do
   case $opt in
     b) REBUILD=true ;;
     c) CLEAN=true ;;
     d) BUILD_DESIGNED=true; BUILD_ATS=false ;;
     a) BUILD_ATS=true; BUILD_DESIGNED=false ;;
+    p) PROFILE=true ;;
     *) usage ;;
   esac
 done
@@ -45,7 +49,8 @@ if $CLEAN; then
   rm -rf build/
   rm -f *.pdf boxheights.dat
   rm -f main_ats.tex
-  rm -f generated/.build-meta generated/settings.tex generated/canvas.tex generated/header_name.tex
+  rm -f generated/.build-meta generated/settings.tex generated/canvas.tex generated/header_name.tex generated/fonts.tex generated/params.tex
+  rm -f generated/fit.json generated/prune.json generated/header.json
   rm -f generated/*-p[0-9]*.tex 2>/dev/null || true
   echo "Done."
   exit 0
@@ -55,6 +60,10 @@ fi
 export DOCKER_UID="$(id -u)"
 export DOCKER_GID="$(id -g)"
 
+# ── Shared font store (scripts/fontstore.py), created as this user ──
+export CV_FONT_STORE="${CV_FONT_STORE:-${XDG_CACHE_HOME:-$HOME/.cache}/cv-fonts}"
+mkdir -p "$CV_FONT_STORE"
+
 # ── Build images (always on first run, --no-cache with -b) ──────
 if $BUILD_DESIGNED; then
   if $REBUILD; then
@@ -74,7 +83,11 @@ fi
 # ── Compile designed CV ──────────────────────────────────────────
 if $BUILD_DESIGNED; then
   echo "Building designed CV (generate + LuaLaTeX)..."
-  docker compose run --rm latex
+  if $PROFILE; then
+    docker compose run --rm -e CV_PROFILE=1 latex
+  else
+    docker compose run --rm latex
+  fi
   # Read dynamic output name from build metadata
   if [ -f "generated/.build-meta" ]; then
     source generated/.build-meta
@@ -88,6 +101,13 @@ if $BUILD_DESIGNED; then
     echo "ERROR: Designed CV compilation failed — no PDF produced."
     exit 1
   fi
+  if $PROFILE; then
+    if command -v python3 &>/dev/null; then
+      python3 scripts/profile_report.py
+    else
+      echo "Profiles written to build/boxprofile-*.dat (report: python3 scripts/profile_report.py)"
+    fi
+  fi
 fi
 
 # ── Compile ATS CV ───────────────────────────────────────────────
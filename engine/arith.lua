@@ -0,0 +1,126 @@
+-- ============================================================================
+-- ENGINE/ARITH.LUA — Expression evaluator behind \IntEval / \NumEval
+-- ============================================================================
+--
+-- Loaded by engine/arith.tex. The templates compute box rows, dash counts,
+-- textblock positions and prefix rows with small expressions such as
+--
+--   1 + 1.2 + 14 + 1 + 1
+--   max(0, ceil(1769472 / (1.0 * 589824)) - 1)
+--
+-- (TeX has already expanded every macro and \number'd every dimension).
+-- Evaluating them as Lua doubles gives exactly what scripts/lib/config.py
+-- computes with Python floats, and int() truncates toward zero like
+-- Python's int() and \pgfmathtruncatemacro, so box_rows() agrees with the
+-- templates row for row. Both truncate with the same TRUNC_EPS slack, so a
+-- sum of decimal pads that binary rounding leaves a hair below a whole
+-- number (0.13 + 0.87) truncates to it, as pgfmath's fixed-point sum did.
+-- tests/test_arith.py runs this file over a corpus of such expressions.
+--
+-- Functions available in expressions (pgfmath names and semantics):
+--   max(a, b, ...)  min(a, b, ...)  abs(x)
+--   ceil(x)  floor(x)  int(x) (toward zero)  round(x) (half away from zero)
+-- and, for content rows from two dimensions in sp:
+--   ptceil(h, m)  ceil(h / m) as pgfmath computed it from the same
+--                 dimensions: the quotient is first cut to a dimension
+--                 (1sp for a whole-pt m, else 5 decimals), so an overhang
+--                 below that resolution is not a row
+--
+-- Each distinct expression string is compiled once and cached.
+-- ============================================================================
+
+local M = {}
+
+local floor, ceil = math.floor, math.ceil
+
+-- lib/config.py TRUNC_EPS
+local TRUNC_EPS = 1e-9
+
+-- Python int() / \pgfmathtruncatemacro: truncate toward zero
+local function trunc(x)
+    if x >= 0 then return floor(x + TRUNC_EPS) end
+    return ceil(x - TRUNC_EPS)
+end
+
+local function round(x)
+    if x >= 0 then return floor(x + 0.5) end
+    return -floor(-x + 0.5)
+end
+
+local SP = 65536  -- sp per pt
+
+-- A decimal constant (whole part, fraction digits) in sp, rounded as TeX
+-- reads it (\pgfmathresult back into a dimension)
+local function decimal_sp(whole, digits)
+    local acc = 0
+    for i = #digits, 1, -1 do
+        acc = floor((acc + tonumber(digits:sub(i, i)) * 2 * SP) / 10)
+    end
+    return whole * SP + floor((acc + 1) / 2)
+end
+
+-- pgfmath's ceil(h / m) for dimensions h >= 0, m > 0 in sp
+local function ptceil(h, m)
+    local q
+    if m % SP == 0 then
+        -- \divide by the whole-pt divisor: truncated to sp
+        q = floor(h / (m / SP))
+    else
+        -- long division to five decimals, read back as pt
+        local whole, rest = floor(h / m), h % m
+        local digits = ""
+        for _ = 1, 5 do
+            local d = floor(rest * 10 / m)
+            rest = rest * 10 - d * m
+            digits = digits .. d
+        end
+        q = decimal_sp(whole, digits)
+    end
+    return ceil(q / SP)
+end
+
+local env = {
+    max = math.max, min = math.min, abs = math.abs,
+    ceil = ceil, floor = floor, int = trunc, round = round, ptceil = ptceil,
+}
+
+local compiled = {}  -- expression -> function
+
+local function eval(expr)
+    local fn = compiled[expr]
+    if not fn then
+        -- "1 - -2" is arithmetic, "1--2" would be a Lua comment
+        local chunk, err = load("return " .. expr:gsub("%-%-", "- -"), "=arith", "t", env)
+        if not chunk then
+            tex.error("arith.lua: cannot evaluate '" .. expr .. "'", { err })
+            return 0
+        end
+        fn = chunk
+        compiled[expr] = fn
+    end
+    local ok, value = pcall(fn)
+    if not ok or type(value) ~= "number" or value ~= value then
+        tex.error("arith.lua: '" .. expr .. "' is not a number", { tostring(value) })
+        return 0
+    end
+    return value
+end
+
+-- Integer result: \IntEval, like \pgfmathtruncatemacro
+function M.int(expr)
+    tex.sprint(string.format("%d", trunc(eval(expr))))
+end
+
+-- Decimal result: \NumEval, like \pgfmathsetmacro (at most 5 decimals)
+function M.num(expr)
+    local value = eval(expr)
+    if value == trunc(value) then
+        tex.sprint(string.format("%d", trunc(value)))
+        return
+    end
+    local s = string.format("%.5f", value):gsub("0+$", ""):gsub("%.$", "")
+    if s == "-0" then s = "0" end
+    tex.sprint(s)
+end
+
+return M
@@ -0,0 +1,374 @@
+-- ============================================================================
+-- ENGINE/PAGEBREAK.LUA — Page breaking inside the LuaLaTeX run
+-- ============================================================================
+--
+-- Loaded by engine/pagebreak.tex (single-compile mode, layout.py --single).
+-- TeX measures every section into a box and calls add(); run() then packs
+-- the sections onto pages with the same rules as scripts/layout.py's
+-- greedy breaker, writes the split part files, and prints the canvas body
+-- (headers, \...BoxInit / \...BoxGap, \...Box) back into TeX, so the pages
+-- are assembled in the same run.
+--
+-- Mirrors, line for line:
+--   find_split_boundaries()  SPLIT_PREFIXES / SPLIT_LINES below
+--   split_content_parts()    split_parts()
+--   plan_layout() (greedy)   bands() + layout_column()
+--   build_layout_canvas()    emit() (no render cache)
+--   box_rows()               box_rows()
+-- Any change to those Python functions must be made here too;
+-- layout.py --crosscheck re-plans with Python and reports any difference.
+--
+-- run() also writes the plan (build/layout-plan.json, BoxPlacement fields)
+-- and the whole-section heights (build/boxheights-measure.dat), so
+-- layout.py --crosscheck and --converge work as after a two-pass build.
+-- ============================================================================
+
+local M = {}
+
+local sections = {}   -- in layout.yaml order: { column, title, content, rows }
+
+-- Safe split points (layout.py SPLIT_PATTERNS), matched on stripped lines
+local SPLIT_LINES = { ["\\JobSep"] = true }
+local SPLIT_PREFIXES = {
+    "\\vspace{\\GapTimelineItem",
+    "\\vspace{\\GapSkillCat",
+    "\\vspace{\\GapBeforeSubHead",
+    "\\SubHead{",
+}
+
+local LANES = {
+    { "left", "LeftBox", "0" },
+    { "right", "RightBox", "\\RightColX" },
+    { "full", "FullBox", "0" },
+}
+
+local function strip(s)
+    return s:match("^%s*(.-)%s*$")
+end
+
+-- Python int(): truncate toward zero
+local function trunc(x)
+    if x >= 0 then return math.floor(x) end
+    return math.ceil(x)
+end
+
+-- lib/config.py box_rows, TRUNC_EPS included
+local function box_rows(content_rows, pad_top, pad_bot)
+    return trunc(1 + pad_top + content_rows + pad_bot + 1 + 1e-9)
+end
+
+local function fmt(y)
+    return string.format("%g", y)
+end
+
+-- Lines of a file, line endings kept (Python splitlines(keepends=True))
+local function read_lines(path)
+    local f = io.open(path, "rb")
+    if not f then
+        tex.error("pagebreak.lua: content file not found: " .. path)
+        return {}
+    end
+    local text = f:read("a")
+    f:close()
+    local lines = {}
+    for line in text:gmatch("[^\n]*\n") do
+        lines[#lines + 1] = line
+    end
+    local tail = text:match("[^\n]*$")
+    if tail ~= "" then
+        lines[#lines + 1] = tail
+    end
+    return lines
+end
+
+local function find_split_boundaries(lines)
+    local boundaries = {}
+    for i, line in ipairs(lines) do
+        local s = strip(line)
+        local hit = SPLIT_LINES[s]
+        for _, prefix in ipairs(SPLIT_PREFIXES) do
+            hit = hit or s:sub(1, #prefix) == prefix
+        end
+        if hit then
+            boundaries[#boundaries + 1] = i - 1   -- 0-based, as in Python
+        end
+    end
+    return boundaries
+end
+
+local function find_wrapping_env(lines)
+    local first
+    for _, line in ipairs(lines) do
+        local s = strip(line)
+        if s ~= "" and s:sub(1, 1) ~= "%" then
+            first = s:match("^\\begin{([%w_]+)}$")
+            break
+        end
+    end
+    if not first then return nil end
+    for i = #lines, 1, -1 do
+        local s = strip(lines[i])
+        if s ~= "" and s:sub(1, 1) ~= "%" then
+            if s:match("^\\end{([%w_]+)}$") == first then return first end
+            break
+        end
+    end
+    return nil
+end
+
+-- Split generated/<content> before each 0-based line in cuts → -p1, -p2, ...
+local function split_parts(content, lines, cuts)
+    local env = find_wrapping_env(lines)
+    local stem = content:gsub("%.tex$", "")
+    local edges = { 0 }
+    for _, c in ipairs(cuts) do edges[#edges + 1] = c end
+    edges[#edges + 1] = #lines
+    local last = #edges - 1
+    local paths = {}
+    for n = 1, last do
+        local part = {}
+        for i = edges[n] + 1, edges[n + 1] do part[#part + 1] = lines[i] end
+        if n < last then
+            while #part > 0 and strip(part[#part]) == "" do table.remove(part) end
+        end
+        if n > 1 then
+            while #part > 0 and (strip(part[1]) == "" or strip(part[1]) == "\\JobSep") do
+                table.remove(part, 1)
+            end
+        end
+        if env then
+            if n < last then part[#part + 1] = "\n\\end{" .. env .. "}\n" end
+            if n > 1 then table.insert(part, 1, "\\begin{" .. env .. "}\n") end
+        end
+        local path = "generated/" .. stem .. "-p" .. n .. ".tex"
+        local f = assert(io.open(path, "wb"))
+        f:write(table.concat(part))
+        f:close()
+        paths[n] = path
+    end
+    return paths
+end
+
+-- Consecutive full-width sections form a band; the left/right sections
+-- between them form a two-column region (layout.py _bands)
+local function bands()
+    local out = {}
+    for _, sec in ipairs(sections) do
+        local kind = sec.column == "full" and "full" or "columns"
+        if #out == 0 or out[#out].kind ~= kind then
+            out[#out + 1] = { kind = kind, first = {}, second = {} }
+        end
+        local band = out[#out]
+        local list = sec.column == "right" and band.second or band.first
+        list[#list + 1] = sec
+    end
+    return out
+end
+
+local function placement(title, path, column, page, y, rows, source, lines, part)
+    return {
+        title = title, content_path = path, column = column, page = page,
+        y = y, rows = rows, source = source, lines = lines, part = part or 0,
+    }
+end
+
+-- Greedy: returns placements, last page, bottom row on it (layout_column)
+local function layout_column(g, col_sections, column, page, first_y)
+    local placements = {}
+    local current_page, current_y, end_y = page, first_y, nil
+    local pad_top, pad_bot = g.pads[column][1], g.pads[column][2]
+
+    for _, sec in ipairs(col_sections) do
+        local key = "generated/" .. sec.content
+        local c_rows = sec.rows
+        local b_rows = box_rows(c_rows, pad_top, pad_bot)
+        local test_y = current_y
+
+        if test_y + b_rows <= g.max_y then
+            placements[#placements + 1] = placement(
+                sec.title, key, column, current_page, test_y, c_rows, sec.content)
+            end_y = test_y + b_rows
+        else
+            local available = trunc(g.max_y - test_y - 1 - pad_top - pad_bot - 1)
+            local lines = read_lines(key)
+            local boundaries = find_split_boundaries(lines)
+            local split_done = false
+
+            if available >= g.min_split and #boundaries > 0 then
+                local total = #lines
+                local best, best_rows = nil, 0
+                for bi, bline in ipairs(boundaries) do
+                    local fraction = total > 0 and bline / total or 0
+                    local est_rows = math.ceil(c_rows * fraction)
+                    if test_y + box_rows(est_rows, pad_top, pad_bot) <= g.max_y then
+                        best, best_rows = bi, est_rows
+                    else
+                        break
+                    end
+                end
+
+                if best then
+                    local bline = boundaries[best]
+                    local paths = split_parts(sec.content, lines, { bline })
+                    texio.write_nl("  Split " .. sec.content .. " at boundary "
+                        .. (best - 1) .. " -> " .. paths[1] .. ", " .. paths[2])
+                    placements[#placements + 1] = placement(
+                        sec.title, paths[1], column, current_page, test_y,
+                        best_rows, sec.content, { 0, bline }, 1)
+
+                    local total_f = total > 0 and total or 1
+                    local remaining = math.max(1, math.ceil(c_rows * (1 - bline / total_f)))
+                    current_page = current_page + 1
+                    placements[#placements + 1] = placement(
+                        sec.title .. " (cont.)", paths[2], column, current_page,
+                        g.start_y, remaining, sec.content, { bline, total }, 2)
+                    end_y = g.start_y + box_rows(remaining, pad_top, pad_bot)
+                    split_done = true
+                end
+            end
+
+            if not split_done then
+                current_page = current_page + 1
+                placements[#placements + 1] = placement(
+                    sec.title, key, column, current_page, g.start_y, c_rows, sec.content)
+                end_y = g.start_y + b_rows
+            end
+        end
+        current_y = end_y + g.gap
+    end
+    return placements, current_page, end_y
+end
+
+local function plan(g)
+    local placements = {}
+    local page, next_y = 1, g.start_y
+    for _, band in ipairs(bands()) do
+        local runs
+        if band.kind == "full" then
+            runs = { { layout_column(g, band.first, "full", page, next_y) } }
+        else
+            local right = { layout_column(g, band.second, "right", page, next_y) }
+            runs = { { layout_column(g, band.first, "left", page, next_y) }, right }
+        end
+        local last_page
+        for _, run in ipairs(runs) do
+            for _, p in ipairs(run[1]) do placements[#placements + 1] = p end
+            if run[3] ~= nil then
+                last_page = math.max(last_page or run[2], run[2])
+            end
+        end
+        if last_page then
+            local lowest
+            for _, run in ipairs(runs) do
+                if run[3] ~= nil and run[2] == last_page then
+                    lowest = math.max(lowest or run[3], run[3])
+                end
+            end
+            page, next_y = last_page, lowest + g.gap
+        end
+    end
+    local total = 1
+    for _, p in ipairs(placements) do total = math.max(total, p.page) end
+    return placements, total
+end
+
+local function chained(g, prev, p)
+    local pads = g.pads[prev.column]
+    local prev_end = prev.y + box_rows(prev.rows, pads[1], pads[2])
+    return math.abs(prev_end + g.gap - p.y) < 1e-6
+end
+
+-- The canvas body for the plan (build_layout_canvas)
+local function emit(g, placements, total)
+    local out = {}
+    local function add(line) out[#out + 1] = line end
+    for page = 1, total do
+        if page == 1 then
+            add("\\CVHeader{0}{0}")
+            add("    {\\StoredName}{\\StoredTitle}")
+            add("    {\\StoredEmail}{\\StoredPhone}")
+            add("    {\\StoredLinkedin}{\\StoredLocation}")
+        else
+            add("\\CVPageBreak")
+        end
+        local used = {}
+        for _, lane in ipairs(LANES) do
+            local column, macro, x = lane[1], lane[2], lane[3]
+            local boxes = {}
+            for _, p in ipairs(placements) do
+                if p.column == column and p.page == page then boxes[#boxes + 1] = p end
+            end
+            table.sort(boxes, function(a, b) return a.y < b.y end)
+            if #boxes > 0 then
+                used[column] = true
+                local prev
+                for _, p in ipairs(boxes) do
+                    if prev and chained(g, prev, p) then
+                        add("\\" .. macro .. "Gap{\\GapBoxToBox}")
+                    else
+                        local y = p.y == g.start_y and "\\ContentStartY" or fmt(p.y)
+                        add("\\" .. macro .. "Init{" .. x .. "}{" .. y .. "}")
+                    end
+                    add("\\" .. macro .. "{" .. p.title .. "}{" .. p.content_path .. "}")
+                    prev = p
+                end
+            end
+        end
+        if not used.left and page > 1 then add("\\LeftBoxInit{0}{\\ContentStartY}") end
+        if not used.right and page > 1 then add("\\RightBoxInit{\\RightColX}{\\ContentStartY}") end
+    end
+    return out
+end
+
+local function json_string(s)
+    return '"' .. s:gsub('[%c"\\]', function(c)
+        if c == '"' then return '\\"' end
+        if c == "\\" then return "\\\\" end
+        return string.format("\\u%04x", c:byte())
+    end) .. '"'
+end
+
+local function write_plan(path, placements, total)
+    local items = {}
+    for _, p in ipairs(placements) do
+        items[#items + 1] = string.format(
+            '    {"title": %s, "content_path": %s, "column": %s, "page": %d, '
+            .. '"y": %s, "rows": %d, "source": %s, "lines": %s, "part": %d}',
+            json_string(p.title), json_string(p.content_path), json_string(p.column),
+            p.page, fmt(p.y), p.rows, json_string(p.source),
+            p.lines and string.format("[%d, %d]", p.lines[1], p.lines[2]) or "null",
+            p.part)
+    end
+    local f = assert(io.open(path, "wb"))
+    f:write('{\n  "iteration": 0,\n  "pages": ' .. total .. ',\n  "placements": [\n'
+        .. table.concat(items, ",\n") .. '\n  ]\n}\n')
+    f:close()
+end
+
+local function write_heights(path)
+    local f = assert(io.open(path, "wb"))
+    for _, sec in ipairs(sections) do
+        f:write("generated/" .. sec.content .. "=" .. sec.rows .. "\n")
+    end
+    f:close()
+end
+
+-- One measured section, in layout.yaml order
+function M.add(column, title, content, rows)
+    sections[#sections + 1] = {
+        column = column, title = title, content = content, rows = rows,
+    }
+end
+
+-- Plan, write the plan and heights, and print the canvas body into TeX.
+-- g = { max_y, start_y, gap, min_split, pads = { left = {top, bot}, ... },
+--       plan = path, heights = path }
+function M.run(g)
+    local placements, total = plan(g)
+    write_plan(g.plan, placements, total)
+    write_heights(g.heights)
+    texio.write_nl("pagebreak.lua: " .. #placements .. " boxes on " .. total .. " page(s)")
+    tex.print(emit(g, placements, total))
+end
+
+return M
@@ -0,0 +1,81 @@
+-- ============================================================================
+-- ENGINE/PROFILE.LUA — Clock bookkeeping for the opt-in TeX profiler
+-- ============================================================================
+--
+-- Loaded by engine/profile.tex only when \CVProfile is defined (CV_PROFILE=1).
+-- TeX calls start(step) / stop(step) around each template step; stop()
+-- returns "cpu_ms wall_ms" for engine/profile.tex to \write. Accumulated
+-- steps (called thousands of times, e.g. tree prefixes) are summed with
+-- accum_stop() and written once by flush() at the end of the document.
+--
+-- cpu  = os.clock()         — process CPU time (what the request budget is)
+-- wall = os.gettimeofday()  — wall clock, includes I/O (font files, PDF)
+-- ============================================================================
+
+local M = {}
+
+local clock = os.clock
+local wall = os.gettimeofday
+
+local open = {}    -- step -> stack of { cpu, wall } (steps may nest)
+local totals = {}  -- step -> { cpu_ms, wall_ms, calls }
+local order = {}   -- first-seen order of accumulated steps
+
+function M.start(step)
+    local stack = open[step]
+    if not stack then
+        stack = {}
+        open[step] = stack
+    end
+    stack[#stack + 1] = { clock(), wall() }
+end
+
+local function pop(step)
+    local stack = open[step]
+    local t = stack and table.remove(stack)
+    if not t then
+        texio.write_nl("log", "profile.lua: stop without start for '" .. step .. "'")
+        return 0, 0
+    end
+    return (clock() - t[1]) * 1000, (wall() - t[2]) * 1000
+end
+
+function M.stop(step)
+    local cpu_ms, wall_ms = pop(step)
+    return string.format("%.3f %.3f", cpu_ms, wall_ms)
+end
+
+function M.accum_stop(step)
+    local cpu_ms, wall_ms = pop(step)
+    local t = totals[step]
+    if not t then
+        t = { 0, 0, 0 }
+        totals[step] = t
+        order[#order + 1] = step
+    end
+    t[1] = t[1] + cpu_ms
+    t[2] = t[2] + wall_ms
+    t[3] = t[3] + 1
+end
+
+-- File tag of this compile: CV_PROFILE_PASS (scripts/tracing.py run sets
+-- it to the span name, e.g. "latexmk pass 1 (measure)"), else the job
+-- name. Lowercased, runs of other characters become "-".
+function M.pass_tag()
+    local tag = (os.getenv("CV_PROFILE_PASS") or tex.jobname):lower()
+    tag = tag:gsub("[^%w]+", "-"):gsub("^%-+", ""):gsub("%-+$", "")
+    return tag ~= "" and tag or "job"
+end
+
+-- Emit one \write per accumulated step: "step * - cpu_ms wall_ms calls".
+function M.flush()
+    for _, step in ipairs(order) do
+        local t = totals[step]
+        tex.sprint(string.format(
+            "\\immediate\\write\\boxprofilefile{%s * - %.3f %.3f %d}",
+            step, t[1], t[2], t[3]
+        ))
+    end
+end
+
+return M
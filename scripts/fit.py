@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+fit.py — Fit the designed CV to N pages by choosing margin and grid font size.
+
+Sweeps every grid font size in a range and every sweet-spot margin within
+bounds (snapped margins equal on all four sides, within --skew mm), predicts
+each candidate's page count and last-page fill from the last build's
+measured heights, and writes the winner to generated/fit.json. No candidate
+is compiled: the next build compiles the winner only, and
+layout.py --converge corrects any estimate error there.
+
+Usage:
+    fit.py --pages N [--font MIN:MAX:STEP] [--margin MIN:MAX] [--skew MM]
+    fit.py --clear           (delete generated/fit.json, back to contact.yaml)
+
+Height model: the body text is set at a fixed \fontsize{7.5}{9}
+(preamble.tex §3), while a grid cell's width and height scale with the grid
+font size. So a box's text height in pt is inversely proportional to its
+content width in mm (the text rewraps; even the fixed 63-column left box
+gets wider with the font), and its content rows are that height over the
+candidate's row height. Together: rows × (base width mm / width mm) ×
+(base font / font). Padding and the header are in grid units and do not
+change. Every candidate is then packed by layout.py's own planner (dry
+run, breaker from layout.yaml).
+
+Ranking, best first:
+    1. nothing runs off a page (then: fewest rows that do) — a box taller
+       than a page is placed alone and overflows, whatever the page count
+    2. fits in N pages (fewer counts as fitting)
+    3. closest to N pages
+    4. largest grid font (most readable)
+    5. fullest last page
+    6. smallest margin skew
+
+Inputs:
+    content/contact.yaml, content/layout.yaml, engine/params.yaml
+    build/boxheights-measure.dat (or build/boxheights.dat) — from a build
+
+Outputs:
+    generated/fit.json — margin + font_size, read by lib/config.py (every
+                         script) and generate.py (settings.tex → TeX)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Shared infrastructure — single source of truth
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lib.config import (  # noqa: E402
+    ROOT,
+    BOXHEIGHTS_PATH,
+    MEASURED_HEIGHTS_PATH,
+    FIT_PATH,
+    PAGE_SIZES,
+    PT_TO_MM,
+    die,
+    load_contact,
+    load_layout,
+    load_breaker,
+    compute_grid,
+    content_widths,
+    box_rows,
+)
+from lib import trace  # noqa: E402
+from lib.params import load_params  # noqa: E402
+from layout import load_boxheights, overflow_rows, plan_layout  # noqa: E402
+
+# Narrowest right-column content (grid cols) a candidate may have
+MIN_RIGHT_CONTENT_COLS = 20
+
+# Margin sweep resolution (mm); margins between two grid steps give the
+# same grid, so this only needs to be finer than a cell
+MARGIN_STEP = 0.1
+
+
+def _range_arg(text: str, parts: int) -> list[float]:
+    try:
+        values = [float(v) for v in text.split(":")]
+    except ValueError:
+        values = []
+    if len(values) != parts:
+        raise argparse.ArgumentTypeError(
+            f"expected {':'.join(['N'] * parts)}, got '{text}'"
+        )
+    return values
+
+
+def candidates(
+    contact: dict,
+    params: dict[str, float],
+    fonts: list[float],
+    margin_lo: float,
+    margin_hi: float,
+    max_skew: float,
+) -> list[dict]:
+    """One candidate per distinct (font, grid) with near-equal margins.
+
+    Every margin in a run that gives the same grid produces the same page,
+    so the run's middle margin is kept (safe from rounding at either end).
+    """
+    page_w, page_h = PAGE_SIZES[contact["paper_size"].lower()]
+    found: list[dict] = []
+    for font in fonts:
+        cell_w = font * params["MonoWidthRatio"] * PT_TO_MM
+        cell_h = font * PT_TO_MM
+        runs: dict[tuple[int, int], list[float]] = {}
+        steps = int(round((margin_hi - margin_lo) / MARGIN_STEP))
+        for i in range(steps + 1):
+            margin = round(margin_lo + i * MARGIN_STEP, 1)
+            cols = int(math.floor((page_w - 2 * margin) / cell_w))
+            rows = int(math.floor((page_h - 2 * margin) / cell_h))
+            runs.setdefault((cols, rows), []).append(margin)
+
+        for (cols, rows), margins in runs.items():
+            skew = abs((page_w - cols * cell_w) - (page_h - rows * cell_h)) / 2
+            if skew > max_skew:
+                continue
+            grid_params = {**params, "GridFontSize": font}
+            if content_widths(cols, grid_params)["right"] < MIN_RIGHT_CONTENT_COLS:
+                continue
+            margin = margins[len(margins) // 2]
+            found.append({
+                "font_size": font,
+                "margin": margin,
+                "skew": round(skew, 2),
+                "grid": compute_grid({**contact, "margin": margin}, grid_params),
+                "widths": content_widths(cols, grid_params),
+            })
+    return found
+
+
+def predict_heights(
+    heights: dict[str, int],
+    columns: dict[str, str],
+    base_widths: dict[str, float],
+    base_font: float,
+    cands: list[dict],
+) -> list[dict[str, int]]:
+    """Content rows of every section for every candidate, in one sweep.
+
+    *base_widths* (grid cols) and *base_font* (pt) are the setting the
+    heights were measured at. A grid col is font × MonoWidthRatio wide, so
+    width in mm is proportional to cols × font; a row is font tall. Each
+    column type is rescaled by one factor per candidate, so the factors are
+    computed once and applied to all of that column's boxes.
+    """
+    factors = {
+        col: [
+            (base_widths[col] * base_font) / (c["widths"][col] * c["font_size"])
+            * (base_font / c["font_size"])
+            for c in cands
+        ]
+        for col in base_widths
+    }
+    predicted: list[dict[str, int]] = [{} for _ in cands]
+    for key, rows in heights.items():
+        col = columns.get(key)
+        if col is None:
+            continue
+        for out, factor in zip(predicted, factors[col]):
+            out[key] = max(1, math.ceil(rows * factor - 1e-9))
+    return predicted
+
+
+def evaluate(
+    sections: list[dict], cand: dict, heights: dict[str, int], breaker: str
+) -> tuple[int, float, int]:
+    """(page count, fill of the last page 0..1, rows run off a page) for
+    one candidate."""
+    grid = cand["grid"]
+    placements, pages = plan_layout(sections, grid, heights, breaker, dry_run=True)
+    overflow = overflow_rows(placements, grid)
+    last = [
+        p.y + box_rows(p.rows, grid[f"{p.column}_pad_top"], grid[f"{p.column}_pad_bot"])
+        for p in placements if p.page == pages
+    ]
+    usable = grid["max_page_y"] - grid["content_start_y"]
+    fill = (max(last) - grid["content_start_y"]) / usable if last and usable > 0 else 0.0
+    return pages, min(fill, 1.0), overflow
+
+
+def rank_key(cand: dict, target: int) -> tuple:
+    """Sort key for an evaluated candidate, best first (see the module
+    docstring)."""
+    return (
+        cand["overflow"], cand["pages"] > target, abs(cand["pages"] - target),
+        -cand["font_size"], -cand["fill"], cand["skew"],
+    )
+
+
+def _baseline(contact: dict, params: dict[str, float], heights_path: Path):
+    """Contact and params the measured heights were compiled at.
+
+    Normally the current ones (fit.json already applied). If fit.json is
+    newer than the heights, no build has used it yet: the heights belong
+    to the setting it recorded as measured_at.
+    """
+    if FIT_PATH.exists() and FIT_PATH.stat().st_mtime > heights_path.stat().st_mtime:
+        measured_at = json.loads(FIT_PATH.read_text(encoding="utf-8")).get("measured_at")
+        if measured_at:
+            contact = {**contact, "margin": measured_at["margin"]}
+            params = {**params, "GridFontSize": measured_at["font_size"]}
+    return contact, params
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Choose margin and grid font size so the CV fits N pages."
+    )
+    parser.add_argument("--pages", type=int, help="target page count")
+    parser.add_argument(
+        "--font", type=lambda t: _range_arg(t, 3), default=[8.0, 10.0, 0.5],
+        metavar="MIN:MAX:STEP", help="grid font sizes in pt (default 8:10:0.5)",
+    )
+    parser.add_argument(
+        "--margin", type=lambda t: _range_arg(t, 2), default=[4.0, 25.0],
+        metavar="MIN:MAX", help="margin bounds in mm (default 4:25)",
+    )
+    parser.add_argument(
+        "--skew", type=float, default=0.5, metavar="MM",
+        help="largest allowed difference between snapped side and "
+             "top/bottom margins (default 0.5)",
+    )
+    parser.add_argument(
+        "--clear", action="store_true",
+        help="delete generated/fit.json (use contact.yaml + params.yaml again)",
+    )
+    args = parser.parse_args()
+
+    if args.clear:
+        FIT_PATH.unlink(missing_ok=True)
+        print(f"Removed {FIT_PATH.relative_to(ROOT)}")
+        return
+    if args.pages is None or args.pages < 1:
+        parser.error("--pages N (N >= 1) is required")
+    font_lo, font_hi, font_step = args.font
+    margin_lo, margin_hi = args.margin
+    if font_step <= 0 or font_lo > font_hi or margin_lo > margin_hi:
+        parser.error("empty --font or --margin range")
+
+    heights_path = (
+        MEASURED_HEIGHTS_PATH if MEASURED_HEIGHTS_PATH.exists() else BOXHEIGHTS_PATH
+    )
+    heights = load_boxheights(heights_path)
+    sections = load_layout()
+    breaker = load_breaker()
+    contact = load_contact()
+    contact, params = _baseline(
+        contact, load_params(contact.get("header_theme")), heights_path)
+    base_grid = compute_grid(contact, params)
+    base_widths = content_widths(base_grid["grid_cols"], params)
+    columns = {f"generated/{sec['content']}": sec["column"] for sec in sections}
+
+    fonts = [
+        round(font_lo + i * font_step, 2)
+        for i in range(int(math.floor((font_hi - font_lo) / font_step + 1e-9)) + 1)
+    ]
+    print(
+        f"Measured at margin {contact['margin']} mm, grid font "
+        f"{params['GridFontSize']:g} pt ({heights_path.relative_to(ROOT)})"
+    )
+
+    with trace.span("fit sweep"):
+        cands = candidates(contact, params, fonts, margin_lo, margin_hi, args.skew)
+        if not cands:
+            die("no candidate settings in range — widen --font, --margin or --skew")
+        for cand, predicted in zip(
+            cands, predict_heights(
+                heights, columns, base_widths, params["GridFontSize"], cands)
+        ):
+            cand["pages"], cand["fill"], cand["overflow"] = evaluate(
+                sections, cand, predicted, breaker)
+    trace.count("fit candidates", len(cands))
+
+    target = args.pages
+    cands.sort(key=lambda c: rank_key(c, target))
+    best = cands[0]
+
+    print(f"{len(cands)} candidates for {target} page(s), best first:")
+    print("   font  margin  grid      pages  last page  overflow")
+    for c in cands[:10]:
+        print(
+            f"  {c['font_size']:5g}  {c['margin']:6g}  "
+            f"{c['grid']['grid_cols']:3d}×{c['grid']['grid_rows']:<4d}  "
+            f"{c['pages']:5d}  {c['fill']:8.0%}  {c['overflow']:8d}"
+        )
+
+    if best["overflow"] or best["pages"] > target:
+        print(
+            f"WARNING: nothing fits {target} page(s); best is "
+            f"{best['pages']}"
+            + (f" with {best['overflow']} row(s) off the page" if best["overflow"] else ""),
+            file=sys.stderr,
+        )
+
+    FIT_PATH.write_text(json.dumps({
+        "target_pages": target,
+        "margin": best["margin"],
+        "font_size": best["font_size"],
+        "predicted_pages": best["pages"],
+        "predicted_fill": round(best["fill"], 3),
+        "predicted_overflow": best["overflow"],
+        "measured_at": {
+            "margin": float(contact["margin"]),
+            "font_size": params["GridFontSize"],
+        },
+    }, indent=2) + "\n", encoding="utf-8")
+    print(
+        f"Wrote {FIT_PATH.relative_to(ROOT)}: margin {best['margin']} mm, "
+        f"grid font {best['font_size']:g} pt — rebuild to apply"
+    )
+
+
+if __name__ == "__main__":
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
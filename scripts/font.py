@@ -9,12 +9,20 @@ Two complete 3D ASCII font sets (5-row and 4-row) with:
   - 80s terminal retro extras
 
 Usage:
-    from retro_ascii_fonts import render, render4, FONT_5ROW, FONT_4ROW
+    from font import render, render4, FONT_5ROW, FONT_4ROW
 
     render("HELLO WORLD")       # 5-row 3D font
     render4("HELLO WORLD")      # 4-row 3D font
+
+Compiled tables (header.py; built per font on first use):
+    from font import measure, render_many
+
+    measure("HELLO WORLD", "4row")          # width in columns, no rendering
+    render_many(["ADA", "GRACE"], "5row")   # rows of each name
 """
 
+from typing import NamedTuple
+
 # =============================================================================
 # 5-ROW FONT — "mainframe" theme
 # Box-drawing + block shadow. Each glyph: 5 rows.
@@ -1130,6 +1138,154 @@ def render_with_extras(text, extras=None, font_dict=None, spacing=0):
     return '\n'.join(lines)
 
 
+# =============================================================================
+# COMPILED GLYPH TABLES
+# The dicts above are the source of truth (easy to read and edit). For
+# measuring and rendering names, each font is compiled once, on first use,
+# into flat tables: a width per glyph and, per row, one string holding
+# every glyph's row back to back (the atlas) with each glyph's start.
+# =============================================================================
+
+# Font key → glyph dict
+FONTS = {"5row": FONT_5ROW, "4row": FONT_4ROW}
+
+
+class GlyphTable(NamedTuple):
+    """One font, compiled. Glyph i is keys[i]; see glyph_table()."""
+    rows: int
+    keys: tuple            # glyph keys ('A', ' ', 'CURSOR', ...)
+    index: dict            # glyph key → glyph number
+    widths: tuple          # glyph number → width (widest row)
+    atlas: tuple           # row → every glyph's row, concatenated
+    starts: tuple          # row → glyph number → start in atlas[row] (+ end)
+    row_maps: tuple        # row → {ord(ch): glyph row} for str.translate
+    char_widths: dict      # character → width (single-character glyphs)
+    ragged: frozenset      # characters whose rows differ in width
+    space: str             # stand-in for characters the font lacks
+
+
+_TABLES: dict[str, GlyphTable] = {}
+
+
+def glyph_table(font="5row"):
+    """Return the compiled table of FONTS[font], compiling it on first use."""
+    table = _TABLES.get(font)
+    if table is not None:
+        return table
+    glyphs = FONTS[font]
+    rows = len(next(iter(glyphs.values())))
+    keys = tuple(glyphs)
+    space = ' ' if ' ' in glyphs else None
+    atlas, starts, row_maps = [], [], []
+    for row in range(rows):
+        parts = [glyphs[k][row] for k in keys]
+        offsets = [0]
+        for part in parts:
+            offsets.append(offsets[-1] + len(part))
+        atlas.append("".join(parts))
+        starts.append(tuple(offsets))
+        row_maps.append({ord(k): glyphs[k][row] for k in keys if len(k) == 1})
+    widths = tuple(max(len(r) for r in glyphs[k]) for k in keys)
+    table = GlyphTable(
+        rows=rows,
+        keys=keys,
+        index={k: i for i, k in enumerate(keys)},
+        widths=widths,
+        atlas=tuple(atlas),
+        starts=tuple(starts),
+        row_maps=tuple(row_maps),
+        char_widths={k: w for k, w in zip(keys, widths) if len(k) == 1},
+        ragged=frozenset(
+            k for k in keys if len(k) == 1 and len({len(r) for r in glyphs[k]}) > 1
+        ),
+        space=space,
+    )
+    _TABLES[font] = table
+    return table
+
+
+def glyph_rows(table, key):
+    """The rows of one glyph, sliced out of the atlas."""
+    i = table.index[key]
+    return [table.atlas[r][s[i]:s[i + 1]] for r, s in enumerate(table.starts)]
+
+
+def _known_text(text, table):
+    """text.upper() with characters the font lacks replaced by a space
+    (render()'s fallback; with no space glyph they render as nothing)."""
+    text = text.upper()
+    known = table.char_widths
+    if all(ch in known for ch in text):
+        return text
+    return "".join(ch if ch in known else (table.space or "") for ch in text)
+
+
+def measure(name, font="5row", spacing=0):
+    """Width in columns of *name* rendered in *font*, without rendering it.
+
+    Equal to len(render_many([name], font, spacing)[0][0]). A negative
+    spacing overlaps neighbouring glyphs by that many columns.
+    """
+    table = glyph_table(font)
+    text = _known_text(name, table)
+    gaps = spacing * max(0, len(text) - 1)
+    if table.ragged.isdisjoint(text):
+        return max(0, sum(map(table.char_widths.__getitem__, text)) + gaps)
+    # A ragged glyph: the widest row decides (render pads the others)
+    return max(
+        max(0, sum(len(row_map[ord(ch)]) for ch in text) + gaps)
+        for row_map in table.row_maps
+    )
+
+
+def _overlap(left, right, columns):
+    """Join two rows, the last *columns* of left under the first of right
+    (a non-blank cell of right wins)."""
+    if columns <= 0 or not left:
+        return left + right
+    columns = min(columns, len(left), len(right))
+    merged = "".join(
+        r if r != ' ' else l
+        for l, r in zip(left[len(left) - columns:], right[:columns])
+    )
+    return left[:len(left) - columns] + merged + right[columns:]
+
+
+def render_many(names, font="5row", spacing=0):
+    """Render each name in *font*; returns one list of rows per name.
+
+    Rows are padded with spaces to the same width. Same glyphs and
+    fallback as render(), but each row of a name is built by one
+    str.translate over the compiled row tables.
+    """
+    table = glyph_table(font)
+    if spacing > 0:
+        spacer = " " * spacing
+        row_maps = [
+            {c: glyph + spacer for c, glyph in row_map.items()}
+            for row_map in table.row_maps
+        ]
+    else:
+        row_maps = table.row_maps
+    rendered = []
+    for name in names:
+        text = _known_text(name, table)
+        if spacing < 0:
+            lines = []
+            for row_map in table.row_maps:
+                line = ""
+                for ch in text:
+                    line = _overlap(line, row_map[ord(ch)], -spacing)
+                lines.append(line)
+        else:
+            lines = [text.translate(row_map) for row_map in row_maps]
+            if spacing and text:
+                lines = [line[:-spacing] for line in lines]
+        width = max(map(len, lines))
+        rendered.append([line.ljust(width) for line in lines])
+    return rendered
+
+
 # =============================================================================
 # DEMO
 # =============================================================================
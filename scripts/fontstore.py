@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+fontstore.py — Provide the Iosevka fonts from a checksummed, shared store.
+
+The 15 TTFs the preamble can load come from three Iosevka release zips.
+Every file is kept once, by SHA-256, in a font store shared by all
+workspaces on the machine; fonts/iosevka/ only holds hard links (or
+copies, across filesystems) into it. A fresh workspace is therefore
+provisioned without downloading or unzipping anything, and an unchanged
+one is checked from a stamp file without hashing a byte.
+
+    <store>/objects/<sha256>   — font files, content-addressed
+    <store>/archives/<zip>     — release zips (downloaded, or put here by
+                                 hand for offline builds)
+    <store>/.lock              — flock: parallel jobs fill the store once
+
+Checksums are pinned per IOSEVKA_VERSION in scripts/fonts-manifest.json.
+A pinned zip or font that hashes differently is rejected, and only files
+matching a pin enter the store. An unpinned version still works (with a
+warning) but bypasses the store: nothing vouches for its files, so they
+stay in fonts/iosevka/ and are not shared. Its zips are still kept in
+<store>/archives/, so other workspaces and --offline builds reuse them
+instead of downloading again; `fontstore.py pin` checks them and records
+their hashes. Zips missing from the store are downloaded concurrently, and the
+fonts in each zip are extracted and hashed concurrently.
+
+Usage:
+    fontstore.py                 — provide fonts/iosevka/ (the build step)
+    fontstore.py --offline       — never download; zips must be in
+                                   <store>/archives/ or $CV_FONT_ARCHIVES
+    fontstore.py pin             — write this version's hashes to the
+                                   manifest (commit the result)
+    fontstore.py --version       — print IOSEVKA_VERSION
+
+Environment:
+    CV_FONT_STORE     store directory (default: $XDG_CACHE_HOME/cv-fonts,
+                      i.e. ~/.cache/cv-fonts; docker-compose.yml mounts one)
+    CV_FONT_ARCHIVES  extra directory searched for the release zips
+    CV_FONT_OFFLINE=1 same as --offline
+
+Outputs:
+    fonts/iosevka/*.ttf          — links into the store
+    fonts/iosevka/.fontstore     — stamp: version, hash and size per file
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import urllib.request
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# ---------------------------------------------------------------------------
+# Shared infrastructure — single source of truth
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lib.config import ROOT, die  # noqa: E402
+from lib import trace  # noqa: E402
+
+IOSEVKA_VERSION = "34.1.0"
+
+FONT_DIR = ROOT / "fonts" / "iosevka"
+STAMP_PATH = FONT_DIR / ".fontstore"
+MANIFEST_PATH = ROOT / "scripts" / "fonts-manifest.json"
+BASE_URL = "https://github.com/be5invis/Iosevka/releases/download/v{version}/{archive}"
+
+# Release zip (without "-<version>.zip") → the files we need from it
+ARCHIVE_FILES: dict[str, tuple[str, ...]] = {
+    # base monospace family
+    "PkgTTF-Iosevka": (
+        "Iosevka-Extended.ttf", "Iosevka-ExtendedBold.ttf",
+        "Iosevka-ExtendedItalic.ttf", "Iosevka-ExtendedBoldItalic.ttf",
+        "Iosevka-BoldItalic.ttf",
+    ),
+    # proportional sans-serif
+    "PkgTTF-IosevkaAile": (
+        "IosevkaAile-Regular.ttf", "IosevkaAile-Bold.ttf",
+        "IosevkaAile-Italic.ttf", "IosevkaAile-BoldItalic.ttf",
+        "IosevkaAile-SemiBold.ttf",
+    ),
+    # proportional serif
+    "PkgTTF-IosevkaEtoile": (
+        "IosevkaEtoile-Regular.ttf", "IosevkaEtoile-Bold.ttf",
+        "IosevkaEtoile-Italic.ttf", "IosevkaEtoile-BoldItalic.ttf",
+        "IosevkaEtoile-SemiBold.ttf",
+    ),
+}
+
+
+def archive_name(family: str) -> str:
+    return f"{family}-{IOSEVKA_VERSION}.zip"
+
+
+def default_store() -> Path:
+    if store := os.environ.get("CV_FONT_STORE"):
+        return Path(store)
+    cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache) / "cv-fonts"
+
+
+# =============================================================================
+# Manifest and stamp
+# =============================================================================
+
+def load_manifest() -> dict[str, dict[str, dict[str, str]]]:
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        die(f"{MANIFEST_PATH}: {exc}")
+
+
+def pins() -> dict[str, dict[str, str]]:
+    """This version's pinned hashes: {"archives": {...}, "files": {...}}."""
+    entry = load_manifest().get(IOSEVKA_VERSION) or {}
+    return {"archives": entry.get("archives", {}), "files": entry.get("files", {})}
+
+
+def read_stamp() -> dict[str, list]:
+    """{file: [sha256, size]} for the current version, or {}."""
+    try:
+        stamp = json.loads(STAMP_PATH.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return stamp.get("files", {}) if stamp.get("version") == IOSEVKA_VERSION else {}
+
+
+def write_stamp(files: dict[str, list]) -> None:
+    tmp = STAMP_PATH.with_name(f"{STAMP_PATH.name}.{os.getpid()}.tmp")
+    tmp.write_text(
+        json.dumps({"version": IOSEVKA_VERSION, "files": files}, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    tmp.replace(STAMP_PATH)
+
+
+def stamp_is_current(pinned: dict[str, str]) -> bool:
+    """Every font present with the size (and pinned hash) recorded."""
+    stamp = read_stamp()
+    for files in ARCHIVE_FILES.values():
+        for name in files:
+            entry = stamp.get(name)
+            if entry is None or name in pinned and pinned[name] != entry[0]:
+                return False
+            path = FONT_DIR / name
+            if not path.exists() or path.stat().st_size != entry[1]:
+                return False
+    return True
+
+
+# =============================================================================
+# Store
+# =============================================================================
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@contextmanager
+def locked(store: Path) -> Iterator[None]:
+    """Hold the store's exclusive lock (waits for other jobs)."""
+    store.mkdir(parents=True, exist_ok=True)
+    with (store / ".lock").open("a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def put_object(store: Path, data: bytes, sha: str) -> Path:
+    """Write *data* to the store under its hash (atomically)."""
+    obj = store / "objects" / sha
+    if not obj.exists():
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=obj.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, obj)
+    return obj
+
+
+def link_into_workspace(obj: Path, name: str) -> None:
+    """Point fonts/iosevka/<name> at a store object."""
+    FONT_DIR.mkdir(parents=True, exist_ok=True)
+    dest = FONT_DIR / name
+    tmp = dest.with_name(f"{name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(obj, tmp)
+    except OSError:  # store on another filesystem (e.g. a Docker volume)
+        shutil.copyfile(obj, tmp)
+    tmp.replace(dest)
+
+
+def find_archive(
+    store: Path,
+    archive: str,
+    offline: bool,
+    pinned: dict[str, str],
+) -> Path:
+    """Return a verified release zip, downloading it to <store>/archives/
+    if allowed. A stored zip that fails its pin is deleted."""
+    candidates = [store / "archives" / archive]
+    if extra := os.environ.get("CV_FONT_ARCHIVES"):
+        candidates.append(Path(extra) / archive)
+    path = next((p for p in candidates if p.exists()), None)
+    if path is None:
+        if offline:
+            die(f"{archive} not found (offline) — put it in "
+                f"{store / 'archives'} or $CV_FONT_ARCHIVES")
+        path = store / "archives" / archive
+        path.parent.mkdir(parents=True, exist_ok=True)
+        url = BASE_URL.format(version=IOSEVKA_VERSION, archive=archive)
+        print(f"  Fetching {archive}...")
+        tmp = path.with_name(f"{archive}.{os.getpid()}.tmp")
+        try:
+            with trace.span("download", archive=archive):
+                with urllib.request.urlopen(url, timeout=60) as response, tmp.open("wb") as f:
+                    shutil.copyfileobj(response, f, 1 << 20)
+        except OSError as exc:
+            tmp.unlink(missing_ok=True)
+            die(f"downloading {url} failed: {exc}")
+        tmp.replace(path)
+    if archive in pinned:
+        sha = sha256_file(path)
+        if sha != pinned[archive]:
+            if path.parent == store / "archives":
+                path.unlink()
+            die(f"{archive}: SHA-256 {sha} does not match the pinned "
+                f"{pinned[archive]} in {MANIFEST_PATH.name}")
+    return path
+
+
+def check_archive(path: Path) -> None:
+    """Die (deleting *path*) unless every member of the zip reads back
+    with its CRC."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            bad = zf.testzip()
+    except (OSError, zipfile.BadZipFile) as exc:
+        bad = str(exc)
+    if bad is not None:
+        path.unlink()
+        die(f"{path} is damaged ({bad}) — deleted it, run again to download it")
+
+
+def write_workspace(name: str, data: bytes) -> None:
+    """Write fonts/iosevka/<name> itself, bypassing the store (atomically)."""
+    FONT_DIR.mkdir(parents=True, exist_ok=True)
+    dest = FONT_DIR / name
+    tmp = dest.with_name(f"{name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(dest)
+
+
+def extract(
+    store: Path | None, zip_path: Path, names: tuple[str, ...], pinned: dict[str, str]
+) -> dict[str, str]:
+    """Copy *names* out of *zip_path* into the store, concurrently.
+
+    With *store* None (unpinned version), the files go straight into
+    fonts/iosevka/ instead. Returns {name: sha256}. Each worker opens the
+    zip itself, so the inflating (which releases the GIL) runs in parallel.
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        members = {Path(m).name: m for m in zf.namelist()}
+    for name in names:
+        if name not in members:
+            die(f"{name} not found in {zip_path.name}")
+
+    def one(name: str) -> tuple[str, str]:
+        with zipfile.ZipFile(zip_path) as zf:
+            data = zf.read(members[name])
+        sha = hashlib.sha256(data).hexdigest()
+        if name in pinned and sha != pinned[name]:
+            die(f"{name} in {zip_path.name}: SHA-256 {sha} does not match "
+                f"the pinned {pinned[name]}")
+        if store is None:
+            write_workspace(name, data)
+        else:
+            put_object(store, data, sha)
+        return name, sha
+
+    with ThreadPoolExecutor(max_workers=min(len(names), os.cpu_count() or 1)) as pool:
+        return dict(pool.map(one, names))
+
+
+def collect(store: Path, families: list[str], offline: bool, pins_: dict) -> dict[str, str]:
+    """Fill the store from the given families' zips; {file: sha256}."""
+    def one(family: str) -> dict[str, str]:
+        zip_path = find_archive(store, archive_name(family), offline, pins_["archives"])
+        return extract(store, zip_path, ARCHIVE_FILES[family], pins_["files"])
+
+    hashes: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=len(families) or 1) as pool:
+        for result in pool.map(one, families):
+            hashes.update(result)
+    return hashes
+
+
+# =============================================================================
+# Commands
+# =============================================================================
+
+def provide_unpinned(store: Path, offline: bool) -> None:
+    """Provide fonts/iosevka/ for a version without pins, store untouched.
+
+    Files already in fonts/iosevka/ are kept as they are; missing ones are
+    unpacked from the release zips (found in <store>/archives/ or
+    $CV_FONT_ARCHIVES, or downloaded to <store>/archives/ for the next
+    workspace). No font enters <store>/objects/.
+    """
+    print(f"WARNING: Iosevka v{IOSEVKA_VERSION} has no pinned checksums — "
+          f"not using the font store ({store}). Run "
+          f"`python3 scripts/fontstore.py pin` and commit {MANIFEST_PATH.name}")
+    missing = [
+        family for family, names in ARCHIVE_FILES.items()
+        if not all((FONT_DIR / name).exists() for name in names)
+    ]
+    if missing:
+        print(f"Unpacking Iosevka v{IOSEVKA_VERSION} into {FONT_DIR.relative_to(ROOT)}/...")
+        with locked(store), trace.span("unpack fonts", archives=len(missing)):
+            for family in missing:
+                zip_path = find_archive(store, archive_name(family), offline, {})
+                extract(None, zip_path, ARCHIVE_FILES[family], {})
+
+    stamp = {}
+    for names in ARCHIVE_FILES.values():
+        for name in names:
+            path = FONT_DIR / name
+            stamp[name] = [sha256_file(path), path.stat().st_size]
+    write_stamp(stamp)
+    print(f"All {len(stamp)} font files in {FONT_DIR.relative_to(ROOT)}/ (unpinned).")
+
+
+def provide(store: Path, offline: bool) -> None:
+    """Make fonts/iosevka/ match the pinned (or stored) fonts."""
+    pins_ = pins()
+    if stamp_is_current(pins_["files"]):
+        print(f"Fonts already present in {FONT_DIR.relative_to(ROOT)}/ — nothing to do.")
+        return
+    if not pins_["files"]:
+        provide_unpinned(store, offline)
+        return
+
+    with locked(store):
+        # Another job may have finished while we waited for the lock
+        if stamp_is_current(pins_["files"]):
+            print(f"Fonts already present in {FONT_DIR.relative_to(ROOT)}/ — nothing to do.")
+            return
+
+        hashes: dict[str, str] = {}
+        missing: list[str] = []
+        for family, names in ARCHIVE_FILES.items():
+            for name in names:
+                local = FONT_DIR / name
+                sha = pins_["files"].get(name)
+                obj = store / "objects" / sha if sha else None
+                if obj and obj.exists():
+                    # Objects are read-only, but a hard link is still one
+                    # `>>` away from editing the store: check before reuse
+                    if sha256_file(obj) == sha:
+                        hashes[name] = sha
+                        continue
+                    print(f"  {obj} is corrupt — replacing it")
+                    obj.unlink()
+                if sha and local.exists():
+                    # A copy from an earlier build, or put there by hand:
+                    # it enters the store only if it matches its pin
+                    data = local.read_bytes()
+                    if hashlib.sha256(data).hexdigest() == sha:
+                        hashes[name] = put_object(store, data, sha).name
+                        continue
+                if family not in missing:
+                    missing.append(family)
+        trace.count("font files from store", len(hashes))
+
+        if missing:
+            print(f"Filling the font store ({store}) with Iosevka v{IOSEVKA_VERSION}...")
+            with trace.span("fill font store", archives=len(missing)):
+                hashes.update(collect(store, missing, offline, pins_))
+
+        stamp = {}
+        for name, sha in hashes.items():
+            obj = store / "objects" / sha
+            link_into_workspace(obj, name)
+            stamp[name] = [sha, obj.stat().st_size]
+        write_stamp(stamp)
+
+    print(f"All {len(stamp)} font files linked into {FONT_DIR.relative_to(ROOT)}/ from {store}.")
+
+
+def pin(store: Path, offline: bool) -> None:
+    """Record this version's archive and file hashes in the manifest.
+
+    Zips already in <store>/archives/ (kept by unpinned builds) are
+    checked against their own CRCs first; a damaged one is deleted.
+    """
+    with locked(store):
+        for family in ARCHIVE_FILES:
+            path = store / "archives" / archive_name(family)
+            if path.exists():
+                check_archive(path)
+        hashes = collect(store, list(ARCHIVE_FILES), offline, {"archives": {}, "files": {}})
+        archives = {}
+        for family in ARCHIVE_FILES:
+            archive = archive_name(family)
+            archives[archive] = sha256_file(find_archive(store, archive, True, {}))
+    manifest = load_manifest()
+    manifest[IOSEVKA_VERSION] = {
+        "archives": dict(sorted(archives.items())),
+        "files": dict(sorted(hashes.items())),
+    }
+    MANIFEST_PATH.write_text(
+        json.dumps(dict(sorted(manifest.items())), indent=2) + "\n", encoding="utf-8"
+    )
+    print(f"Pinned {len(archives)} archives and {len(hashes)} fonts of "
+          f"Iosevka v{IOSEVKA_VERSION} in {MANIFEST_PATH.relative_to(ROOT)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Provide the Iosevka fonts from the shared, checksummed font store."
+    )
+    parser.add_argument(
+        "command", nargs="?", choices=("fetch", "pin"), default="fetch",
+        help="fetch: provide fonts/iosevka/ (default); pin: record checksums",
+    )
+    parser.add_argument(
+        "--offline", action="store_true",
+        default=os.environ.get("CV_FONT_OFFLINE") == "1",
+        help="never download (CV_FONT_OFFLINE=1)",
+    )
+    parser.add_argument(
+        "--store", type=Path, default=default_store(),
+        help="font store directory (CV_FONT_STORE, default ~/.cache/cv-fonts)",
+    )
+    parser.add_argument(
+        "--version", action="version", version=IOSEVKA_VERSION,
+        help="print IOSEVKA_VERSION and exit",
+    )
+    args = parser.parse_args()
+
+    if args.command == "pin":
+        pin(args.store, args.offline)
+    else:
+        provide(args.store, args.offline)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--version"]:  # the Dockerfile's cache key, not a stage
+        print(IOSEVKA_VERSION)
+        sys.exit(0)
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
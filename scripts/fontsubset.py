@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+fontsubset.py — Load only the font faces and glyphs the CV uses.
+
+engine/preamble.tex declares three families (\\setmonofont, \\setmainfont,
+\\setsansfont) with four shapes each, from the full Iosevka TTFs. This step
+scans the generated content, the engine templates and layout.yaml for the
+families, shapes and characters that can actually appear, subsets each face
+that is needed to those characters (fontTools) and writes the same
+declarations, pointing at the subsets, to generated/fonts.tex. The preamble
+loads that file instead of its own declarations when it exists.
+
+What is kept:
+    families — mono and main always (the grid and the body text); sans
+               only if something selects it (\\etoile, \\sffamily, \\textsf)
+    shapes   — bold / italic only if a bold / italic macro appears; an
+               unused shape is declared as the upright (or bold) file, so
+               nothing falls back to another font
+    glyphs   — printable ASCII, common typographic punctuation, every
+               character in the scanned files and their upper/lower case
+               forms; all OpenType layout features are kept, so ligatures,
+               kerning and metrics are unchanged
+
+Subsets are cached in build/cache/fonts/<key>/, keyed by the glyph set, the
+faces (file name, size, font revision) and SUBSET_VERSION. An unchanged CV
+reuses them without opening a font.
+
+Set CV_FONT_SUBSET=0, or run without fontTools installed, to load the full
+fonts as declared in the preamble (generated/fonts.tex is removed).
+
+Inputs:
+    engine/preamble.tex, engine/*.tex, generated/*.tex, content/layout.yaml
+    fonts/iosevka/*.ttf   — scripts/fontstore.py
+
+Outputs:
+    generated/fonts.tex          — font declarations (read by preamble.tex §3)
+    build/cache/fonts/<key>/     — subsetted faces
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Shared infrastructure — single source of truth
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lib.config import (  # noqa: E402
+    ROOT,
+    CACHE_DIR,
+    FONTS_TEX_PATH,
+    GENERATED_DIR,
+    LAYOUT_YAML,
+    PREAMBLE_PATH,
+    die,
+)
+from lib import trace  # noqa: E402
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+except ImportError:  # optional: without it the full fonts are loaded
+    subset = None
+
+# Bump when the subsetting options change so old subsets miss.
+SUBSET_VERSION = 1
+
+FONT_CACHE_DIR = CACHE_DIR / "fonts"
+
+# \setmonofont{Name}[Key=Value, ...] in the preamble
+_FONT_DECL_RE = re.compile(r"\\set(mono|main|sans)font\{([^}]+)\}\[(.*?)\]", re.S)
+
+# Macros that select a family or shape (comments are stripped first)
+_SANS_RE = re.compile(r"\\(?:etoile|sffamily|textsf)\b")
+_BOLD_RE = re.compile(r"\\(?:textbf|bfseries)\b")
+_ITALIC_RE = re.compile(r"\\(?:textit|itshape|emph|textsl|slshape)\b")
+
+# The family shortcut definitions themselves do not select anything
+_SHORTCUT_DEF_RE = re.compile(r"\\newcommand\{\\(?:mono|aile|etoile)\}.*")
+
+# Characters TeX produces from ASCII input (--, ``, \textbullet, ...)
+TYPOGRAPHIC = "–—‘’“”•…·"
+
+SHAPES = ("UprightFont", "BoldFont", "ItalicFont", "BoldItalicFont")
+
+
+# =============================================================================
+# Scanning
+# =============================================================================
+
+def _strip_comments(text: str) -> str:
+    """Remove TeX comments (an unescaped % to the end of the line)."""
+    return re.sub(r"(?<!\\)%.*", "", text)
+
+
+def scanned_sources() -> dict[Path, str]:
+    """Every file whose text can reach the page."""
+    paths = [
+        *sorted((ROOT / "engine").glob("*.tex")),
+        *sorted(GENERATED_DIR.glob("*.tex")),
+        LAYOUT_YAML,
+    ]
+    skip = {FONTS_TEX_PATH, ROOT / "engine" / "fontwarm.tex"}
+    return {
+        path: path.read_text(encoding="utf-8")
+        for path in paths
+        if path.exists() and path not in skip
+    }
+
+
+def glyph_set(sources: dict[Path, str]) -> str:
+    """Return the sorted characters the subsets must keep."""
+    chars = {chr(c) for c in range(0x20, 0x7F)} | set(TYPOGRAPHIC)
+    for text in sources.values():
+        chars.update(text)
+    for ch in list(chars):
+        for variant in (ch.upper(), ch.lower()):
+            if len(variant) == 1:
+                chars.add(variant)
+    return "".join(sorted(ch for ch in chars if ch.isprintable()))
+
+
+def used_features(sources: dict[Path, str]) -> dict[str, bool]:
+    """Which optional family and shapes anything selects."""
+    text = "\n".join(
+        _SHORTCUT_DEF_RE.sub("", _strip_comments(t)) for t in sources.values()
+    )
+    return {
+        "sans": bool(_SANS_RE.search(text)),
+        "bold": bool(_BOLD_RE.search(text)),
+        "italic": bool(_ITALIC_RE.search(text)),
+    }
+
+
+# =============================================================================
+# Declarations
+# =============================================================================
+
+def font_declarations() -> list[tuple[str, str, list[tuple[str, str]]]]:
+    """Parse the preamble's \\set...font declarations.
+
+    Returns (family, font name, [(key, value), ...]) in preamble order.
+    """
+    text = _strip_comments(PREAMBLE_PATH.read_text(encoding="utf-8"))
+    decls = []
+    for family, name, body in _FONT_DECL_RE.findall(text):
+        options = []
+        for item in body.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            key, _, value = item.partition("=")
+            options.append((key.strip(), value.strip()))
+        decls.append((family, name.strip(), options))
+    if not decls:
+        die(f"no \\set...font declarations found in {PREAMBLE_PATH}")
+    return decls
+
+
+def pick_shapes(options: dict[str, str], features: dict[str, bool]) -> dict[str, str]:
+    """Map each shape to the file pattern it loads; unused shapes reuse one."""
+    shapes = {s: options[s] for s in SHAPES if s in options}
+    upright = shapes.get("UprightFont", "*")
+    if not features["bold"]:
+        shapes["BoldFont"] = upright
+    if not features["italic"]:
+        shapes["ItalicFont"] = upright
+        shapes["BoldItalicFont"] = shapes.get("BoldFont", upright)
+    elif not features["bold"]:
+        shapes["BoldItalicFont"] = shapes.get("ItalicFont", upright)
+    return shapes
+
+
+def face_path(name: str, options: dict[str, str], pattern: str) -> Path:
+    """The font file a shape pattern resolves to (fontspec's * rule)."""
+    return ROOT / options.get("Path", "") / (
+        pattern.replace("*", name) + options.get("Extension", "")
+    )
+
+
+# =============================================================================
+# Subsetting
+# =============================================================================
+
+def _font_revision(path: Path) -> str:
+    """head.fontRevision, read without loading the glyphs."""
+    font = TTFont(path, lazy=True)
+    try:
+        return f"{font['head'].fontRevision:.5f}"
+    finally:
+        font.close()
+
+
+def subset_key(faces: list[Path], glyphs: str) -> str:
+    """Cache key of one set of subsets."""
+    h = hashlib.sha256(f"fontsubset-v{SUBSET_VERSION}".encode())
+    h.update(glyphs.encode())
+    for face in faces:
+        h.update(f"\0{face.name}:{face.stat().st_size}:{_font_revision(face)}".encode())
+    return h.hexdigest()[:16]
+
+
+def subset_face(face: Path, out_path: Path, glyphs: str) -> None:
+    """Write *face* cut down to *glyphs*, layout features and names kept."""
+    options = subset.Options()
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+    options.notdef_outline = True
+    # Tables fontTools cannot subset are dropped; that is expected, not news
+    logging.getLogger("fontTools.subset").setLevel(logging.ERROR)
+    font = TTFont(face)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[ord(ch) for ch in glyphs])
+    subsetter.subset(font)
+    tmp = out_path.with_suffix(".tmp")
+    font.save(tmp)
+    font.close()
+    tmp.replace(out_path)
+
+
+# =============================================================================
+# Output
+# =============================================================================
+
+def fonts_tex(
+    decls: list[tuple[str, str, list[tuple[str, str]]]],
+    features: dict[str, bool],
+    font_dir: Path,
+    glyph_count: int,
+) -> str:
+    """The content of generated/fonts.tex."""
+    lines = [
+        "% !! AUTO-GENERATED by scripts/fontsubset.py — DO NOT EDIT !!",
+        "% Source: engine/preamble.tex §3, subsetted to "
+        f"{glyph_count} characters",
+        "",
+    ]
+    for family, name, option_list in decls:
+        if family == "sans" and not features["sans"]:
+            lines.append(f"% \\set{family}font{{{name}}}: unused, not loaded")
+            lines.append("")
+            continue
+        options = dict(option_list)
+        shapes = pick_shapes(options, features)
+        lines.append(f"\\set{family}font{{{name}}}[")
+        for key, value in option_list:
+            if key == "Path":
+                value = f"{font_dir.relative_to(ROOT).as_posix()}/"
+            elif key in shapes:
+                value = shapes[key]
+            lines.append(f"    {key}={value},")
+        for key in SHAPES:
+            if key in shapes and key not in options:
+                lines.append(f"    {key}={shapes[key]},")
+        lines.append("]")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main() -> None:
+    if os.environ.get("CV_FONT_SUBSET", "1") == "0" or subset is None:
+        FONTS_TEX_PATH.unlink(missing_ok=True)
+        reason = "CV_FONT_SUBSET=0" if subset is not None else "fontTools not installed"
+        print(f"Loading the full fonts ({reason})")
+        return
+
+    sources = scanned_sources()
+    glyphs = glyph_set(sources)
+    features = used_features(sources)
+    decls = font_declarations()
+
+    faces: list[Path] = []
+    for family, name, option_list in decls:
+        if family == "sans" and not features["sans"]:
+            continue
+        options = dict(option_list)
+        for pattern in pick_shapes(options, features).values():
+            path = face_path(name, options, pattern)
+            if not path.exists():
+                die(f"{path} not found. Run scripts/fontstore.py first.")
+            if path not in faces:
+                faces.append(path)
+
+    font_dir = FONT_CACHE_DIR / subset_key(faces, glyphs)
+    misses = [face for face in faces if not (font_dir / face.name).exists()]
+    trace.count("font subsets cached", len(faces) - len(misses))
+    trace.count("font subsets made", len(misses))
+    if misses:
+        font_dir.mkdir(parents=True, exist_ok=True)
+        print(f"Subsetting {len(misses)} of {len(faces)} face(s) to {len(glyphs)} characters...")
+        with trace.span("subset fonts", faces=len(misses)):
+            with ProcessPoolExecutor(max_workers=min(len(misses), os.cpu_count() or 1)) as pool:
+                list(pool.map(
+                    subset_face, misses,
+                    [font_dir / face.name for face in misses],
+                    [glyphs] * len(misses),
+                ))
+        for face in misses:
+            print(f"  {face.name}: {face.stat().st_size // 1024} KB → "
+                  f"{(font_dir / face.name).stat().st_size // 1024} KB")
+    else:
+        print(f"All {len(faces)} font subsets cached")
+
+    FONTS_TEX_PATH.write_text(
+        fonts_tex(decls, features, font_dir, len(glyphs)), encoding="utf-8"
+    )
+    print(f"  Generated {FONTS_TEX_PATH.relative_to(ROOT)} "
+          f"({len(faces)} faces, {font_dir.relative_to(ROOT)})")
+
+
+if __name__ == "__main__":
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
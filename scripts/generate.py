@@ -11,7 +11,11 @@ Reads:
     content/education.yaml
     content/skills.yaml
     content/certifications.yaml
-    content/publications.yaml
+    content/publications.yaml  (+ any .bib / CSL-JSON files it references)
+    engine/params.yaml         (layout parameters, via lib/params.py)
+    generated/fit.json         (optional — margin + grid font from scripts/fit.py)
+    generated/header.json      (optional — header theme from scripts/header.py)
+    generated/prune.json       (optional — items dropped by scripts/prune.py)
 
 Writes (designed CV — consumed by generated/canvas.tex):
     generated/contact.tex
@@ -24,18 +28,24 @@ Writes (designed CV — consumed by generated/canvas.tex):
     generated/certifications.tex
     generated/publications.tex
     generated/settings.tex
+    generated/params.tex
     generated/.build-meta
 
-Writes (ATS CV — self-contained):
+Writes (ATS CV — self-contained, streamed chunk by chunk):
     main_ats.tex
 
+Environment:
+    CV_PROFILE=1   enable the TeX profiler (engine/profile.tex) via settings.tex
+
 Requires: PyYAML (installed via apt in Docker).
 """
 
 from __future__ import annotations
 
+import os
 import re
 import sys
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 try:
@@ -50,7 +60,14 @@ except ImportError:
 
 # Import shared constants — single source of truth for valid themes.
 sys.path.insert(0, str(Path(__file__).resolve().parent))
-from lib.config import ROOT, CONTENT_DIR, GENERATED_DIR, VALID_HEADER_THEMES  # noqa: E402
+from lib.config import (  # noqa: E402
+    ROOT, CONTENT_DIR, GENERATED_DIR, PARAMS_TEX_PATH, VALID_HEADER_THEMES,
+    load_fit, load_header_fit,
+)
+from lib.bibliography import publications_from_source  # noqa: E402
+from lib.params import load_snapshot  # noqa: E402
+from lib.priority import apply_drops, item_text, load_drops  # noqa: E402
+from lib import trace  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # Paths
@@ -78,6 +95,23 @@ def load_yaml(name: str) -> dict:
     return data if data else {}
 
 
+def load_publications() -> dict:
+    """Load content/publications.yaml, resolving an optional `source:` block.
+
+    Entries produced from .bib / CSL-JSON files (see lib/bibliography.py)
+    are appended after any hand-written `entries`, so both CV generators
+    receive one uniform {authors, title, venue, year} list.
+    """
+    data = load_yaml("publications")
+    source = data.get("source")
+    if not source:
+        return data
+    entries = list(data.get("entries") or [])
+    entries.extend(publications_from_source(source))
+    print(f"  Loaded {len(entries)} publication(s) (bibliography source)")
+    return {**data, "entries": entries}
+
+
 def has_entries(data: dict) -> bool:
     """Return True if data has a non-empty 'entries' list."""
     entries = data.get("entries", [])
@@ -161,8 +195,24 @@ def expand_acronyms(text: str, acronyms: dict[str, str], seen: set[str]) -> str:
 #  Settings and build metadata
 # ═══════════════════════════════════════════════════════════════════
 
-def gen_settings(contact: dict) -> str:
-    """Generate generated/settings.tex with paper format and margin."""
+# Feature flags for engine/preamble.tex §1: a feature's packages are only
+# loaded when a generated content file uses one of its macros.
+PACKAGE_FEATURES = {
+    "CVUsesLinks": re.compile(r"\\(?:href|url|hyperlink)\b"),
+    "CVUsesIcons": re.compile(r"\\fa(?:Icon\b|[A-Z])"),
+    "CVUsesVerbatim": re.compile(r"\\Verb\b|\\begin\{Verbatim\}"),
+    "CVUsesDrawing": re.compile(r"\\tikz\b|\\begin\{tikzpicture\}"),
+}
+
+
+def content_features(components: Iterable[str]) -> list[str]:
+    """Return the PACKAGE_FEATURES flags the designed components need."""
+    text = "\n".join(components)
+    return [flag for flag, pattern in PACKAGE_FEATURES.items() if pattern.search(text)]
+
+
+def gen_settings(contact: dict, features: Iterable[str] = ()) -> str:
+    """Generate generated/settings.tex with paper format, margin and features."""
     paper_size = contact.get("paper_size", "a4").lower()
     if paper_size not in ("a4", "letter"):
         print(f"WARNING: unknown paper_size '{paper_size}', defaulting to a4",
@@ -181,6 +231,13 @@ def gen_settings(contact: dict) -> str:
               file=sys.stderr)
         margin = default_margin
 
+    # scripts/fit.py may have chosen the margin and grid font size
+    fit = load_fit()
+    if fit:
+        margin = fit["margin"]
+        print(f"  Using fitted margin {margin} mm, grid font "
+              f"{fit['font_size']:g} pt (generated/fit.json)")
+
     # Header theme — required, no default
     header_theme_raw = contact.get("header_theme")
     if not header_theme_raw:
@@ -199,10 +256,23 @@ def gen_settings(contact: dict) -> str:
         )
         sys.exit(1)
 
+    # scripts/header.py may have fallen back to a narrower header
+    header = load_header_fit(header_theme)
+    if header and header["theme"] != header_theme:
+        print(f"  Using the {header['theme']} header instead of {header_theme} "
+              "(generated/header.json)")
+        header_theme = header["theme"]
+
     lines = [GENERATED_HEADER.format(source="contact")]
     lines.append(f"\\def\\PageFormat{{{paper_size}}}")
     lines.append(f"\\def\\PageMarginMM{{{margin}}}")
     lines.append(f"\\def\\HeaderTheme{{{header_theme}}}")
+    if fit:
+        lines.append(f"\\def\\GridFontSizeFit{{{fit['font_size']:g}}}")
+    for flag in features:
+        lines.append(f"\\def\\{flag}{{1}}")
+    if os.environ.get("CV_PROFILE") == "1":
+        lines.append("\\def\\CVProfile{1}")
     return "\n".join(lines) + "\n"
 
 
@@ -300,7 +370,7 @@ def gen_designed_work(data: dict) -> str:
         bullets = entry.get("bullets", [])
         for j, bullet in enumerate(bullets):
             cmd = "\\TreeLast" if j == len(bullets) - 1 else "\\TreeItem"
-            lines.append(f"    {cmd}{{{escape_latex(bullet)}}}")
+            lines.append(f"    {cmd}{{{escape_latex(item_text(bullet))}}}")
         lines.append("\\end{treelist}")
 
         if i < len(entries) - 1:
@@ -354,7 +424,7 @@ def gen_designed_research(data: dict) -> str:
             bullets = sub.get("bullets", [])
             for j, bullet in enumerate(bullets):
                 cmd = "\\TreeLast" if j == len(bullets) - 1 else "\\TreeItem"
-                lines.append(f"    {cmd}{{{escape_latex(bullet)}}}")
+                lines.append(f"    {cmd}{{{escape_latex(item_text(bullet))}}}")
             lines.append("\\end{treelist}")
 
     return "\n".join(lines) + "\n"
@@ -432,7 +502,7 @@ def gen_designed_skills(data: dict) -> str:
         lines.append(f"{cmd}{{{category}}}")
         lines.append("\\begin{skilllist}")
         for item in items:
-            lines.append(f"    \\item {escape_latex(item)}")
+            lines.append(f"    \\item {escape_latex(item_text(item))}")
         lines.append("\\end{skilllist}")
 
         if i < len(groups) - 1:
@@ -506,8 +576,8 @@ ATS_POSTAMBLE = r"""
 """
 
 
-def ats_contact_block(contact: dict) -> str:
-    """Build centred ATS contact block."""
+def ats_contact_block(contact: dict) -> Iterator[str]:
+    """Yield the centred ATS contact block, line by line."""
     name = contact.get("name", "Your Name")
     email = contact.get("email", "")
     phone = contact.get("phone", "")
@@ -542,18 +612,20 @@ def ats_contact_block(contact: dict) -> str:
         )
         lines.append("")
     lines.append("\\bigskip")
-    return "\n".join(lines)
+    # The contact block is the only chunk NOT terminated by a newline —
+    # the document assembler adds the separator.
+    yield "\n".join(lines)
 
 
-def ats_summary(data: dict, acronyms: dict[str, str]) -> str:
-    """Render ATS PROFESSIONAL SUMMARY section."""
+def ats_summary(data: dict, acronyms: dict[str, str]) -> Iterator[str]:
+    """Yield the ATS PROFESSIONAL SUMMARY section (nothing if empty)."""
     text = data.get("text", "")
     if not text:
-        return ""
+        return
     text = escape_latex(text)
     seen: set[str] = set()
     text = expand_acronyms(text, acronyms, seen)
-    return f"\\section{{PROFESSIONAL SUMMARY}}\n{text}\n"
+    yield f"\\section{{PROFESSIONAL SUMMARY}}\n{text}\n"
 
 
 def ats_experience(
@@ -561,14 +633,14 @@ def ats_experience(
     section_name: str,
     acronyms: dict[str, str],
     flatten_subsections: bool = False,
-) -> str:
-    """Render ATS experience section (work or research)."""
+) -> Iterator[str]:
+    """Yield the ATS experience section (work or research), one line per chunk."""
     entries = data.get("entries", [])
     if not entries:
-        return ""
+        return
 
     seen: set[str] = set()
-    lines = [f"\\section{{{section_name}}}\n"]
+    yield f"\\section{{{section_name}}}\n\n"
 
     for i, entry in enumerate(entries):
         role = expand_acronyms(escape_latex(entry.get("role", "")), acronyms, seen)
@@ -576,21 +648,24 @@ def ats_experience(
         dates = entry.get("dates", "")
         location = entry.get("location", "")
 
-        lines.append(f"\\textbf{{{role}}} \\hfill {dates}\\\\")
-        lines.append(f"{company} \\hfill {location}")
+        yield f"\\textbf{{{role}}} \\hfill {dates}\\\\\n"
+        yield f"{company} \\hfill {location}\n"
 
         # Optional description
         desc = entry.get("description", "")
         if desc:
             desc = expand_acronyms(escape_latex(desc), acronyms, seen)
-            lines.append(f"\n{desc}\n")
+            yield f"\n{desc}\n\n"
 
-        # Collect bullets (flatten subsections for ATS readability)
+        # Collect bullets (flatten subsections for ATS readability).
+        # Bullets are per entry, so this list stays small however many
+        # entries the section has.
         all_bullets: list[str] = []
 
         # Direct bullets (work experience style)
         for b in entry.get("bullets", []):
-            all_bullets.append(expand_acronyms(escape_latex(b), acronyms, seen))
+            all_bullets.append(
+                expand_acronyms(escape_latex(item_text(b)), acronyms, seen))
 
         # Subsection bullets (research experience style)
         for sub in entry.get("subsections", []):
@@ -599,54 +674,53 @@ def ats_experience(
             if heading and flatten_subsections and sub_bullets:
                 first = (
                     f"\\textbf{{{expand_acronyms(escape_latex(heading), acronyms, seen)}:}} "
-                    f"{expand_acronyms(escape_latex(sub_bullets[0]), acronyms, seen)}"
+                    f"{expand_acronyms(escape_latex(item_text(sub_bullets[0])), acronyms, seen)}"
                 )
                 all_bullets.append(first)
                 for b in sub_bullets[1:]:
-                    all_bullets.append(expand_acronyms(escape_latex(b), acronyms, seen))
+                    all_bullets.append(
+                        expand_acronyms(escape_latex(item_text(b)), acronyms, seen))
             else:
                 for b in sub_bullets:
-                    all_bullets.append(expand_acronyms(escape_latex(b), acronyms, seen))
+                    all_bullets.append(
+                        expand_acronyms(escape_latex(item_text(b)), acronyms, seen))
 
         if all_bullets:
-            lines.append("\\begin{itemize}[leftmargin=1.5em, itemsep=2pt, parsep=0pt]")
+            yield "\\begin{itemize}[leftmargin=1.5em, itemsep=2pt, parsep=0pt]\n"
             for b in all_bullets:
-                lines.append(f"  \\item {b}")
-            lines.append("\\end{itemize}")
+                yield f"  \\item {b}\n"
+            yield "\\end{itemize}\n"
 
         if i < len(entries) - 1:
-            lines.append("")
-
-    return "\n".join(lines) + "\n"
+            yield "\n"
 
 
-def ats_skills(data: dict, acronyms: dict[str, str]) -> str:
-    """Render ATS SKILLS section."""
+def ats_skills(data: dict, acronyms: dict[str, str]) -> Iterator[str]:
+    """Yield the ATS SKILLS section."""
     groups = data.get("groups", [])
     if not groups:
-        return ""
+        return
 
     seen: set[str] = set()
-    lines = ["\\section{SKILLS}\n"]
-    rendered: list[str] = []
-    for group in groups:
+    yield "\\section{SKILLS}\n\n"
+    for i, group in enumerate(groups):
         cat = expand_acronyms(escape_latex(group.get("category", "")), acronyms, seen)
         # Join all items into comma-separated string
-        items_flat = ", ".join(group.get("items", []))
+        items_flat = ", ".join(item_text(i) for i in group.get("items", []))
         itm = expand_acronyms(escape_latex(items_flat), acronyms, seen)
-        rendered.append(f"\\textbf{{{cat}:}} {itm}")
-    lines.append("\\\\\\relax\n".join(rendered))
-    return "\n".join(lines) + "\n"
+        # Groups are separated by a forced line break (no trailing one)
+        sep = "\\\\\\relax\n" if i < len(groups) - 1 else "\n"
+        yield f"\\textbf{{{cat}:}} {itm}{sep}"
 
 
-def ats_education(data: dict, acronyms: dict[str, str]) -> str:
-    """Render ATS EDUCATION section."""
+def ats_education(data: dict, acronyms: dict[str, str]) -> Iterator[str]:
+    """Yield the ATS EDUCATION section."""
     entries = data.get("entries", [])
     if not entries:
-        return ""
+        return
 
     seen: set[str] = set()
-    lines = ["\\section{EDUCATION}\n"]
+    yield "\\section{EDUCATION}\n\n"
 
     for i, entry in enumerate(entries):
         degree = expand_acronyms(escape_latex(entry.get("degree", "")), acronyms, seen)
@@ -660,25 +734,23 @@ def ats_education(data: dict, acronyms: dict[str, str]) -> str:
             line2 = f"{institution} \\hfill {location}"
         else:
             line2 = institution
-        lines.append(f"{line1}\\\\")
-        lines.append(line2)
+        yield f"{line1}\\\\\n"
+        yield f"{line2}\n"
         if details:
-            lines.append(f"\\\\\n\\textit{{{escape_latex(details)}}}")
+            yield f"\\\\\n\\textit{{{escape_latex(details)}}}\n"
 
         if i < len(entries) - 1:
-            lines.append("\n\\medskip\n")
+            yield "\n\\medskip\n\n"
 
-    return "\n".join(lines) + "\n"
 
-
-def ats_publications(data: dict, acronyms: dict[str, str]) -> str:
-    """Render ATS PUBLICATIONS section."""
+def ats_publications(data: dict, acronyms: dict[str, str]) -> Iterator[str]:
+    """Yield the ATS PUBLICATIONS section."""
     entries = data.get("entries", [])
     if not entries:
-        return ""
+        return
 
     seen: set[str] = set()
-    lines = ["\\section{PUBLICATIONS}\n"]
+    yield "\\section{PUBLICATIONS}\n\n"
     for entry in entries:
         authors = escape_latex(entry.get("authors", ""))
         title = escape_latex(entry.get("title", ""))
@@ -686,28 +758,48 @@ def ats_publications(data: dict, acronyms: dict[str, str]) -> str:
         year = entry.get("year", "")
         text = f"{authors}. \\textit{{{title}}}. {venue}, {year}."
         text = expand_acronyms(text, acronyms, seen)
-        lines.append(text)
-        lines.append("")
-    return "\n".join(lines) + "\n"
+        yield f"{text}\n\n"
 
 
-def ats_certifications(data: dict, acronyms: dict[str, str]) -> str:
-    """Render ATS CERTIFICATIONS section."""
+def ats_certifications(data: dict, acronyms: dict[str, str]) -> Iterator[str]:
+    """Yield the ATS CERTIFICATIONS section."""
     entries = data.get("entries", [])
     if not entries:
-        return ""
+        return
 
     seen: set[str] = set()
-    lines = ["\\section{CERTIFICATIONS}\n"]
+    yield "\\section{CERTIFICATIONS}\n\n"
     for entry in entries:
         name = escape_latex(entry.get("name", ""))
         issuer = escape_latex(entry.get("issuer", ""))
         year = entry.get("year", "")
         text = f"\\textbf{{{name}}} --- {issuer} \\hfill {year}"
         text = expand_acronyms(text, acronyms, seen)
-        lines.append(text)
-        lines.append("")
-    return "\n".join(lines) + "\n"
+        yield f"{text}\n\n"
+
+
+def ats_document(
+    contact: dict,
+    sections: Iterable[Iterator[str]],
+) -> Iterator[str]:
+    """Yield the complete ATS document: preamble, contact, sections, postamble.
+
+    *sections* are the ats_* generators in document order. A section that
+    yields nothing is omitted, and consecutive sections are separated by a
+    blank line — exactly as if every section were rendered to a string
+    and joined.
+    """
+    yield ATS_PREAMBLE
+    yield from ats_contact_block(contact)
+    yield "\n"
+    first_section = True
+    for section in sections:
+        for j, chunk in enumerate(section):
+            if j == 0 and not first_section:
+                yield "\n"
+            yield chunk
+            first_section = False
+    yield ATS_POSTAMBLE
 
 
 # ---------------------------------------------------------------------------
@@ -752,14 +844,35 @@ def _dates_to_designed(dates: str) -> str:
 # File writers
 # ---------------------------------------------------------------------------
 
+# Write buffer for streamed output. Chunks are small (one line or one
+# entry each), so this keeps the number of write() syscalls low while
+# never holding more than one buffer's worth of the document in memory.
+STREAM_BUFFER_SIZE = 1 << 16
+
+
+def write_streamed(path: Path, chunks: Iterable[str]) -> int:
+    """Write *chunks* to *path* through a buffered writer; return char count."""
+    written = 0
+    with open(path, "w", encoding="utf-8", buffering=STREAM_BUFFER_SIZE) as f:
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+    trace.count("files_written")
+    trace.count("bytes_written", path.stat().st_size)
+    return written
+
+
 def write_component(name: str, content: str) -> None:
     """Write a generated .tex file (or skip if content is empty)."""
     path = GENERATED_DIR / f"{name}.tex"
+    trace.count("files_written")
     if not content:
         # Write an empty file so \input doesn't fail
         path.write_text("", encoding="utf-8")
         return
-    path.write_text(content, encoding="utf-8")
+    data = content.encode("utf-8")
+    path.write_bytes(data)
+    trace.count("bytes_written", len(data))
     print(f"  Generated {path.relative_to(ROOT)}")
 
 
@@ -781,7 +894,7 @@ def main() -> None:
     education = load_yaml("education")
     skills = load_yaml("skills")
     certifications = load_yaml("certifications")
-    publications = load_yaml("publications")
+    publications = load_publications()
 
     if not contact:
         print("ERROR: content/contact.yaml not found or empty", file=sys.stderr)
@@ -789,56 +902,73 @@ def main() -> None:
 
     acronyms = acronyms_data.get("acronyms", {})
 
-    # ------------------------------------------------------------------
-    # Generate settings and build metadata
-    # ------------------------------------------------------------------
-    print("Generating settings and build metadata...")
-    write_component("settings", gen_settings(contact))
-    write_build_meta(contact)
+    # Content dropped by scripts/prune.py (generated/prune.json) — both CVs
+    drops = load_drops(
+        {"work_experience": work, "research_experience": research, "skills": skills}
+    )
+    if drops:
+        print(f"  Pruned {sum(map(len, drops.values()))} item(s) (generated/prune.json)")
+    work = apply_drops("work_experience", work, drops.get("work_experience", set()))
+    research = apply_drops(
+        "research_experience", research, drops.get("research_experience", set()))
+    skills = apply_drops("skills", skills, drops.get("skills", set()))
 
     # ------------------------------------------------------------------
     # Generate designed CV components
     # ------------------------------------------------------------------
     print("Generating designed CV components...")
-    write_component("contact", gen_designed_contact(contact))
-    write_component("acronym", gen_designed_acronyms(acronyms_data))
-    write_component("summary", gen_designed_summary(summary))
-    write_component("work_experience", gen_designed_work(work))
-    write_component("research_experience", gen_designed_research(research))
-    write_component("education", gen_designed_education(education))
-    write_component("skills", gen_designed_skills(skills))
-    write_component("certifications", gen_designed_certifications(certifications))
-    write_component("publications", gen_designed_publications(publications))
+    with trace.span("designed components"):
+        components = {
+            "contact": gen_designed_contact(contact),
+            "acronym": gen_designed_acronyms(acronyms_data),
+            "summary": gen_designed_summary(summary),
+            "work_experience": gen_designed_work(work),
+            "research_experience": gen_designed_research(research),
+            "education": gen_designed_education(education),
+            "skills": gen_designed_skills(skills),
+            "certifications": gen_designed_certifications(certifications),
+            "publications": gen_designed_publications(publications),
+        }
+        for name, content in components.items():
+            write_component(name, content)
+
+    # ------------------------------------------------------------------
+    # Generate settings and build metadata (after the components: the
+    # settings name the packages their content needs)
+    # ------------------------------------------------------------------
+    print("Generating settings and build metadata...")
+    features = content_features(components.values())
+    write_component("settings", gen_settings(contact, features))
+    load_snapshot()  # generated/params.tex, if engine/params.yaml changed
+    print(f"  Generated {PARAMS_TEX_PATH.relative_to(ROOT)}")
+    write_build_meta(contact)
 
     # ------------------------------------------------------------------
     # Generate ATS CV (single self-contained file)
     # ------------------------------------------------------------------
     print("Generating ATS CV...")
 
-    sections: list[str] = []
-    sections.append(ats_summary(summary, acronyms))
-    sections.append(ats_experience(
-        research, "RESEARCH EXPERIENCE", acronyms, flatten_subsections=True))
-    sections.append(ats_experience(
-        work, "WORK EXPERIENCE", acronyms, flatten_subsections=False))
-    sections.append(ats_skills(skills, acronyms))
-    sections.append(ats_education(education, acronyms))
-    sections.append(ats_publications(publications, acronyms))
-    sections.append(ats_certifications(certifications, acronyms))
-
-    sections = [s for s in sections if s.strip()]
-
-    doc = ATS_PREAMBLE
-    doc += ats_contact_block(contact)
-    doc += "\n"
-    doc += "\n".join(sections)
-    doc += ATS_POSTAMBLE
-
-    OUTPUT_ATS.write_text(doc, encoding="utf-8")
+    with trace.span("ats document"):
+        # Sections are generators: nothing is rendered until the writer pulls
+        # it, so peak memory does not grow with the size of the content.
+        sections = [
+            ats_summary(summary, acronyms),
+            ats_experience(
+                research, "RESEARCH EXPERIENCE", acronyms, flatten_subsections=True),
+            ats_experience(
+                work, "WORK EXPERIENCE", acronyms, flatten_subsections=False),
+            ats_skills(skills, acronyms),
+            ats_education(education, acronyms),
+            ats_publications(publications, acronyms),
+            ats_certifications(certifications, acronyms),
+        ]
+
+        write_streamed(OUTPUT_ATS, ats_document(contact, sections))
     print(f"  Generated {OUTPUT_ATS.relative_to(ROOT)}")
 
     print("Done.")
 
 
 if __name__ == "__main__":
-    main()
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
@@ -1,22 +1,36 @@
 #!/usr/bin/env python3
 """
-header.py — Render the CV name as ASCII art for mainframe/crt headers.
+header.py — Render the CV name as ASCII art for mainframe/crt headers, and
+plan every row of the classic header.
 
 Reads:
-    content/contact.yaml   — name, header_theme, paper_size, margin
-    engine/preamble.tex    — GridFontSize, MonoWidthRatio (via layout.py)
+    content/contact.yaml   — name, title, contact items, header_theme,
+                             paper_size, margin
+    engine/params.yaml     — GridFontSize, MonoWidthRatio, HeaderContactSep
+                             (lib/params.py)
 
 Writes:
-    generated/header_name.tex — Pre-rendered TeX \\defs for the ASCII-art name
-                                rows, plus pre-computed dash/dot counts for
+    generated/header_name.tex — Pre-rendered TeX \\defs for the header rows,
+                                plus pre-computed dash/dot counts for
                                 deterministic centering.
+    generated/header.json     — the theme, spacing and name form chosen
 
-For "classic" theme, this script writes a no-op file (exits cleanly).
+For "classic", it plans the name and title padding, which contact items go
+on which row and the dot counts between them.
 For "mainframe", it uses the 5-row double-line box-drawing font (FONT_5ROW).
 For "crt", it uses the 4-row solid-block font (FONT_4ROW).
+The name's width is measured from font.py's compiled glyph tables and
+checked against the grid before anything is rendered.
+
+If the name art is wider than the grid, header.py does not fail: it tries,
+in order, the 4-row font (crt), tighter glyph spacing, initials, and
+finally the classic header (see choose_header), and takes the first that
+fits. The classic header always fits: a name, title or contact item too
+wide for it is set as initials or cut short with … (see plan_classic). A change of theme is written to generated/header.json, which
+lib/config.py and generate.py apply, so header.py runs before generate.py.
 
 This script has ZERO default values. All parameters come from contact.yaml
-and preamble.tex. If any required value is missing, the script exits with
+and engine/params.yaml. If any required value is missing, the script exits with
 a clear error.
 
 Grid computation (page sizes, cell math, grid cols) is imported from
@@ -26,7 +40,7 @@ Nothing is duplicated.
 Font glyphs are imported from font.py — the single source of truth for
 both the 5-row and 4-row ASCII-art alphabets. Nothing is duplicated.
 
-The output file defines:
+The output file defines (mainframe/crt):
     \\HeaderNameRowA .. \\HeaderNameRowE  — raw Unicode rows (5 for mainframe, 4 for crt)
     \\HeaderNameRows   — number of name rows
     \\HeaderNameWidth  — display width of the rendered name in columns
@@ -35,10 +49,14 @@ The output file defines:
 
 These are consumed by engine/header_mainframe.tex and engine/header_crt.tex.
 The TeX templates do ZERO arithmetic on the name — they use these values directly.
+
+For classic it defines the counts engine/header.tex draws with (see
+generate_classic_header_tex); that template does no arithmetic at all.
 """
 
 from __future__ import annotations
 
+import json
 import sys
 from pathlib import Path
 
@@ -49,44 +67,84 @@ sys.path.insert(0, str(Path(__file__).resolve().parent))
 from lib.config import (  # noqa: E402
     ROOT,
     GENERATED_DIR,
+    HEADER_FIT_PATH,
     VALID_HEADER_THEMES,
     die,
     load_contact,
-    parse_preamble,
     compute_grid,
 )
-from font import FONT_5ROW, FONT_4ROW  # noqa: E402
+from font import measure, render_many  # noqa: E402
+from lib import trace  # noqa: E402
+from lib.params import load_params  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
 OUTPUT_PATH = GENERATED_DIR / "header_name.tex"
 
+# Header theme → font.py font key
+THEME_FONTS = {"mainframe": "5row", "crt": "4row"}
+
 
 # =============================================================================
 # Rendering
 # =============================================================================
 
-def render_name(name: str, font_dict: dict) -> list[str]:
-    """Render a name string using the given font dictionary.
+def render_name(name: str, font: str, spacing: int = 0) -> list[str]:
+    """Render a name string in the given font.py font ("5row" / "4row").
 
     Returns a list of strings, one per row of the rendered output.
     All rows are guaranteed to be the same length (padded with spaces if needed).
+    spacing=-1 overlaps each glyph's shadow column with the next glyph.
     """
-    rows = len(next(iter(font_dict.values())))
-    lines: list[str] = []
-    for row in range(rows):
-        line = "".join(
-            font_dict.get(ch, font_dict.get(' ', [' '] * rows))[row]
-            for ch in name.upper()
-        )
-        lines.append(line)
+    return render_many([name], font, spacing)[0]
+
+
+# =============================================================================
+# Auto-fit
+# =============================================================================
+
+# Requested theme → (theme, glyph spacing) to try for each form of the name,
+# widest first. Both art headers are 7 rows tall (HeaderHeight in
+# engine/params.yaml), so falling back from mainframe to crt leaves the
+# grid unchanged.
+HEADER_STYLES: dict[str, tuple[tuple[str, int], ...]] = {
+    "mainframe": (("mainframe", 0), ("crt", 0), ("crt", -1)),
+    "crt": (("crt", 0), ("crt", -1)),
+}
+
+# Columns the art headers' top row spends around the name (see below)
+NAME_ART_OVERHEAD = 6
+
+
+def name_forms(name: str) -> list[str]:
+    """The name, then with given names as initials, then initials only.
+
+    "Ada Byron Lovelace" → ["Ada Byron Lovelace", "A. B. Lovelace", "A.B.L."]
+    """
+    words = name.split()
+    forms = [name]
+    if len(words) > 1:
+        forms.append(" ".join(f"{w[0]}." for w in words[:-1]) + f" {words[-1]}")
+        forms.append("".join(f"{w[0]}." for w in words))
+    return list(dict.fromkeys(forms))
 
-    # Pad all rows to the same width (max row length)
-    max_w = max(len(r) for r in lines)
-    lines = [r.ljust(max_w) for r in lines]
 
-    return lines
+def choose_header(name: str, theme: str, header_width: int) -> dict:
+    """Pick the first header that fits the grid, deterministically.
+
+    For each form of the name (name_forms), tries the styles of
+    HEADER_STYLES[theme] in order; if none fits, falls back to the classic
+    header, which sets the name in plain text. Classic is returned as is.
+
+    Returns {"theme", "name", "spacing"}.
+    """
+    for form in name_forms(name):
+        for style, spacing in HEADER_STYLES.get(theme, ()):
+            width = measure(form, THEME_FONTS[style], spacing)
+            if width + NAME_ART_OVERHEAD <= header_width:
+                return {"theme": style, "name": form, "spacing": spacing}
+    return {"theme": "classic", "name": name, "spacing": 0}
 
 
 # =============================================================================
@@ -97,6 +155,7 @@ def generate_header_name_tex(
     name: str,
     theme: str,
     header_width: int,
+    spacing: int = 0,
 ) -> str:
     """Generate the content of generated/header_name.tex.
 
@@ -110,17 +169,12 @@ def generate_header_name_tex(
         \\NameDashTotal, \\NameDashLeft, \\NameDashRight — for row 0 (top border)
         \\NameDotTotal, \\NameDotLeft, \\NameDotRight   — for inner dot rows
     """
-    if theme == "mainframe":
-        font = FONT_5ROW
-    elif theme == "crt":
-        font = FONT_4ROW
-    else:
+    font = THEME_FONTS.get(theme)
+    if font is None:
         die(f"header.py called for unsupported theme '{theme}'")
         return ""  # unreachable
 
-    rendered = render_name(name, font)
-    num_rows = len(rendered)
-    name_width = len(rendered[0])  # all rows same length after padding
+    name_width = measure(name, font, spacing)  # = len(render_name(...)[0])
 
     # -------------------------------------------------------------------------
     # Pre-compute centering values (replicates the TeX math exactly)
@@ -131,7 +185,7 @@ def generate_header_name_tex(
     #   Fixed overhead = 6 chars
     #   dashTotal = headerWidth - 6 - nameWidth
     #
-    name_dash_total = header_width - 6 - name_width
+    name_dash_total = header_width - NAME_ART_OVERHEAD - name_width
     if name_dash_total < 0:
         die(
             f"Name art is too wide ({name_width} cols) for the grid "
@@ -149,6 +203,9 @@ def generate_header_name_tex(
     name_dot_left = name_dot_total // 2
     name_dot_right = name_dot_total - name_dot_left
 
+    rendered = render_name(name, font, spacing)
+    num_rows = len(rendered)
+
     # -------------------------------------------------------------------------
     # Verification (belt and suspenders)
     # -------------------------------------------------------------------------
@@ -160,6 +217,9 @@ def generate_header_name_tex(
     assert rowN_check == header_width, (
         f"Inner row width mismatch: {rowN_check} != {header_width}"
     )
+    assert len(rendered[0]) == name_width, (
+        f"Measured name width {name_width} != rendered {len(rendered[0])}"
+    )
 
     # -------------------------------------------------------------------------
     # Build output
@@ -170,7 +230,7 @@ def generate_header_name_tex(
         "% !! AUTO-GENERATED by scripts/header.py — DO NOT EDIT !!",
         f"% Theme: {theme}, Name: {name}, HeaderWidth: {header_width}",
         "%",
-        f"% Name art width: {name_width} cols",
+        f"% Name art width: {name_width} cols (glyph spacing {spacing})",
         f"% Row 0 check: 1+{name_dash_left}+1+1+{name_width}+1+1+{name_dash_right}+1 = {row0_check}",
         f"% Row N check: 1+{name_dot_left}+1+{name_width}+1+{name_dot_right}+1 = {rowN_check}",
         "",
@@ -199,11 +259,278 @@ def generate_header_name_tex(
     return "\n".join(lines) + "\n"
 
 
+# =============================================================================
+# Classic theme
+# =============================================================================
+
+# contact.yaml keys of the contact items, in \CVHeader argument order (#5..#8)
+CLASSIC_CONTACT_ITEMS = ("email", "phone", "linkedin", "location")
+
+
+def plan_contact_row(lengths: list[int], header_width: int, preferred_sep: int) -> dict:
+    """Plan one classic contact row holding items of the given lengths.
+
+    │(1) + outerL + ·ITEM· + sep + ... + ·ITEM· + outerR + ║(1)
+    Each item block: space(1) + ITEM + space(1) = 2 + itemLen
+
+    The separator between items and the outer dot-padding shrink so the
+    line never overflows; \\HeaderContactSep is the preferred maximum.
+    avail < 0 means the items do not fit on one row.
+    """
+    text_only = sum(2 + n for n in lengths)
+    avail = header_width - 2 - text_only
+    # Inner sep = min(preferred, floor(available / (seps + 2 outer pads)))
+    sep = max(0, min(preferred_sep, avail // (len(lengths) + 1)))
+    outer = max(0, avail - (len(lengths) - 1) * sep)
+    left = outer // 2
+    return {"avail": avail, "sep": sep, "left": left, "right": outer - left}
+
+
+def plan_contact_rows(
+    lengths: list[int], header_width: int, preferred_sep: int
+) -> list[list[int]]:
+    """Decide which contact items go on which classic header row.
+
+    Returns the item indices for row 3 and row 4. All items share row 4
+    when they fit. Otherwise the leading items move up to row 3 (normally
+    dot-filled), splitting where the wider of the two rows is narrowest.
+    None if they do not fit on two rows either.
+    """
+    items = list(range(len(lengths)))
+    if plan_contact_row(lengths, header_width, preferred_sep)["avail"] >= 0:
+        return [[], items]
+
+    best: tuple[int, int] | None = None
+    for split in range(1, len(lengths)):
+        upper, lower = lengths[:split], lengths[split:]
+        if min(
+            plan_contact_row(upper, header_width, preferred_sep)["avail"],
+            plan_contact_row(lower, header_width, preferred_sep)["avail"],
+        ) < 0:
+            continue
+        widest = max(sum(2 + n for n in upper), sum(2 + n for n in lower))
+        if best is None or widest < best[1]:
+            best = (split, widest)
+    if best is None:
+        return None
+    return [items[:best[0]], items[best[0]:]]
+
+
+# Marks a classic header field cut short to fit
+ELLIPSIS = "…"
+
+
+def shorten(text: str, width: int) -> str:
+    """*text* in at most *width* columns, ending in … when cut."""
+    if len(text) <= width:
+        return text
+    if width <= 0:
+        return ""
+    return text[:width - 1].rstrip() + ELLIPSIS
+
+
+def plan_classic(contact: dict, header_width: int, preferred_sep: int) -> dict:
+    """The text the classic header shows, shortened until everything fits.
+
+    The name takes the first of name_forms() that fits row 0, else its
+    initials cut short; the title is cut short. While the contact items
+    do not fit on two rows, the longest is cut by one more column.
+
+    Returns {"name", "title", "contacts" (shown text per item), "rows"
+    (plan_contact_rows), "shortened" (contact.yaml keys changed)}.
+    """
+    name = str(contact["name"])
+    title = str(contact.get("title", ""))
+    texts = [str(contact.get(key, "")) for key in CLASSIC_CONTACT_ITEMS]
+    forms = name_forms(name)
+    name_fit = header_width - 6
+    shown_name = next(
+        (form for form in forms if len(form) <= name_fit),
+        shorten(forms[-1], name_fit),
+    )
+    shown_title = shorten(title, header_width - 2 - 4)
+
+    shown = list(texts)
+    while (rows := plan_contact_rows(
+        [len(t) for t in shown], header_width, preferred_sep
+    )) is None:
+        if not any(shown):
+            die(f"The grid ({header_width} cols) is narrower than the "
+                f"classic header's frame. Use a smaller margin.")
+        longest = max(range(len(shown)), key=lambda i: (len(shown[i]), -i))
+        shown[longest] = shorten(texts[longest], len(shown[longest]) - 1)
+
+    changed = [
+        key for key, old, new in zip(
+            ("name", "title", *CLASSIC_CONTACT_ITEMS),
+            (name, title, *texts),
+            (shown_name, shown_title, *shown),
+        )
+        if old != new
+    ]
+    return {
+        "name": shown_name, "title": shown_title, "contacts": shown,
+        "rows": rows, "shortened": changed,
+    }
+
+
+def contact_row_tex(
+    label: str,
+    items: list[int],
+    lengths: list[int],
+    header_width: int,
+    preferred_sep: int,
+    shortened: dict[int, str] | None = None,
+) -> tuple[str, str]:
+    """Return the \\def of one classic contact row and its check comment.
+
+    The macro takes the four contact items as #1..#4 and draws the row
+    between its borders; a row without items is dot-filled. An item in
+    *shortened* is drawn as that text instead of its argument.
+    """
+    shortened = shortened or {}
+    inner_w = header_width - 2
+    if not items:
+        check = 1 + inner_w + 1
+        assert check == header_width, (
+            f"{label} width mismatch: {check} != {header_width}"
+        )
+        return (
+            f"\\def\\{label}#1#2#3#4{{{{\\HDOT\\Repeat{{{inner_w}}}{{·}}}}}}",
+            f"% {label} check: 1+{inner_w}+1 = {check}",
+        )
+
+    row_lengths = [lengths[i] for i in items]
+    row = plan_contact_row(row_lengths, header_width, preferred_sep)
+    check = (
+        1 + row["left"] + sum(2 + n for n in row_lengths)
+        + (len(items) - 1) * row["sep"] + row["right"] + 1
+    )
+    assert check == header_width, (
+        f"{label} width mismatch: {check} != {header_width}"
+    )
+
+    parts = [f"{{\\HDOT\\Repeat{{{row['left']}}}{{·}}}}"]
+    for n, i in enumerate(items):
+        if n:
+            parts.append(f"{{\\HDOT\\Repeat{{{row['sep']}}}{{·}}}}")
+        parts.append(f"{{ }}{shortened.get(i, f'#{i + 1}')}{{ }}")
+    parts.append(f"{{\\HDOT\\Repeat{{{row['right']}}}{{·}}}}")
+    terms = "+".join(f"(2+{n})" for n in row_lengths)
+    return (
+        f"\\def\\{label}#1#2#3#4{{{''.join(parts)}}}",
+        f"% {label} check: 1+{row['left']}+{terms}+{len(items) - 1}*{row['sep']}"
+        f"+{row['right']}+1 = {check}",
+    )
+
+
+def generate_classic_header_tex(
+    contact: dict,
+    header_width: int,
+    preferred_sep: int,
+) -> str:
+    """Generate the content of generated/header_name.tex for classic.
+
+    Pre-computes every count engine/header.tex draws with, so the template
+    does ZERO arithmetic and no character counting at TeX runtime.
+
+    Defines:
+        \\ClassicName#1, \\ClassicTitle#1 — the name and title to draw:
+                                         #1, or plan_classic's shortening
+        \\NameDashLeft, \\NameDashRight   — dashes around the name (row 0)
+        \\TitlePadLeft, \\TitlePadRight   — dots around the title (row 2)
+        \\HeaderInnerWidth               — columns between the borders
+        \\ContactRowA#1#2#3#4            — row 3: dots, or the items moved up
+        \\ContactRowB#1#2#3#4            — row 4: the contact items
+    """
+    plan = plan_classic(contact, header_width, preferred_sep)
+    name, title = plan["name"], plan["title"]
+    lengths = [len(t) for t in plan["contacts"]]
+    shortened = {
+        i: text for i, (key, text) in enumerate(zip(CLASSIC_CONTACT_ITEMS, plan["contacts"]))
+        if key in plan["shortened"]
+    }
+    inner_w = header_width - 2
+
+    # -------------------------------------------------------------------------
+    # Pre-compute centering values
+    # -------------------------------------------------------------------------
+    #
+    # ROW 0 (name):
+    #   ┌(1) + dashes(left) + ·(1) + space(1) + NAME + ▌(1) + ·(1) + dashes(right) + ╖(1)
+    #   Fixed overhead = 6 chars
+    #
+    name_dash_total = header_width - 6 - len(name)
+    name_dash_left = name_dash_total // 2
+    name_dash_right = name_dash_total - name_dash_left
+
+    # ROW 2 (title):
+    #   │(1) + dots(left) + space(1) + >_(2) + TITLE + space(1) + dots(right) + ║(1)
+    #   Fixed overhead = 6 chars
+    #
+    title_pad_total = inner_w - len(title) - 4
+    title_pad_left = title_pad_total // 2
+    title_pad_right = title_pad_total - title_pad_left
+
+    # ROWS 3-4 (contact): see plan_contact_rows
+    upper, lower = plan["rows"]
+
+    # -------------------------------------------------------------------------
+    # Verification (belt and suspenders)
+    # -------------------------------------------------------------------------
+    row0_check = 1 + name_dash_left + 1 + 1 + len(name) + 1 + 1 + name_dash_right + 1
+    row2_check = 1 + title_pad_left + 1 + 2 + len(title) + 1 + title_pad_right + 1
+    assert row0_check == header_width, (
+        f"Name row width mismatch: {row0_check} != {header_width}"
+    )
+    assert row2_check == header_width, (
+        f"Title row width mismatch: {row2_check} != {header_width}"
+    )
+    row3_tex, row3_check = contact_row_tex(
+        "ContactRowA", upper, lengths, header_width, preferred_sep, shortened
+    )
+    row4_tex, row4_check = contact_row_tex(
+        "ContactRowB", lower, lengths, header_width, preferred_sep, shortened
+    )
+
+    # -------------------------------------------------------------------------
+    # Build output
+    # -------------------------------------------------------------------------
+    lines = [
+        "% !! AUTO-GENERATED by scripts/header.py — DO NOT EDIT !!",
+        f"% Theme: classic, Name: {name}, HeaderWidth: {header_width}",
+        "%",
+        f"% Name row check: 1+{name_dash_left}+1+1+{len(name)}+1+1+{name_dash_right}+1 = {row0_check}",
+        f"% Title row check: 1+{title_pad_left}+1+2+{len(title)}+1+{title_pad_right}+1 = {row2_check}",
+        row3_check,
+        row4_check,
+        "",
+        "\\def\\ClassicName#1{" + ("#1" if "name" not in plan["shortened"] else name) + "}",
+        "\\def\\ClassicTitle#1{" + ("#1" if "title" not in plan["shortened"] else title) + "}",
+        "",
+        f"\\def\\NameDashLeft{{{name_dash_left}}}",
+        f"\\def\\NameDashRight{{{name_dash_right}}}",
+        "",
+        f"\\def\\TitlePadLeft{{{title_pad_left}}}",
+        f"\\def\\TitlePadRight{{{title_pad_right}}}",
+        "",
+        f"\\def\\HeaderInnerWidth{{{inner_w}}}",
+        "",
+        row3_tex,
+        row4_tex,
+        "",
+    ]
+    return "\n".join(lines) + "\n"
+
+
 # =============================================================================
 # Main
 # =============================================================================
 
 def main() -> None:
+    # Decide afresh from contact.yaml: load_contact() would otherwise apply
+    # the previous run's choice
+    HEADER_FIT_PATH.unlink(missing_ok=True)
     contact = load_contact()
 
     name = contact.get("name")
@@ -221,32 +548,60 @@ def main() -> None:
             f"(must be one of: {', '.join(VALID_HEADER_THEMES)})"
         )
 
-    if theme == "classic":
-        # Classic theme doesn't need ASCII-art name rendering.
-        # Write an empty file so \input doesn't fail.
-        OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-        OUTPUT_PATH.write_text(
-            "% header_name.tex — not used for classic theme\n",
-            encoding="utf-8",
-        )
-        print(f"  Generated {OUTPUT_PATH.relative_to(ROOT)} (classic — no-op)")
-        return
-
     # Compute grid columns (= HeaderWidth) using layout.py's grid math
-    params = parse_preamble()
+    params = load_params(theme)
     grid = compute_grid(contact, params)
     header_width = grid["grid_cols"]
 
-    content = generate_header_name_tex(name, theme, header_width)
+    with trace.span("fit header", theme=theme):
+        choice = choose_header(str(name), theme, header_width)
+    if choice["theme"] != theme or choice["name"] != name or choice["spacing"]:
+        print(
+            f"  Name art for '{name}' does not fit the {theme} header "
+            f"({header_width} cols): using {choice['theme']}, "
+            f"'{choice['name']}', glyph spacing {choice['spacing']}"
+        )
+    HEADER_FIT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    HEADER_FIT_PATH.write_text(
+        json.dumps({"requested": theme, **choice, "header_width": header_width},
+                   indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+    if choice["theme"] == "classic":
+        with trace.span("plan header", theme="classic"):
+            preferred_sep = int(params["HeaderContactSep"])
+            shortened = plan_classic(contact, header_width, preferred_sep)["shortened"]
+            if shortened:
+                print(
+                    f"  Shortened {', '.join(shortened)} to fit the classic "
+                    f"header ({header_width} cols); use a wider margin to "
+                    f"show them in full"
+                )
+            content = generate_classic_header_tex(contact, header_width, preferred_sep)
+        OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        OUTPUT_PATH.write_text(content, encoding="utf-8")
+        print(
+            f"  Generated {OUTPUT_PATH.relative_to(ROOT)} "
+            f"(classic, header_width={header_width})"
+        )
+        return
+
+    with trace.span("render name", theme=choice["theme"]):
+        content = generate_header_name_tex(
+            choice["name"], choice["theme"], header_width, choice["spacing"]
+        )
 
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     OUTPUT_PATH.write_text(content, encoding="utf-8")
+    name_width = measure(choice["name"], THEME_FONTS[choice["theme"]], choice["spacing"])
     print(
         f"  Generated {OUTPUT_PATH.relative_to(ROOT)} "
-        f"({theme}, name_width={len(render_name(name, FONT_5ROW if theme == 'mainframe' else FONT_4ROW)[0])}, "
+        f"({choice['theme']}, name_width={name_width}, "
         f"header_width={header_width})"
     )
 
 
 if __name__ == "__main__":
-    main()
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
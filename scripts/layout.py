@@ -5,30 +5,73 @@ layout.py — Two-pass deterministic page-break engine for the designed CV.
 Modes:
     --measure   Generate generated/canvas.tex with all boxes placed
                 sequentially (no splits) so pass 1 can measure heights.
-    --layout    Read build/boxheights.dat (written by pass 1 via \\LogBoxHeight),
-                compute page breaks, and regenerate generated/canvas.tex
-                with proper splits and page breaks.
+                If the last measurements (and build/cache/heights) predict
+                that the layout will BE this canvas (one page, no splits),
+                write build/serial-pass1: compiling pass 1 whole then gives
+                the final PDF, where the parallel measurement would still
+                need pass 2. CV_MEASURE=serial / parallel forces either.
+    --layout    Read build/boxheights.dat (written by scripts/measure.py, or by
+                a serial pass 1 via \\LogBoxHeight),
+                pack full-width bands and two-column regions down each page,
+                compute page breaks with the breaker named in layout.yaml
+                (greedy, or optimal: lib/breaker.py), and regenerate
+                generated/canvas.tex with proper splits and page breaks. If the result is the
+                measurement canvas itself (one page, no splits) and pass 1
+                was the serial compile (build/serial-pass1), canvas.tex
+                is left alone and build/reuse-pass1 tells the pipeline that
+                the pass-1 PDF is already final.
+                With CV_BOX_CACHE=1, boxes are placed from the render
+                cache (\\CachedBox, keys from lib/boxcache.py;
+                scripts/render.py fills it).
+    --converge  After a compile, check every page/column against the
+                heights TeX actually rendered (split parts included). If one
+                overflows, re-lay out using those heights and ask for one
+                more compile; at most MAX_CONVERGE_ITERATIONS times.
+    --preview   Plan the pages from the last measured heights and draw them
+                in the terminal as the character grid they are (box outlines,
+                split markers, gaps, free space). Writes nothing; no TeX run.
+    --single    Generate a canvas that measures, breaks pages and places
+                boxes in ONE LuaLaTeX run (engine/pagebreak.tex + .lua,
+                greedy rules; CV_LAYOUT=single).
+    --crosscheck
+                After a --single compile, re-plan its measured heights with
+                plan_layout (greedy) and report any box placed differently.
+                Exit 0 = identical, 1 = differs.
 
 Inputs (ALL required — no defaults, no assumptions):
     content/contact.yaml   — paper_size, margin
-    content/layout.yaml    — section order and column assignments
-    engine/preamble.tex    — grid/box master parameters (parsed via regex)
-    build/boxheights.dat   — measured content heights (only for --layout)
+    content/layout.yaml    — section order, column assignments, breaker
+    engine/params.yaml     — grid/box master parameters, resolved for the
+                             header theme (lib/params.py)
+    build/boxheights.dat   — measured content heights (--layout; --preview
+                             uses it or build/boxheights-measure.dat)
 
 Outputs:
-    --measure:  generated/canvas.tex (passthrough, no splits)
+    --measure:  generated/canvas.tex (passthrough, no splits),
+                build/serial-pass1 (only when pass 1 should compile main.tex)
+    --single:   generated/canvas.tex (single-compile); the compile writes
+                generated/*-p{N}.tex, build/layout-plan.json and
+                build/boxheights-measure.dat
     --layout:   generated/canvas.tex (with page breaks + splits),
-                generated/*-p{N}.tex (split content files)
-
-This script has ZERO default values. Every parameter is read from YAML or
-parsed from preamble.tex. If any required value is missing, the script
+                generated/*-p{N}.tex (split content files),
+                build/reuse-pass1 (only when pass 2 can be skipped),
+                build/layout-plan.json (the plan, for --converge)
+    --converge: build/layout-report.txt, build/layout-hints.json, and — only
+                when a column overflowed — a rewritten canvas.tex.
+                Exit 0 = fits, 3 = re-laid out (compile again), 2 = gave up.
+
+This script has ZERO default values. Every parameter is read from YAML
+(content/*.yaml, engine/params.yaml). If any required value is missing, the script
 raises immediately with a clear error message.
 """
 
 from __future__ import annotations
 
+import json
 import math
+import os
 import re
+import shutil
 import sys
 from pathlib import Path
 
@@ -41,30 +84,41 @@ from lib.config import (  # noqa: E402
     GENERATED_DIR,
     BOXHEIGHTS_PATH,
     CANVAS_TEX_PATH,
+    REUSE_PASS1_PATH,
+    SERIAL_PASS1_PATH,
+    MEASURED_HEIGHTS_PATH,
+    LAYOUT_PLAN_PATH,
+    LAYOUT_HINTS_PATH,
+    LAYOUT_REPORT_PATH,
     HEADER_ENGINE_FILES,
     VALID_HEADER_THEMES,
     die,
     load_contact,
     load_layout,
-    parse_preamble,
+    load_breaker,
     compute_grid,
+    content_widths,
     box_rows,
 )
+from lib import boxcache, trace  # noqa: E402
+from lib.params import load_params  # noqa: E402
+from lib.breaker import break_column, page_end_rows  # noqa: E402
+from measure import SETUP_PATHS, cached_height, setup_digest  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
 # boxheights.dat loader
 # ---------------------------------------------------------------------------
 
-def load_boxheights() -> dict[str, int]:
-    """Load measured content heights from boxheights.dat."""
-    if not BOXHEIGHTS_PATH.exists():
+def load_boxheights(path: Path = BOXHEIGHTS_PATH) -> dict[str, int]:
+    """Load measured content heights from boxheights.dat (or a saved copy)."""
+    if not path.exists():
         die(
-            f"{BOXHEIGHTS_PATH} not found. "
+            f"{path} not found. "
             "Run the measurement pass (--measure + compile) first."
         )
     heights: dict[str, int] = {}
-    for line in BOXHEIGHTS_PATH.read_text(encoding="utf-8").splitlines():
+    for line in path.read_text(encoding="utf-8").splitlines():
         line = line.strip()
         if not line or line.startswith("%") or line.startswith("#"):
             continue
@@ -77,6 +131,7 @@ def load_boxheights() -> dict[str, int]:
             heights[key] = int(val)
         except ValueError:
             die(f"invalid height value for '{key}' in boxheights.dat: '{val}'")
+    trace.count("boxes_measured", len(heights))
     return heights
 
 
@@ -140,44 +195,65 @@ def _find_wrapping_env(lines: list[str]) -> str | None:
     return None
 
 
-def split_content_file(
-    tex_path: Path,
-    boundaries: list[int],
-    split_after_boundary_idx: int,
-) -> tuple[Path, Path]:
-    """Split a .tex file at the given boundary into -p1.tex and -p2.tex."""
-    lines = tex_path.read_text(encoding="utf-8").splitlines(keepends=True)
-    boundary_line = boundaries[split_after_boundary_idx]
+def split_content_parts(
+    tex_path: Path, cut_lines: list[int], write: bool = True
+) -> list[Path]:
+    """Split a .tex file before each of *cut_lines* into -p1.tex, -p2.tex, ...
 
-    stem = tex_path.stem
-    p1_path = GENERATED_DIR / f"{stem}-p1.tex"
-    p2_path = GENERATED_DIR / f"{stem}-p2.tex"
+    With write=False only the part paths are returned (dry runs).
+    """
+    if not write:
+        return [
+            GENERATED_DIR / f"{tex_path.stem}-p{n}.tex"
+            for n in range(1, len(cut_lines) + 2)
+        ]
+    lines = tex_path.read_text(encoding="utf-8").splitlines(keepends=True)
 
     # Detect wrapping environment
     raw_lines = [l.rstrip("\n").rstrip("\r") for l in lines]
     wrapping_env = _find_wrapping_env(raw_lines)
 
-    # Part 1: everything up to (but not including) the boundary line
-    p1_lines = list(lines[:boundary_line])
-    # Part 2: everything from the boundary line onward
-    p2_lines = list(lines[boundary_line:])
+    edges = [0, *cut_lines, len(lines)]
+    last = len(edges) - 1
+    paths: list[Path] = []
+    for n, (start, end) in enumerate(zip(edges, edges[1:]), 1):
+        part = list(lines[start:end])
+
+        # Strip trailing blank lines from every part but the last
+        if n < last:
+            while part and part[-1].strip() == "":
+                part.pop()
 
-    # Strip trailing blank lines from part 1
-    while p1_lines and p1_lines[-1].strip() == "":
-        p1_lines.pop()
+        # Strip leading blank lines and \JobSep from every part but the first
+        if n > 1:
+            while part and part[0].strip() in ("", "\\JobSep"):
+                part.pop(0)
 
-    # Strip leading blank lines and \JobSep from part 2
-    while p2_lines and p2_lines[0].strip() in ("", "\\JobSep"):
-        p2_lines.pop(0)
+        # Handle wrapping environment
+        if wrapping_env:
+            if n < last:
+                part.append(f"\n\\end{{{wrapping_env}}}\n")
+            if n > 1:
+                part.insert(0, f"\\begin{{{wrapping_env}}}\n")
 
-    # Handle wrapping environment
-    if wrapping_env:
-        p1_lines.append(f"\n\\end{{{wrapping_env}}}\n")
-        p2_lines.insert(0, f"\\begin{{{wrapping_env}}}\n")
+        path = GENERATED_DIR / f"{tex_path.stem}-p{n}.tex"
+        path.write_text("".join(part), encoding="utf-8")
+        paths.append(path)
+    trace.count("splits", len(cut_lines))
 
-    p1_path.write_text("".join(p1_lines), encoding="utf-8")
-    p2_path.write_text("".join(p2_lines), encoding="utf-8")
+    return paths
 
+
+def split_content_file(
+    tex_path: Path,
+    boundaries: list[int],
+    split_after_boundary_idx: int,
+    write: bool = True,
+) -> tuple[Path, Path]:
+    """Split a .tex file at the given boundary into -p1.tex and -p2.tex."""
+    p1_path, p2_path = split_content_parts(
+        tex_path, [boundaries[split_after_boundary_idx]], write
+    )
     return p1_path, p2_path
 
 
@@ -201,6 +277,7 @@ def _canvas_header(header_theme: str) -> str:
 \\input{{engine/leftbox.tex}}
 \\input{{engine/rightbox.tex}}
 \\input{{engine/fullbox.tex}}
+\\input{{engine/boxcache.tex}}
 \\input{{engine/pageflow.tex}}
 
 % --- Load contact data ---
@@ -240,8 +317,8 @@ def _emit_page_header(out: list[str], page: int) -> None:
 # MODE 1: --measure — generate passthrough canvas.tex
 # ---------------------------------------------------------------------------
 
-def generate_measure_canvas(sections: list[dict], header_theme: str) -> None:
-    """Generate a passthrough canvas.tex that places all boxes sequentially.
+def build_measure_canvas(sections: list[dict], header_theme: str) -> str:
+    """Return the passthrough canvas that places all boxes sequentially.
 
     This is used for pass 1 so the box templates can measure content heights
     and write them to boxheights.dat via \\LogBoxHeight.
@@ -290,23 +367,165 @@ def generate_measure_canvas(sections: list[dict], header_theme: str) -> None:
         out.append("")
 
     out.append(r"\endinput")
+    return "\n".join(out) + "\n"
 
+
+def generate_measure_canvas(sections: list[dict], header_theme: str) -> None:
+    """Write the measurement canvas for pass 1."""
+    REUSE_PASS1_PATH.unlink(missing_ok=True)
     GENERATED_DIR.mkdir(parents=True, exist_ok=True)
-    CANVAS_TEX_PATH.write_text("\n".join(out) + "\n", encoding="utf-8")
+    CANVAS_TEX_PATH.write_text(
+        build_measure_canvas(sections, header_theme), encoding="utf-8"
+    )
     print(f"  Generated {CANVAS_TEX_PATH.relative_to(ROOT)} (measurement pass)")
 
 
+def _canvas_lines(canvas: str) -> list[str]:
+    """Canvas lines that affect the output (blank lines dropped)."""
+    return [line.rstrip() for line in canvas.splitlines() if line.strip()]
+
+
+def choose_pass1(
+    sections: list[dict],
+    grid: dict,
+    params: dict[str, float],
+    header_theme: str,
+    breaker: str,
+) -> bool:
+    """Decide how pass 1 measures; True (and SERIAL_PASS1_PATH) for serial.
+
+    The parallel measurement (scripts/measure.py) compiles no canvas, so
+    pass 2 always follows it. When the layout is predicted to be the
+    measurement canvas itself, a serial pass 1 is the final compile and
+    generate_layout_canvas skips pass 2. The prediction only trusts
+    measured heights (preview_heights); any estimate means parallel.
+    """
+    SERIAL_PASS1_PATH.unlink(missing_ok=True)
+    mode = os.environ.get("CV_MEASURE", "auto")
+    if mode == "serial":
+        serial = True
+    elif mode == "parallel":
+        serial = False
+    else:
+        heights, estimated = preview_heights(sections, grid, params)
+        serial = False
+        if not estimated:
+            placements, total_pages = plan_layout(
+                sections, grid, heights, breaker, dry_run=True
+            )
+            serial = _canvas_lines(
+                build_layout_canvas(placements, total_pages, header_theme, grid)
+            ) == _canvas_lines(build_measure_canvas(sections, header_theme))
+    if serial:
+        SERIAL_PASS1_PATH.parent.mkdir(parents=True, exist_ok=True)
+        SERIAL_PASS1_PATH.write_text(
+            f"CV_MEASURE={mode}: compile main.tex for pass 1\n", encoding="utf-8"
+        )
+        print(
+            "  Serial pass 1: the layout should be the measurement canvas "
+            f"({SERIAL_PASS1_PATH.relative_to(ROOT)})"
+            if mode == "auto" else "  Serial pass 1 (CV_MEASURE=serial)"
+        )
+    return serial
+
+
 # ---------------------------------------------------------------------------
 # MODE 2: --layout — compute page breaks and generate final canvas.tex
 # ---------------------------------------------------------------------------
 
-def generate_layout_canvas(
+class BoxPlacement:
+    """One box on one page: a whole section, or one part of a split section."""
+
+    def __init__(
+        self,
+        title: str,
+        content_path: str,
+        column: str,
+        page: int,
+        y: float,
+        rows: int,
+        source: str,
+        lines: tuple[int, int] | None = None,
+        part: int = 0,
+    ):
+        self.title = title
+        self.content_path = content_path  # as passed to \LeftBox etc.
+        self.column = column
+        self.page = page
+        self.y = y                        # top row of the box frame
+        self.rows = rows                  # content rows the plan assumed
+        self.source = source              # section content file (layout.yaml)
+        self.lines = tuple(lines) if lines else None  # source lines of a part
+        self.part = part                  # 0 = whole section, 1.. = split parts
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BoxPlacement":
+        return cls(**data)
+
+
+def _bands(sections: list[dict]) -> list[tuple[str, list[dict], list[dict]]]:
+    """Group layout.yaml order into the page's vertical stack.
+
+    Consecutive full-width sections form a ("full", sections, []) band;
+    the left/right sections between them form a ("columns", left, right)
+    region whose two columns start at the same row.
+    """
+    bands: list[tuple[str, list[dict], list[dict]]] = []
+    for sec in sections:
+        kind = "full" if sec["column"] == "full" else "columns"
+        if not bands or bands[-1][0] != kind:
+            bands.append((kind, [], []))
+        bands[-1][2 if sec["column"] == "right" else 1].append(sec)
+    return bands
+
+
+def _chained(prev: BoxPlacement, pl: BoxPlacement, grid: dict) -> bool:
+    """True if *pl* sits one gap below *prev* (emitted as \\...BoxGap)."""
+    prev_end = prev.y + box_rows(
+        prev.rows, grid[f"{prev.column}_pad_top"], grid[f"{prev.column}_pad_bot"]
+    )
+    return abs(prev_end + grid["gap_box"] - pl.y) < 1e-6
+
+
+def plan_layout(
     sections: list[dict],
     grid: dict,
     heights: dict[str, int],
-    header_theme: str,
-) -> None:
-    """Compute page layout, split overflowing content, write canvas.tex."""
+    breaker: str,
+    hints: dict | None = None,
+    dry_run: bool = False,
+) -> tuple[list[BoxPlacement], int]:
+    """Pack every section onto pages; split overflowing content files.
+
+    The page is a vertical stack of bands (see _bands): full-width boxes,
+    and two-column regions. Each band starts one gap below everything above
+    it on the current page, so full-width boxes never overlap the columns.
+    Within a band each column is broken into pages by *breaker*: "greedy"
+    (first fit, one split per section) or "optimal" (lib/breaker.py).
+    Bookkeeping is one (page, row) cursor, so packing is linear in boxes.
+
+    The optimal breaker solves one band at a time, so its fewest pages are
+    per band: balancing a column can end it lower and push the next band
+    onto a new page. Page count comes first for the whole stack, so it
+    plans three ways (dry) and keeps the first with the fewest pages among
+    those that do not overflow a page: balanced bands; every band but the
+    last ending as high as it can (tight_end, skipped for a single band,
+    where it is the same plan); greedy. It never needs more pages than
+    greedy. The chosen dry plan's split files are then written from its
+    placements (_write_splits) rather than packing it a fourth time.
+
+    *heights* are the measured whole-section heights (pass 1). *hints* are
+    measured heights of split parts from earlier compiles (--converge),
+    keyed hints[content]["start:end"] by source line range; where present
+    they replace the line-fraction estimate. *dry_run* plans without
+    writing split files or printing (scripts/fit.py).
+
+    Returns (placements, total page count).
+    """
+    hints = hints or {}
 
     # Validate heights
     for sec in sections:
@@ -317,22 +536,74 @@ def generate_layout_canvas(
                 "Re-run the measurement pass."
             )
 
-    left_secs = [s for s in sections if s["column"] == "left"]
-    right_secs = [s for s in sections if s["column"] == "right"]
-    full_secs = [s for s in sections if s["column"] == "full"]
+    if breaker != "optimal":
+        return _pack(sections, grid, heights, breaker, hints, dry_run)
+
+    modes = (("optimal", False), ("optimal", True), ("greedy", False))
+    if len(_bands(sections)) == 1:
+        modes = (("optimal", False), ("greedy", False))
+    plans = [
+        _pack(sections, grid, heights, mode, hints, True, tight)
+        for mode, tight in modes
+    ]
+    ranks = [(overflow_rows(placements, grid), pages) for placements, pages in plans]
+    best = ranks.index(min(ranks))
+    if not dry_run and best == len(modes) - 1:
+        print(
+            f"  Optimal breaker needs {plans[0][1]} page(s), greedy "
+            f"{plans[-1][1]}: using the greedy plan"
+        )
+    if not dry_run:
+        _write_splits(plans[best][0])
+    return plans[best]
+
+
+def _write_splits(placements: list[BoxPlacement]) -> None:
+    """Write the -p1, -p2, ... files of every split section in *placements*
+    (a dry plan: the part paths are already the ones written here)."""
+    parts: dict[str, list[BoxPlacement]] = {}
+    for pl in placements:
+        if pl.part:
+            parts.setdefault(pl.source, []).append(pl)
+    for source, pls in parts.items():
+        pls.sort(key=lambda pl: pl.part)
+        paths = split_content_parts(
+            GENERATED_DIR / source, [pl.lines[0] for pl in pls[1:]]
+        )
+        print(
+            f"  Split {source} into {len(paths)} parts -> "
+            f"{', '.join(p.name for p in paths)}"
+        )
+
 
+def overflow_rows(placements: list[BoxPlacement], grid: dict) -> int:
+    """Rows, summed over all boxes, that run below the last grid row of
+    their page (0 = the plan fits). A box taller than a page is placed
+    alone and overflows, by either breaker."""
+    return sum(
+        max(0, pl.y + box_rows(
+            pl.rows, grid[f"{pl.column}_pad_top"], grid[f"{pl.column}_pad_bot"]
+        ) - grid["max_page_y"])
+        for pl in placements
+    )
+
+
+def _pack(
+    sections: list[dict],
+    grid: dict,
+    heights: dict[str, int],
+    breaker: str,
+    hints: dict,
+    dry_run: bool,
+    tight: bool = False,
+) -> tuple[list[BoxPlacement], int]:
+    """One packing of plan_layout: *breaker* in every band; with *tight*
+    (optimal only), every band but the last ends as high as it can."""
     gap_box = grid["gap_box"]
     max_y = grid["max_page_y"]
     start_y = grid["content_start_y"]
     min_split = grid["min_split_rows"]
 
-    class BoxPlacement:
-        def __init__(self, title: str, content_path: str, column: str, page: int):
-            self.title = title
-            self.content_path = content_path
-            self.column = column
-            self.page = page
-
     def pad_top(col: str) -> float:
         return grid[f"{col}_pad_top"]
 
@@ -340,31 +611,29 @@ def generate_layout_canvas(
         return grid[f"{col}_pad_bot"]
 
     def layout_column(
-        col_sections: list[dict], column: str
-    ) -> tuple[list[BoxPlacement], int]:
+        col_sections: list[dict], column: str, page: int, first_y: float
+    ) -> tuple[list[BoxPlacement], int, float | None]:
+        """Greedy: returns (placements, last page, bottom row on it)."""
         placements: list[BoxPlacement] = []
-        current_y = start_y
-        current_page = 1
+        current_page = page
+        current_y = first_y  # row the next box may start at (gap included)
+        end_y = None         # bottom row of the last box placed
 
-        for i, sec in enumerate(col_sections):
+        for sec in col_sections:
             content_key = f"generated/{sec['content']}"
             title = sec["title"]
             c_rows = heights[content_key]
             b_rows = box_rows(c_rows, pad_top(column), pad_bot(column))
-
-            # Gap before this box (except first on this page-column)
-            gap_needed = gap_box if (
-                i > 0 and placements and placements[-1].page == current_page
-            ) else 0
-            test_y = current_y + gap_needed
+            split_hints = hints.get(sec["content"], {})
+            test_y = current_y
 
             if test_y + b_rows <= max_y:
                 # Fits on current page
-                current_y = test_y
                 placements.append(BoxPlacement(
-                    title, f"generated/{sec['content']}", column, current_page
+                    title, content_key, column, current_page, test_y,
+                    c_rows, sec["content"],
                 ))
-                current_y += b_rows
+                end_y = test_y + b_rows
             else:
                 # Overflow — try to split
                 available_content = int(
@@ -380,47 +649,58 @@ def generate_layout_canvas(
                         tex_path.read_text(encoding="utf-8").splitlines()
                     )
                     best_boundary = None
+                    best_rows = 0
                     for bi, bline in enumerate(boundaries):
-                        fraction = bline / total_lines if total_lines > 0 else 0
-                        est_rows = int(math.ceil(c_rows * fraction))
+                        measured = split_hints.get(f"0:{bline}")
+                        if measured is not None:
+                            est_rows = measured
+                        else:
+                            fraction = bline / total_lines if total_lines > 0 else 0
+                            est_rows = int(math.ceil(c_rows * fraction))
                         est_box = box_rows(est_rows, pad_top(column), pad_bot(column))
                         if test_y + est_box <= max_y:
                             best_boundary = bi
+                            best_rows = est_rows
                         else:
                             break
 
                     if best_boundary is not None:
                         p1_path, p2_path = split_content_file(
-                            tex_path, boundaries, best_boundary
-                        )
-                        print(
-                            f"  Split {sec['content']} at boundary {best_boundary} "
-                            f"-> {p1_path.name}, {p2_path.name}"
+                            tex_path, boundaries, best_boundary, not dry_run
                         )
+                        if not dry_run:
+                            print(
+                                f"  Split {sec['content']} at boundary {best_boundary} "
+                                f"-> {p1_path.name}, {p2_path.name}"
+                            )
 
-                        current_y = test_y
+                        bline = boundaries[best_boundary]
                         placements.append(BoxPlacement(
                             title, str(p1_path.relative_to(ROOT)),
-                            column, current_page
+                            column, current_page, test_y, best_rows,
+                            sec["content"], (0, bline), 1,
                         ))
 
+                        # Remainder height: measured if known, else estimated
+                        remaining_rows = split_hints.get(f"{bline}:{total_lines}")
+                        if remaining_rows is None:
+                            total_lines_f = float(total_lines) if total_lines > 0 else 1.0
+                            remaining_fraction = 1.0 - (
+                                boundaries[best_boundary] / total_lines_f
+                            )
+                            remaining_rows = max(1, int(math.ceil(
+                                c_rows * remaining_fraction
+                            )))
+
                         # Move to next page
                         current_page += 1
-                        current_y = start_y
                         placements.append(BoxPlacement(
                             title + " (cont.)",
                             str(p2_path.relative_to(ROOT)),
-                            column, current_page
+                            column, current_page, start_y, remaining_rows,
+                            sec["content"], (bline, total_lines), 2,
                         ))
-                        # Estimate remainder height
-                        total_lines_f = float(total_lines) if total_lines > 0 else 1.0
-                        remaining_fraction = 1.0 - (
-                            boundaries[best_boundary] / total_lines_f
-                        )
-                        remaining_rows = max(1, int(math.ceil(
-                            c_rows * remaining_fraction
-                        )))
-                        current_y += box_rows(
+                        end_y = start_y + box_rows(
                             remaining_rows, pad_top(column), pad_bot(column)
                         )
                         split_done = True
@@ -428,69 +708,668 @@ def generate_layout_canvas(
                 if not split_done:
                     # Can't split — defer entire box to next page
                     current_page += 1
-                    current_y = start_y
                     placements.append(BoxPlacement(
-                        title, f"generated/{sec['content']}",
-                        column, current_page
+                        title, content_key, column, current_page, start_y,
+                        c_rows, sec["content"],
                     ))
-                    current_y += b_rows
+                    end_y = start_y + b_rows
+
+            current_y = end_y + gap_box
+
+        return placements, current_page, end_y
+
+    def optimal_column(
+        col_sections: list[dict],
+        column: str,
+        page: int,
+        first_y: float,
+        balance: dict[int, float],
+        tight_end: bool,
+    ) -> tuple[list[BoxPlacement], int, float | None, dict[int, float]]:
+        """Optimal: as layout_column, plus the bottom row of every page
+        (relative page numbers) for balancing the other column."""
+        items = []
+        for sec in col_sections:
+            tex_path = GENERATED_DIR / sec["content"]
+            items.append({
+                "rows": heights[f"generated/{sec['content']}"],
+                "total_lines": len(
+                    tex_path.read_text(encoding="utf-8").splitlines()
+                ) if tex_path.exists() else 0,
+                "boundaries": find_split_boundaries(tex_path),
+                "hints": hints.get(sec["content"], {}),
+            })
+        geom = {
+            "start_y": start_y,
+            "max_y": max_y,
+            "gap": gap_box,
+            "pad_top": pad_top(column),
+            "pad_bot": pad_bot(column),
+            "min_split": min_split,
+        }
+        pages = break_column(items, geom, balance, first_y, tight_end)
+        ends = page_end_rows(pages, geom, first_y)
+
+        # Position every fragment, then split every section that spans
+        # more than one fragment
+        fragments: dict[int, list[tuple[int, float, int, int, int]]] = {}
+        for rel, frags in enumerate(pages):
+            y = first_y if rel == 0 else start_y
+            for j, start, end, rows in frags:
+                fragments.setdefault(j, []).append((page + rel, y, start, end, rows))
+                y += box_rows(rows, geom["pad_top"], geom["pad_bot"]) + gap_box
 
-        max_pg = max((p.page for p in placements), default=1)
-        return placements, max_pg
+        placements: list[BoxPlacement] = []
+        for j, sec in enumerate(col_sections):
+            parts = fragments[j]
+            if len(parts) == 1:
+                pg, y, _, _, rows = parts[0]
+                placements.append(BoxPlacement(
+                    sec["title"], f"generated/{sec['content']}", column,
+                    pg, y, rows, sec["content"],
+                ))
+                continue
+            paths = split_content_parts(
+                GENERATED_DIR / sec["content"], [part[2] for part in parts[1:]],
+                not dry_run,
+            )
+            if not dry_run:
+                print(
+                    f"  Split {sec['content']} into {len(paths)} parts -> "
+                    f"{', '.join(p.name for p in paths)}"
+                )
+            for n, ((pg, y, start, end, rows), path) in enumerate(zip(parts, paths), 1):
+                placements.append(BoxPlacement(
+                    sec["title"] if n == 1 else sec["title"] + " (cont.)",
+                    str(path.relative_to(ROOT)), column, pg, y, rows,
+                    sec["content"], (start, end), n,
+                ))
 
-    left_pl, left_max = layout_column(left_secs, "left")
-    right_pl, right_max = layout_column(right_secs, "right")
-    full_pl, full_max = layout_column(full_secs, "full")
+        if not pages:
+            return placements, page, None, ends
+        return placements, page + len(pages) - 1, ends.get(len(pages)), ends
+
+    def place(
+        col_sections: list[dict],
+        column: str,
+        page: int,
+        first_y: float,
+        balance: dict[int, float],
+        tight_end: bool,
+    ) -> tuple[list[BoxPlacement], int, float | None, dict[int, float]]:
+        if breaker == "optimal":
+            return optimal_column(col_sections, column, page, first_y, balance, tight_end)
+        return (*layout_column(col_sections, column, page, first_y), {})
+
+    placements: list[BoxPlacement] = []
+    page, next_y = 1, start_y
+    bands = _bands(sections)
+    for n, (kind, first, second) in enumerate(bands, 1):
+        tight_end = tight and n < len(bands)
+        if kind == "full":
+            runs = [place(first, "full", page, next_y, {}, tight_end)]
+        else:
+            # Right column first (usually the shorter one), then the
+            # left balanced against it (unless it must end high).
+            right = place(second, "right", page, next_y, {}, tight_end)
+            balance = {} if tight_end else right[3]
+            runs = [place(first, "left", page, next_y, balance, tight_end), right]
+        for run in runs:
+            placements += run[0]
+
+        # The next band starts below the lowest box on the last page
+        ends = [(last, end) for _, last, end, _ in runs if end is not None]
+        if ends:
+            page = max(last for last, _ in ends)
+            next_y = max(end for last, end in ends if last == page) + gap_box
+
+    total_pages = max((p.page for p in placements), default=1)
+    return placements, total_pages
+
+
+def _row(y: float, grid: dict) -> str:
+    """Canvas Y coordinate: \\ContentStartY where it applies, else the row."""
+    return r"\ContentStartY" if y == grid["content_start_y"] else f"{y:g}"
+
+
+def build_layout_canvas(
+    placements: list[BoxPlacement],
+    total_pages: int,
+    header_theme: str,
+    grid: dict,
+    cached: bool = False,
+) -> str:
+    """Return canvas.tex for a computed plan.
 
-    total_pages = max(left_max, right_max, full_max)
+    A box directly below the previous one in its column is chained with
+    \\...BoxGap so TeX's own cursor places it; any other box (the first on
+    a page, or the first below a full-width band) gets \\...BoxInit at its
+    planned row.
 
-    # --- Generate canvas.tex ---
+    With *cached*, boxes are placed with \\CachedBox and their render-cache
+    key (lib/boxcache.py) instead of being typeset in the final pass.
+    """
+    setup = boxcache.setup_digest() if cached else ""
+    lanes = (
+        ("left", "Left column", "LeftBox", "0"),
+        ("right", "Right column", "RightBox", r"\RightColX"),
+        ("full", "Full-width", "FullBox", "0"),
+    )
     out: list[str] = [_canvas_header(header_theme)]
 
     for page in range(1, total_pages + 1):
         _emit_page_header(out, page)
 
-        page_left = [p for p in left_pl if p.page == page]
-        if page_left:
-            out.append("% --- Left column ---")
-            out.append(r"\LeftBoxInit{0}{\ContentStartY}")
-            for i, pl in enumerate(page_left):
-                if i > 0:
-                    out.append(r"\LeftBoxGap{\GapBoxToBox}")
-                out.append(f"\\LeftBox{{{pl.title}}}{{{pl.content_path}}}")
-            out.append("")
-
-        page_right = [p for p in right_pl if p.page == page]
-        if page_right:
-            out.append("% --- Right column ---")
-            out.append(r"\RightBoxInit{\RightColX}{\ContentStartY}")
-            for i, pl in enumerate(page_right):
-                if i > 0:
-                    out.append(r"\RightBoxGap{\GapBoxToBox}")
-                out.append(f"\\RightBox{{{pl.title}}}{{{pl.content_path}}}")
-            out.append("")
-
-        page_full = [p for p in full_pl if p.page == page]
-        if page_full:
-            out.append("% --- Full-width ---")
-            out.append(r"\FullBoxInit{0}{\ContentStartY}")
-            for i, pl in enumerate(page_full):
-                if i > 0:
-                    out.append(r"\FullBoxGap{\GapBoxToBox}")
-                out.append(f"\\FullBox{{{pl.title}}}{{{pl.content_path}}}")
+        used: set[str] = set()
+        for column, label, macro, x in lanes:
+            boxes = sorted(
+                (p for p in placements if p.column == column and p.page == page),
+                key=lambda p: p.y,
+            )
+            if not boxes:
+                continue
+            used.add(column)
+            out.append(f"% --- {label} ---")
+            prev = None
+            for pl in boxes:
+                if prev is not None and _chained(prev, pl, grid):
+                    out.append(f"\\{macro}Gap{{\\GapBoxToBox}}")
+                else:
+                    out.append(f"\\{macro}Init{{{x}}}{{{_row(pl.y, grid)}}}")
+                out.append(_box_line(pl, macro, setup))
+                prev = pl
             out.append("")
 
         # Init cursors for columns with no boxes on this page (for reset)
-        if not page_left and page > 1:
+        if "left" not in used and page > 1:
             out.append(r"\LeftBoxInit{0}{\ContentStartY}")
-        if not page_right and page > 1:
+        if "right" not in used and page > 1:
             out.append(r"\RightBoxInit{\RightColX}{\ContentStartY}")
         out.append("")
 
     out.append(r"\endinput")
+    return "\n".join(out) + "\n"
+
+
+def _box_line(pl: BoxPlacement, macro: str, setup: str) -> str:
+    """The canvas command that draws one box (\\CachedBox when *setup*)."""
+    if setup:
+        content = (ROOT / pl.content_path).read_bytes()
+        if boxcache.cacheable(content):
+            key = boxcache.box_key(setup, pl.column, pl.title, content, pl.rows)
+            prefix = boxcache.COLUMN_PREFIX[pl.column]
+            return f"\\CachedBox{{{prefix}}}{{{key}}}{{{pl.title}}}{{{pl.content_path}}}"
+    return f"\\{macro}{{{pl.title}}}{{{pl.content_path}}}"
+
 
-    CANVAS_TEX_PATH.write_text("\n".join(out) + "\n", encoding="utf-8")
+def save_plan(placements: list[BoxPlacement], total_pages: int, iteration: int) -> None:
+    """Write build/layout-plan.json (read back by --converge)."""
+    LAYOUT_PLAN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    LAYOUT_PLAN_PATH.write_text(json.dumps({
+        "iteration": iteration,
+        "pages": total_pages,
+        "placements": [p.to_dict() for p in placements],
+    }, indent=2) + "\n", encoding="utf-8")
+
+
+def load_plan() -> tuple[list[BoxPlacement], int, int]:
+    """Read build/layout-plan.json → (placements, total pages, iteration)."""
+    if not LAYOUT_PLAN_PATH.exists():
+        die(f"{LAYOUT_PLAN_PATH} not found. Run layout.py --layout first.")
+    data = json.loads(LAYOUT_PLAN_PATH.read_text(encoding="utf-8"))
+    placements = [BoxPlacement.from_dict(p) for p in data["placements"]]
+    return placements, data["pages"], data["iteration"]
+
+
+def generate_layout_canvas(
+    sections: list[dict],
+    grid: dict,
+    heights: dict[str, int],
+    header_theme: str,
+    breaker: str,
+    hints: dict | None = None,
+    allow_reuse: bool = True,
+    iteration: int = 0,
+) -> bool:
+    """Compute page layout, split overflowing content, write canvas.tex.
+
+    Returns True when the layout is the measurement canvas itself — a single
+    page with no splits — in which case pass 1 already compiled the final
+    document: canvas.tex is left untouched and REUSE_PASS1_PATH is written.
+    --converge passes allow_reuse=False, since by then the last compile was
+    not the measurement canvas.
+    """
+    REUSE_PASS1_PATH.unlink(missing_ok=True)
+
+    with trace.span("page breaking"):
+        placements, total_pages = plan_layout(
+            sections, grid, heights, breaker, hints
+        )
+    trace.count("pages", total_pages)
+    save_plan(placements, total_pages, iteration)
+
+    canvas = build_layout_canvas(placements, total_pages, header_theme, grid)
+
+    if allow_reuse and _canvas_lines(canvas) == _canvas_lines(
+        build_measure_canvas(sections, header_theme)
+    ):
+        REUSE_PASS1_PATH.parent.mkdir(parents=True, exist_ok=True)
+        REUSE_PASS1_PATH.write_text(
+            "layout == measurement canvas (1 page, no splits)\n", encoding="utf-8"
+        )
+        trace.count("pass1_reused")
+        print(
+            f"  Layout matches the measurement canvas — keeping "
+            f"{CANVAS_TEX_PATH.relative_to(ROOT)}; pass 1 output is final "
+            f"({REUSE_PASS1_PATH.relative_to(ROOT)})"
+        )
+        return True
+
+    if boxcache.enabled():
+        canvas = build_layout_canvas(
+            placements, total_pages, header_theme, grid, cached=True
+        )
+    CANVAS_TEX_PATH.write_text(canvas, encoding="utf-8")
     print(f"  Generated {CANVAS_TEX_PATH.relative_to(ROOT)} (layout pass)")
+    return False
+
+
+# ---------------------------------------------------------------------------
+# MODE 3: --converge — verify the compiled layout, re-layout if it overflows
+# ---------------------------------------------------------------------------
+#
+# After a compile, boxheights.dat holds the height of every box that was
+# actually rendered — including the -p1/-p2 parts, whose heights the plan
+# only estimated. --converge checks every page/column against max_page_y
+# with those real numbers. If anything overflows, the measured part heights
+# become hints for the next plan_layout() and the canvas is rewritten; the
+# pipeline recompiles and calls --converge again, up to
+# MAX_CONVERGE_ITERATIONS re-layouts.
+#
+# Exit codes (read by the Dockerfile loop):
+CONVERGE_OK = 0            # every column fits — ship it
+CONVERGE_NOT_FIXED = 2     # still overflowing; cap reached or no better plan
+CONVERGE_RECOMPILE = 3     # canvas rewritten — compile again, then re-run
+
+MAX_CONVERGE_ITERATIONS = 3
+
+
+def _load_hints() -> dict:
+    if not LAYOUT_HINTS_PATH.exists():
+        return {}
+    return json.loads(LAYOUT_HINTS_PATH.read_text(encoding="utf-8"))
+
+
+def verify_plan(
+    placements: list[BoxPlacement],
+    grid: dict,
+    rendered: dict[str, int],
+) -> list[tuple[int, str, float, str]]:
+    """Return (page, column, end_y, problem) for every page/column, using
+    the heights the last compile actually rendered.
+
+    Chained boxes move down with a taller box above them; boxes placed with
+    \\...BoxInit stay at their planned row, so a taller box above one can
+    overlap it instead. *problem* is the title of the box it overlaps, or "".
+    """
+    result: list[tuple[int, str, float, str]] = []
+    groups: dict[tuple[int, str], list[BoxPlacement]] = {}
+    for pl in placements:
+        groups.setdefault((pl.page, pl.column), []).append(pl)
+
+    # Rendered extent of every box, replaying the canvas cursors
+    extents: dict[int, list[tuple[float, float, str, str]]] = {}
+    for (page, column), boxes in sorted(groups.items()):
+        prev = None
+        end = 0.0
+        for pl in sorted(boxes, key=lambda p: p.y):
+            if pl.content_path not in rendered:
+                die(
+                    f"no rendered height for '{pl.content_path}' in "
+                    f"boxheights.dat. Compile the current canvas first."
+                )
+            if prev is not None and _chained(prev, pl, grid):
+                y = end + grid["gap_box"]
+            else:
+                y = pl.y
+            end = y + box_rows(
+                rendered[pl.content_path],
+                grid[f"{column}_pad_top"],
+                grid[f"{column}_pad_bot"],
+            )
+            extents.setdefault(page, []).append((y, end, column, pl.title))
+            prev = pl
+
+    # Overlaps: sweep each page top to bottom; a full-width box clashes
+    # with anything, a column box with its own column and full-width boxes
+    clashes: dict[tuple[int, str], str] = {}
+    for page, boxes in extents.items():
+        boxes.sort()
+        for i, (y, end, column, title) in enumerate(boxes):
+            for y2, _, column2, title2 in boxes[i + 1:]:
+                if y2 >= end:
+                    break
+                if "full" in (column, column2) or column == column2:
+                    clashes.setdefault((page, column2), title)
+
+    for (page, column), boxes in sorted(groups.items()):
+        end_y = max(end for _, end, col, _ in extents[page] if col == column)
+        result.append((page, column, end_y, clashes.get((page, column), "")))
+    return result
+
+
+def _page_signature(placements: list[BoxPlacement]) -> dict[int, list[tuple]]:
+    pages: dict[int, list[tuple]] = {}
+    for pl in placements:
+        pages.setdefault(pl.page, []).append(
+            (pl.column, pl.content_path, pl.lines, pl.part, pl.y)
+        )
+    return pages
+
+
+def converge(
+    sections: list[dict], grid: dict, header_theme: str, breaker: str
+) -> int:
+    """Verify the last compile; re-layout if needed. Returns an exit code."""
+    placements, total_pages, iteration = load_plan()
+    rendered = load_boxheights()
+    max_y = grid["max_page_y"]
+
+    report: list[str] = [f"Layout convergence — iteration {iteration}"]
+    overflow = False
+    for page, column, end_y, problem in verify_plan(placements, grid, rendered):
+        status = "ok"
+        if end_y > max_y:
+            status = f"OVERFLOW by {end_y - max_y:g} rows"
+            overflow = True
+        elif problem:
+            status = f"OVERLAPS {problem}"
+            overflow = True
+        report.append(
+            f"  page {page}  {column:<5}  ends at row {end_y:g} / {max_y:g}  {status}"
+        )
+
+    # Record what every split part really measured
+    hints = _load_hints()
+    parts = [pl for pl in placements if pl.part]
+    if parts:
+        report.append("  split parts (planned → rendered content rows):")
+    for pl in parts:
+        measured = rendered[pl.content_path]
+        start, end = pl.lines
+        hints.setdefault(pl.source, {})[f"{start}:{end}"] = measured
+        report.append(
+            f"    {pl.source} lines {start}-{end} (p{pl.part}): "
+            f"{pl.rows} → {measured}"
+        )
+    LAYOUT_HINTS_PATH.write_text(json.dumps(hints, indent=2) + "\n", encoding="utf-8")
+
+    def finish(code: int, result: str) -> int:
+        report.append(f"Result: {result}")
+        LAYOUT_REPORT_PATH.write_text("\n".join(report) + "\n", encoding="utf-8")
+        print("\n".join(report))
+        trace.count("converge_iteration", iteration)
+        return code
+
+    if not overflow:
+        return finish(CONVERGE_OK, "converged — every column fits")
+    if iteration >= MAX_CONVERGE_ITERATIONS:
+        return finish(
+            CONVERGE_NOT_FIXED,
+            f"NOT converged after {iteration} re-layout(s) — output overflows",
+        )
+
+    # Whole sections: trust what was rendered over the pass-1 measurement
+    heights = load_boxheights(MEASURED_HEIGHTS_PATH)
+    for pl in placements:
+        if not pl.part:
+            heights[pl.content_path] = rendered[pl.content_path]
+    before = _page_signature(placements)
+    generate_layout_canvas(
+        sections, grid, heights, header_theme, breaker,
+        hints=hints, allow_reuse=False, iteration=iteration + 1,
+    )
+    after_placements, _, _ = load_plan()
+    after = _page_signature(after_placements)
+    changed = sorted(
+        page for page in set(before) | set(after)
+        if before.get(page) != after.get(page)
+    )
+    if not changed:
+        return finish(
+            CONVERGE_NOT_FIXED,
+            "NOT converged — measured heights leave no better plan "
+            "(a box may be taller than a page)",
+        )
+    return finish(
+        CONVERGE_RECOMPILE,
+        f"re-laid out (pages changed: {', '.join(map(str, changed))}) — recompile",
+    )
+
+
+# ---------------------------------------------------------------------------
+# MODE 4: --preview — draw the planned pages in the terminal (no TeX)
+# ---------------------------------------------------------------------------
+
+def preview_heights(
+    sections: list[dict], grid: dict, params: dict[str, float]
+) -> tuple[dict[str, int], set[str]]:
+    """Heights for a preview: the last measurement, adjusted to layout.yaml.
+
+    A section whose content and column match an entry in build/cache/heights
+    (measure.py) takes that measurement, so moving a section back to a column
+    it was measured in is exact. Otherwise a section moved to another column
+    since it was measured (its column in build/layout-plan.json) is rescaled
+    by the change in content width; a section never measured gets one row
+    per two source lines. Returns (heights, keys that are estimates).
+    """
+    path = MEASURED_HEIGHTS_PATH if MEASURED_HEIGHTS_PATH.exists() else BOXHEIGHTS_PATH
+    heights = load_boxheights(path) if path.exists() else {}
+    measured_in: dict[str, str] = {}
+    if LAYOUT_PLAN_PATH.exists():
+        placements, _, _ = load_plan()
+        measured_in = {p.source: p.column for p in placements}
+    # No generated setup yet (never built) means no cache entry can match
+    setup = (
+        setup_digest()
+        if all(p.exists() for p in SETUP_PATHS) else None
+    )
+
+    widths = content_widths(grid["grid_cols"], params)
+    estimated: set[str] = set()
+    for sec in sections:
+        key = f"generated/{sec['content']}"
+        if setup and (GENERATED_DIR / sec["content"]).exists():
+            rows = cached_height(setup, sec["content"], sec["column"])
+            if rows is not None:
+                heights[key] = rows
+                continue
+        if key not in heights:
+            tex_path = GENERATED_DIR / sec["content"]
+            lines = [
+                l for l in (tex_path.read_text(encoding="utf-8").splitlines()
+                            if tex_path.exists() else [])
+                if l.strip() and not l.lstrip().startswith("%")
+            ]
+            heights[key] = max(1, math.ceil(len(lines) / 2))
+            estimated.add(key)
+            continue
+        old = measured_in.get(sec["content"], sec["column"])
+        if old != sec["column"]:
+            heights[key] = max(1, math.ceil(
+                heights[key] * widths[old] / widths[sec["column"]]
+            ))
+            estimated.add(key)
+    return heights, estimated
+
+
+def render_preview(
+    placements: list[BoxPlacement],
+    total_pages: int,
+    grid: dict,
+    params: dict[str, float],
+    estimated: set[str] = frozenset(),
+) -> str:
+    """Draw every page as a grid_cols × grid_rows character grid.
+
+    Box outlines carry the title and content rows; a ✂ bottom edge marks a
+    split that continues on a later page, ▼ a box that runs off the page.
+    Blank rows between boxes are gaps, · is free space to the page bottom.
+    """
+    cols, rows = grid["grid_cols"], grid["grid_rows"]
+    max_y = int(grid["max_page_y"])
+    start_y = int(grid["content_start_y"])
+    right_x = int(round(params["LeftBoxWidth"] + params["ColumnGap"]))
+    lanes = {
+        "left": (0, int(params["LeftBoxWidth"])),
+        "right": (right_x, cols - right_x),
+        "full": (0, cols),
+    }
+    continues = {
+        (p.source, p.part - 1): p.page for p in placements if p.part > 1
+    }
+
+    def put(canvas: list[list[str]], y: int, x: int, text: str) -> None:
+        if 0 <= y < rows:
+            for i, ch in enumerate(text):
+                if 0 <= x + i < cols:
+                    canvas[y][x + i] = ch
+
+    def frame(canvas, x, y, w, h, title, bottom="", fill="─") -> int:
+        """Draw one box; returns the row below it (clipped to the page)."""
+        end = y + h
+        title = f"─ {title} " if len(title) + 6 <= w else "─"
+        put(canvas, y, x, "┌" + title + "─" * (w - 2 - len(title)) + "┐")
+        for r in range(y + 1, min(end - 1, rows)):
+            put(canvas, r, x, "│")
+            put(canvas, r, x + w - 1, "│")
+        if end > rows:
+            put(canvas, rows - 1, x, f"▼ runs {end - rows} rows off the page ▼".center(w))
+            return rows
+        bottom = f" {bottom} " if bottom else ""
+        put(canvas, end - 1, x, "└" + bottom.center(w - 2, fill) + "┘")
+        return end
+
+    out: list[str] = []
+    for page in range(1, total_pages + 1):
+        canvas = [[" "] * cols for _ in range(rows)]
+        # \CVPageBreak repeats the header on every page
+        frame(canvas, 0, 0, cols, int(grid["header_height"]), "HEADER")
+
+        spans: dict[str, list[tuple[int, int]]] = {"left": [], "right": []}
+        for pl in sorted((p for p in placements if p.page == page), key=lambda p: p.y):
+            x, w = lanes[pl.column]
+            h = box_rows(pl.rows, grid[f"{pl.column}_pad_top"], grid[f"{pl.column}_pad_bot"])
+            title = pl.title + (" ?" if f"generated/{pl.source}" in estimated else "")
+            bottom, fill = "", "─"
+            if (pl.source, pl.part) in continues:
+                bottom, fill = f"✂ continues on p.{continues[pl.source, pl.part]}", "╌"
+            y = int(math.floor(pl.y))
+            end = frame(canvas, x, y, w, h, title, bottom, fill)
+            put(canvas, y + 1, x + 2, f"{pl.rows} rows"[: max(0, w - 4)])
+            for lane in (("left", "right") if pl.column == "full" else (pl.column,)):
+                spans[lane].append((y, end))
+
+        # Rows no box covers: a gap just below a box, free space otherwise
+        gap = int(math.ceil(grid["gap_box"]))
+        free = {}
+        for lane, boxes in spans.items():
+            x, w = lanes[lane]
+            used = set()
+            for y, end in boxes:
+                used.update(range(y, end + gap))
+            free_rows = [r for r in range(start_y, max_y) if r not in used]
+            for r in free_rows:
+                put(canvas, r, x, "·" * w)
+            free[lane] = len(free_rows)
+
+        out.append(
+            f"PAGE {page}/{total_pages}  ·  free rows: left {free['left']}, "
+            f"right {free['right']}"
+        )
+        out.append("╭" + "─" * cols + "╮")
+        out.extend("│" + "".join(line) + "│" for line in canvas)
+        out.append("╰" + "─" * cols + "╯")
+        out.append("")
+
+    if estimated:
+        out.append(
+            "? height estimated (moved to another column, or not measured yet)"
+        )
+    return "\n".join(out)
+
+
+# ---------------------------------------------------------------------------
+# MODE 5: --single / --crosscheck — page breaks inside the LuaLaTeX run
+# ---------------------------------------------------------------------------
+#
+# engine/pagebreak.lua ports the greedy rules of plan_layout() (with
+# find_split_boundaries and split_content_parts), so one compile measures,
+# breaks and places. It writes build/layout-plan.json and the whole-section
+# heights like --layout would; --crosscheck re-plans those heights here and
+# compares. --converge then verifies the compiled heights as usual.
+
+def build_single_canvas(sections: list[dict], header_theme: str) -> str:
+    """Return the canvas that lays itself out in one LuaLaTeX run."""
+    out: list[str] = [_canvas_header(header_theme)]
+    out.append(r"\input{engine/measure.tex}")
+    out.append(r"\input{engine/pagebreak.tex}")
+    out.append("")
+    out.append("% --- Measure every section, then break and place (pagebreak.lua) ---")
+    for sec in sections:
+        prefix = boxcache.COLUMN_PREFIX[sec["column"]]
+        out.append(f"\\LayoutSection{{{prefix}}}{{{sec['title']}}}{{{sec['content']}}}")
+    out.append(
+        f"\\LayoutRun{{{LAYOUT_PLAN_PATH.relative_to(ROOT)}}}"
+        f"{{{MEASURED_HEIGHTS_PATH.relative_to(ROOT)}}}"
+    )
+    out.append("")
+    out.append(r"\endinput")
+    return "\n".join(out) + "\n"
+
+
+def generate_single_canvas(sections: list[dict], header_theme: str) -> None:
+    """Write the single-compile canvas."""
+    REUSE_PASS1_PATH.unlink(missing_ok=True)
+    LAYOUT_HINTS_PATH.unlink(missing_ok=True)
+    LAYOUT_PLAN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CANVAS_TEX_PATH.write_text(
+        build_single_canvas(sections, header_theme), encoding="utf-8"
+    )
+    print(f"  Generated {CANVAS_TEX_PATH.relative_to(ROOT)} (single-compile layout)")
+
+
+def _assignment(p: BoxPlacement) -> tuple:
+    """What both planners must agree on for one box (titles aside: TeX
+    hands them to Lua detokenized)."""
+    return (p.page, p.column, round(p.y, 6), p.rows, p.content_path,
+            p.part, tuple(p.lines) if p.lines else None)
+
+
+def crosscheck(sections: list[dict], grid: dict) -> int:
+    """Compare pagebreak.lua's plan with plan_layout(greedy). 0 = identical."""
+    placements, total_pages, _ = load_plan()
+    heights = load_boxheights(MEASURED_HEIGHTS_PATH)
+    expected, expected_pages = plan_layout(
+        sections, grid, heights, "greedy", dry_run=True
+    )
+    lua = sorted(map(_assignment, placements))
+    python = sorted(map(_assignment, expected))
+    if lua == python and total_pages == expected_pages:
+        print(f"  pagebreak.lua and layout.py agree: {len(lua)} boxes on "
+              f"{total_pages} page(s)")
+        return 0
+    print(
+        f"WARNING: pagebreak.lua planned {total_pages} page(s), layout.py "
+        f"{expected_pages}", file=sys.stderr,
+    )
+    for box in lua:
+        if box not in python:
+            print(f"  only pagebreak.lua: {box}", file=sys.stderr)
+    for box in python:
+        if box not in lua:
+            print(f"  only layout.py:     {box}", file=sys.stderr)
+    return 1
 
 
 # ---------------------------------------------------------------------------
@@ -498,10 +1377,17 @@ def generate_layout_canvas(
 # ---------------------------------------------------------------------------
 
 def main() -> None:
-    if len(sys.argv) != 2 or sys.argv[1] not in ("--measure", "--layout"):
+    if len(sys.argv) != 2 or sys.argv[1] not in (
+        "--measure", "--layout", "--converge", "--preview", "--single",
+        "--crosscheck",
+    ):
         print(
             "Usage: layout.py --measure   (generate passthrough canvas)\n"
-            "       layout.py --layout    (generate canvas with page breaks)",
+            "       layout.py --layout    (generate canvas with page breaks)\n"
+            "       layout.py --converge  (verify compiled heights, re-layout if needed)\n"
+            "       layout.py --preview   (draw the pages in the terminal, no TeX)\n"
+            "       layout.py --single    (canvas that breaks pages in LuaTeX, one compile)\n"
+            "       layout.py --crosscheck (compare that plan with layout.py's)",
             file=sys.stderr,
         )
         sys.exit(1)
@@ -510,7 +1396,8 @@ def main() -> None:
 
     contact = load_contact()
     sections = load_layout()
-    params = parse_preamble()
+    breaker = load_breaker()
+    params = load_params(contact.get("header_theme"))
     grid = compute_grid(contact, params)
 
     print(
@@ -532,13 +1419,48 @@ def main() -> None:
     if mode == "--measure":
         print("Generating measurement canvas...")
         generate_measure_canvas(sections, header_theme)
+        choose_pass1(sections, grid, params, header_theme, breaker)
 
     elif mode == "--layout":
         heights = load_boxheights()
         print(f"Loaded heights: {heights}")
-        print("Computing page layout...")
-        generate_layout_canvas(sections, grid, heights, header_theme)
+        # --converge re-plans from these whole-section heights; pass 2
+        # overwrites boxheights.dat with the heights of what it rendered.
+        shutil.copyfile(BOXHEIGHTS_PATH, MEASURED_HEIGHTS_PATH)
+        LAYOUT_HINTS_PATH.unlink(missing_ok=True)
+        print(f"Computing page layout ({breaker} breaker)...")
+        # Only a serial pass 1 compiled the measurement canvas into a PDF
+        # that could be reused; scripts/measure.py compiles no canvas.
+        generate_layout_canvas(
+            sections, grid, heights, header_theme, breaker,
+            allow_reuse=SERIAL_PASS1_PATH.exists(),
+        )
+
+    elif mode == "--converge":
+        print("Checking compiled layout...")
+        sys.exit(converge(sections, grid, header_theme, breaker))
+
+    elif mode == "--preview":
+        heights, estimated = preview_heights(sections, grid, params)
+        with trace.span("page breaking"):
+            placements, total_pages = plan_layout(
+                sections, grid, heights, breaker, dry_run=True
+            )
+        print(render_preview(placements, total_pages, grid, params, estimated))
+
+    elif mode == "--single":
+        if breaker != "greedy":
+            print(
+                f"  Note: single-compile mode uses the greedy breaker "
+                f"(layout.yaml: {breaker})"
+            )
+        generate_single_canvas(sections, header_theme)
+
+    elif mode == "--crosscheck":
+        print("Cross-checking pagebreak.lua against layout.py (greedy)...")
+        sys.exit(crosscheck(sections, grid))
 
 
 if __name__ == "__main__":
-    main()
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
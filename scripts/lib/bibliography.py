@@ -0,0 +1,531 @@
+"""
+lib/bibliography.py — Publications from BibTeX (.bib) and CSL-JSON files.
+
+publications.yaml may point at one or more bibliography files instead of
+(or as well as) listing hand-written entries:
+
+    source:
+      files: ["publications.bib"]     # relative to content/
+      types: ["article", "inproceedings"]
+      year_from: 2018
+      year_to: 2025
+      sort: "year-desc"
+      max_authors: 6
+      limit: 20
+
+Every file is parsed once and the parsed records are cached under
+build/cache/bibliography/<sha256 of file bytes>.json, so an unchanged
+bibliography costs one hash + one JSON load per build no matter how many
+entries it has. Filtering, sorting and formatting run on the cached
+records and produce the same {authors, title, venue, year} dicts that
+hand-written entries use, so gen_designed_publications() and
+ats_publications() consume both without knowing the difference.
+
+Stdlib only — no pybtex/citeproc dependency.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from lib.config import CACHE_DIR, CONTENT_DIR, die
+
+# Bump when the parsed-record format changes so stale cache files are ignored.
+PARSER_VERSION = 2
+
+BIB_CACHE_DIR = CACHE_DIR / "bibliography"
+
+VALID_SORTS = ("year-desc", "year-asc", "title", "none")
+
+# Fields tried in order to build the "venue" line.
+_VENUE_FIELDS = (
+    "journal", "booktitle", "howpublished", "publisher",
+    "school", "institution", "organization",
+)
+
+_MONTH_MACROS = {
+    "jan": "January", "feb": "February", "mar": "March", "apr": "April",
+    "may": "May", "jun": "June", "jul": "July", "aug": "August",
+    "sep": "September", "oct": "October", "nov": "November", "dec": "December",
+}
+
+
+# ---------------------------------------------------------------------------
+# BibTeX parser
+# ---------------------------------------------------------------------------
+
+class BibParseError(ValueError):
+    """Raised for malformed BibTeX input."""
+
+
+def _read_braced(text: str, pos: int) -> tuple[str, int]:
+    """Read a {...} group starting at text[pos] == '{'. Return (inner, end)."""
+    depth = 0
+    start = pos
+    while pos < len(text):
+        ch = text[pos]
+        if ch == "\\":
+            pos += 2
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:pos], pos + 1
+        pos += 1
+    raise BibParseError(f"unbalanced braces starting at offset {start}")
+
+
+def _read_quoted(text: str, pos: int) -> tuple[str, int]:
+    """Read a "..." string starting at text[pos] == '"' (braces may nest)."""
+    depth = 0
+    start = pos
+    pos += 1
+    while pos < len(text):
+        ch = text[pos]
+        if ch == "\\":
+            pos += 2
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+        elif ch == '"' and depth == 0:
+            return text[start + 1:pos], pos + 1
+        pos += 1
+    raise BibParseError(f"unterminated string starting at offset {start}")
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+_IDENT = re.compile(r"[^\s\"#%'(),={}]+")
+
+
+def _read_value(text: str, pos: int, macros: dict[str, str]) -> tuple[str, int]:
+    """Read a field value: pieces joined with '#' concatenation."""
+    parts: list[str] = []
+    while True:
+        pos = _skip_ws(text, pos)
+        if pos >= len(text):
+            raise BibParseError("unexpected end of input in field value")
+        ch = text[pos]
+        if ch == "{":
+            piece, pos = _read_braced(text, pos)
+        elif ch == '"':
+            piece, pos = _read_quoted(text, pos)
+        else:
+            m = _IDENT.match(text, pos)
+            if not m:
+                raise BibParseError(f"unexpected '{ch}' at offset {pos}")
+            word = m.group(0)
+            pos = m.end()
+            piece = word if word.isdigit() else macros.get(word.lower(), word)
+        parts.append(piece)
+        pos = _skip_ws(text, pos)
+        if pos < len(text) and text[pos] == "#":
+            pos += 1
+            continue
+        return "".join(parts), pos
+
+
+def parse_bibtex(text: str) -> list[dict]:
+    """Parse BibTeX source into records: {type, key, fields: {name: raw}}."""
+    macros = dict(_MONTH_MACROS)
+    records: list[dict] = []
+    pos = 0
+    while True:
+        at = text.find("@", pos)
+        if at < 0:
+            break
+        m = re.compile(r"@\s*(\w+)\s*([{(])").match(text, at)
+        if not m:
+            pos = at + 1
+            continue
+        entry_type = m.group(1).lower()
+        close = "}" if m.group(2) == "{" else ")"
+        pos = m.end()
+
+        if entry_type == "comment":
+            # @comment{...} — skip the balanced group (or just the keyword)
+            if m.group(2) == "{":
+                _, pos = _read_braced(text, m.end() - 1)
+            continue
+        if entry_type == "preamble":
+            _, pos = _read_value(text, pos, macros)
+            end = text.find(close, pos)
+            if end == -1:
+                raise BibParseError(f"unterminated @{entry_type} at offset {at}")
+            pos = end + 1
+            continue
+        if entry_type == "string":
+            name_m = _IDENT.match(text, _skip_ws(text, pos))
+            if not name_m:
+                raise BibParseError(f"malformed @string at offset {at}")
+            pos = _skip_ws(text, name_m.end())
+            if pos >= len(text) or text[pos] != "=":
+                raise BibParseError(f"malformed @string at offset {at}")
+            value, pos = _read_value(text, pos + 1, macros)
+            macros[name_m.group(0).lower()] = value
+            end = text.find(close, pos)
+            if end == -1:
+                raise BibParseError(f"unterminated @{entry_type} at offset {at}")
+            pos = end + 1
+            continue
+
+        # Regular entry: key, then field = value pairs. The key ends at the
+        # first comma or at the entry's closing delimiter (no fields).
+        key_m = re.compile(r"[^,\s" + re.escape(close) + r"]*\s*").match(text, pos)
+        pos = key_m.end()
+        key = key_m.group(0).strip()
+        if pos >= len(text):
+            raise BibParseError(f"unterminated entry at offset {at}")
+        if text[pos] == close:
+            records.append({"type": entry_type, "key": key, "fields": {}})
+            pos += 1
+            continue
+        if text[pos] != ",":
+            raise BibParseError(f"malformed key in entry at offset {at}")
+        pos += 1
+        fields: dict[str, str] = {}
+        while True:
+            pos = _skip_ws(text, pos)
+            if pos >= len(text):
+                raise BibParseError(f"unterminated entry '{key}'")
+            if text[pos] == close:
+                pos += 1
+                break
+            if text[pos] == ",":
+                pos += 1
+                continue
+            name_m = _IDENT.match(text, pos)
+            if not name_m:
+                raise BibParseError(
+                    f"unexpected '{text[pos]}' in entry '{key}' at offset {pos}"
+                )
+            pos = _skip_ws(text, name_m.end())
+            if pos >= len(text) or text[pos] != "=":
+                raise BibParseError(f"field '{name_m.group(0)}' in '{key}' has no value")
+            value, pos = _read_value(text, pos + 1, macros)
+            fields[name_m.group(0).lower()] = value
+        records.append({"type": entry_type, "key": key, "fields": fields})
+    return records
+
+
+# ---------------------------------------------------------------------------
+# TeX markup → plain text (generate.escape_latex re-escapes afterwards)
+# ---------------------------------------------------------------------------
+
+_ACCENTS = {
+    '"': "\u0308", "'": "\u0301", "`": "\u0300", "^": "\u0302",
+    "~": "\u0303", "=": "\u0304", ".": "\u0307", "u": "\u0306",
+    "v": "\u030c", "H": "\u030b", "c": "\u0327", "k": "\u0328",
+    "r": "\u030a",
+}
+
+_SYMBOLS = {
+    "ss": "ß", "o": "ø", "O": "Ø", "ae": "æ", "AE": "Æ", "oe": "œ",
+    "OE": "Œ", "aa": "å", "AA": "Å", "l": "ł", "L": "Ł", "i": "ı",
+    "j": "ȷ",
+}
+
+_ACCENT_CMD = re.compile(r"\\([\"'`^~=.]|[uvHckr](?![A-Za-z]))\s*(\{\\?[A-Za-z]\}|\\?[A-Za-z])")
+_SYMBOL_CMD = re.compile(r"\\(ss|ae|AE|oe|OE|aa|AA|[oOlLij])(?![A-Za-z])\s*(?:\{\})?")
+_ESCAPED = re.compile(r"\\([&%$#_{}])")
+_TEXT_CMD = re.compile(r"\\(?:textit|textbf|emph|textsc|textrm|textsf|texttt|mbox|url)\s*")
+_OTHER_CMD = re.compile(r"\\[A-Za-z]+\s*")
+
+
+def tex_to_text(value: str) -> str:
+    """Convert BibTeX field markup to plain Unicode text."""
+    def accent(m: re.Match) -> str:
+        # \'{\i} is í: the dotless \i / \j only exist to carry the accent
+        base = m.group(2).strip("{}").lstrip("\\")
+        return base + _ACCENTS[m.group(1)]
+
+    text = _ACCENT_CMD.sub(accent, value)
+    text = _SYMBOL_CMD.sub(lambda m: _SYMBOLS[m.group(1)], text)
+    text = _ESCAPED.sub(lambda m: "\x00" + m.group(1), text)   # protect
+    text = _TEXT_CMD.sub("", text)
+    text = _OTHER_CMD.sub("", text)
+    text = text.replace("{", "").replace("}", "")
+    text = text.replace("\x00", "").replace("~", " ")
+    text = re.sub(r"\s+", " ", text).strip()
+    return unicodedata.normalize("NFC", text)
+
+
+# ---------------------------------------------------------------------------
+# Author names
+# ---------------------------------------------------------------------------
+
+def _split_top_level(value: str, sep: str) -> list[str]:
+    """Split *value* on *sep* (a word or char) outside of braces."""
+    parts: list[str] = []
+    depth = 0
+    current: list[str] = []
+    i = 0
+    pattern = re.compile(r"\s+" + sep + r"\s+", re.IGNORECASE) if sep.isalpha() else None
+    while i < len(value):
+        ch = value[i]
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+        if depth == 0:
+            if pattern:
+                m = pattern.match(value, i)
+                if m:
+                    parts.append("".join(current))
+                    current = []
+                    i = m.end()
+                    continue
+            elif ch == sep:
+                parts.append("".join(current))
+                current = []
+                i += 1
+                continue
+        current.append(ch)
+        i += 1
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _initials(given: str) -> str:
+    """'Fred' → 'F.', 'Jean-Paul' → 'J.-P.', 'W. Scott' → 'W. S.'."""
+    out: list[str] = []
+    for word in given.split():
+        pieces = [p for p in word.split("-") if p]
+        if not pieces:
+            continue
+        out.append("-".join(p[0].upper() + "." for p in pieces))
+    return " ".join(out)
+
+
+def parse_bibtex_name(raw: str) -> tuple[str, str]:
+    """Return (family, given) for one BibTeX name.
+
+    Handles "Last, First", "Last, Jr, First" and "First von Last". A fully
+    braced name ({World Health Organization}) is a corporate author and is
+    returned as family only.
+    """
+    raw = raw.strip()
+    if raw.startswith("{") and raw.endswith("}") and _read_braced(raw, 0)[1] == len(raw):
+        return tex_to_text(raw), ""
+    parts = _split_top_level(raw, ",")
+    if len(parts) >= 3:
+        return tex_to_text(f"{parts[0]} {parts[1]}"), tex_to_text(parts[2])
+    if len(parts) == 2:
+        return tex_to_text(parts[0]), tex_to_text(parts[1])
+    words = _split_top_level(raw, " ")
+    if len(words) == 1:
+        return tex_to_text(words[0]), ""
+    # "First von Last": the family name starts at the first lowercase word
+    # (von part) or is the last word.
+    idx = len(words) - 1
+    for i, w in enumerate(words[:-1]):
+        if w[:1].islower():
+            idx = i
+            break
+    return tex_to_text(" ".join(words[idx:])), tex_to_text(" ".join(words[:idx]))
+
+
+def format_authors(names: list[tuple[str, str]], max_authors: int | None) -> str:
+    """Format (family, given) pairs as 'Durst, F., Borland, W., & Otto, J.'."""
+    shown = [
+        f"{family}, {_initials(given)}" if given else family
+        for family, given in names
+    ]
+    if not shown:
+        return ""
+    if max_authors and len(shown) > max_authors:
+        return ", ".join(shown[:max_authors]) + ", et al."
+    if len(shown) == 1:
+        return shown[0]
+    if len(shown) == 2:
+        return f"{shown[0]} & {shown[1]}"
+    return ", ".join(shown[:-1]) + ", & " + shown[-1]
+
+
+# ---------------------------------------------------------------------------
+# Normalisation: parsed records → cached publication records
+# ---------------------------------------------------------------------------
+
+def _year_of(text: str) -> str:
+    m = re.search(r"\d{4}", text or "")
+    return m.group(0) if m else ""
+
+
+def _from_bibtex(rec: dict) -> dict:
+    fields = rec["fields"]
+    names = [
+        parse_bibtex_name(n)
+        for n in _split_top_level(fields.get("author") or fields.get("editor", ""), "and")
+    ]
+    venue = next(
+        (tex_to_text(fields[f]) for f in _VENUE_FIELDS if fields.get(f)), ""
+    )
+    return {
+        "key": rec["key"],
+        "type": rec["type"],
+        "names": names,
+        "title": tex_to_text(fields.get("title", "")),
+        "venue": venue,
+        "year": _year_of(fields.get("year") or fields.get("date", "")),
+    }
+
+
+def _from_csl(item: dict) -> dict:
+    names: list[tuple[str, str]] = []
+    for a in item.get("author") or item.get("editor") or []:
+        if "literal" in a:
+            names.append((a["literal"], ""))
+        else:
+            family = " ".join(
+                p for p in (a.get("non-dropping-particle", ""), a.get("family", "")) if p
+            )
+            names.append((family, a.get("given", "")))
+    venue = next(
+        (item[f] for f in ("container-title", "publisher", "event") if item.get(f)), ""
+    )
+    if isinstance(venue, list):
+        venue = venue[0] if venue else ""
+    year = ""
+    parts = (item.get("issued") or {}).get("date-parts") or []
+    if parts and parts[0]:
+        year = str(parts[0][0])
+    elif (item.get("issued") or {}).get("raw"):
+        year = _year_of(item["issued"]["raw"])
+    return {
+        "key": item.get("id", ""),
+        "type": item.get("type", ""),
+        "names": names,
+        "title": item.get("title", ""),
+        "venue": venue,
+        "year": year,
+    }
+
+
+def _parse_file(path: Path, data: bytes) -> list[dict]:
+    if path.suffix.lower() == ".json":
+        try:
+            items = json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            die(f"invalid CSL-JSON in {path}: {e}")
+        if isinstance(items, dict):
+            items = items.get("items", [])
+        return [_from_csl(item) for item in items]
+    try:
+        return [
+            _from_bibtex(r) for r in parse_bibtex(data.decode("utf-8"))
+            if r["type"] not in ("xdata", "set")
+        ]
+    except (UnicodeDecodeError, BibParseError) as e:
+        die(f"invalid BibTeX in {path}: {e}")
+        return []  # unreachable
+
+
+def load_bibliography(path: Path) -> list[dict]:
+    """Parse *path* (BibTeX or CSL-JSON) via the content-addressed cache."""
+    if not path.exists():
+        die(f"bibliography file not found: {path}")
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    cache_path = BIB_CACHE_DIR / f"{digest}.json"
+    if cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cached.get("version") == PARSER_VERSION:
+                return cached["records"]
+        except (OSError, ValueError, KeyError):
+            pass  # corrupt cache entry — reparse below
+
+    records = _parse_file(path, data)
+    BIB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"version": PARSER_VERSION, "records": records}),
+        encoding="utf-8",
+    )
+    tmp.replace(cache_path)
+    return records
+
+
+# ---------------------------------------------------------------------------
+# Public entry point
+# ---------------------------------------------------------------------------
+
+def _int_or_die(value, name: str) -> int | None:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        die(f"publications.yaml source.{name} must be an integer, got '{value}'")
+        return None  # unreachable
+
+
+def publications_from_source(source: dict) -> list[dict]:
+    """Resolve a publications.yaml `source:` block into publication entries."""
+    files = source.get("files") or []
+    if isinstance(files, str):
+        files = [files]
+    if not files:
+        die("publications.yaml 'source' needs a non-empty 'files' list")
+
+    types = {str(t).lower() for t in source.get("types") or []}
+    year_from = _int_or_die(source.get("year_from"), "year_from")
+    year_to = _int_or_die(source.get("year_to"), "year_to")
+    max_authors = _int_or_die(source.get("max_authors"), "max_authors")
+    limit = _int_or_die(source.get("limit"), "limit")
+    sort = str(source.get("sort", "year-desc")).lower()
+    if sort not in VALID_SORTS:
+        die(
+            f"publications.yaml source.sort '{sort}' must be one of: "
+            f"{', '.join(VALID_SORTS)}"
+        )
+
+    records: list[dict] = []
+    for name in files:
+        records.extend(load_bibliography(CONTENT_DIR / name))
+
+    def keep(rec: dict) -> bool:
+        if types and rec["type"].lower() not in types:
+            return False
+        year = int(rec["year"]) if rec["year"] else None
+        if year_from is not None and (year is None or year < year_from):
+            return False
+        if year_to is not None and (year is None or year > year_to):
+            return False
+        return True
+
+    records = [r for r in records if keep(r)]
+    if sort == "year-desc":
+        records.sort(key=lambda r: (-(int(r["year"]) if r["year"] else 0), r["title"].lower()))
+    elif sort == "year-asc":
+        records.sort(key=lambda r: (int(r["year"]) if r["year"] else 0, r["title"].lower()))
+    elif sort == "title":
+        records.sort(key=lambda r: r["title"].lower())
+    if limit is not None:
+        records = records[:limit]
+
+    # The generators print "{authors}. {title}..." — drop the final initial's
+    # period so abbreviated author lists don't end in "..".
+    return [
+        {
+            "authors": format_authors(
+                [tuple(n) for n in r["names"]], max_authors
+            ).rstrip("."),
+            "title": r["title"],
+            "venue": r["venue"],
+            "year": r["year"],
+        }
+        for r in records
+    ]
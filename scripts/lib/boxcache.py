@@ -0,0 +1,95 @@
+"""
+lib/boxcache.py — Cache keys for pre-rendered boxes.
+
+A rendered box (frame, background and content) is a function of its
+title, its content file, its column, the box rows the plan gave it and
+the typesetting setup: engine/preamble.tex (grid, palette, typography),
+the box templates, generated/settings.tex, generated/params.tex,
+generated/fonts.tex (the font subsets a box embeds) and the fonts.
+layout.py writes
+the key of every box into canvas.tex (\\CachedBox, engine/boxcache.tex);
+scripts/render.py renders the boxes whose key has no PDF under
+build/cache/boxes/ yet. Editing one bullet therefore re-renders one box.
+
+Off unless CV_BOX_CACHE=1: every included box PDF brings its own copy of
+the fonts it uses (LuaTeX does not merge fonts across included pages), so
+the final PDF grows with the number of boxes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from pathlib import Path
+
+from lib.config import (
+    CACHE_DIR,
+    FONTS_TEX_PATH,
+    GENERATED_DIR,
+    PARAMS_TEX_PATH,
+    PREAMBLE_PATH,
+    ROOT,
+)
+
+# Bump when the render document changes shape so old PDFs miss.
+BOX_CACHE_VERSION = 3
+
+BOX_CACHE_DIR = CACHE_DIR / "boxes"
+
+# Engine files a rendered box depends on, besides the preamble
+BOX_ENGINE_FILES = tuple(
+    ROOT / "engine" / name
+    for name in (
+        "arith.tex", "arith.lua",
+        "leftbox.tex", "rightbox.tex", "fullbox.tex", "boxcache.tex",
+    )
+)
+
+# layout.yaml column → engine macro prefix
+COLUMN_PREFIX = {"left": "Left", "right": "Right", "full": "Full"}
+
+# Content whose links would be lost: an included PDF page keeps its text
+# but not its link annotations, so such boxes are always typeset live.
+_LINK_RE = re.compile(r"\\(?:href|url|hyperlink)\b")
+
+
+def enabled() -> bool:
+    """True when CV_BOX_CACHE=1 (opt-in, see the module docstring)."""
+    return os.environ.get("CV_BOX_CACHE", "0") == "1"
+
+
+def setup_digest() -> str:
+    """Hash of everything every rendered box shares."""
+    h = hashlib.sha256(f"boxcache-v{BOX_CACHE_VERSION}".encode())
+    for path in (
+        PREAMBLE_PATH, *BOX_ENGINE_FILES, GENERATED_DIR / "settings.tex", PARAMS_TEX_PATH,
+        FONTS_TEX_PATH,
+    ):
+        if path.exists():
+            h.update(path.name.encode())
+            h.update(path.read_bytes())
+    # Font files by name and size, as in scripts/measure.py
+    font_dir = ROOT / "fonts"
+    if font_dir.exists():
+        for font in sorted(font_dir.rglob("*.[ot]tf")):
+            h.update(f"{font.relative_to(font_dir)}:{font.stat().st_size}".encode())
+    return h.hexdigest()
+
+
+def box_key(setup: str, column: str, title: str, content: bytes, rows: int) -> str:
+    """Cache key of one rendered box."""
+    h = hashlib.sha256(setup.encode())
+    h.update(f"{column}\0{title}\0{rows}\0".encode())
+    h.update(content)
+    return h.hexdigest()
+
+
+def cacheable(content: bytes) -> bool:
+    """True unless the content has links (see _LINK_RE)."""
+    return _LINK_RE.search(content.decode("utf-8", "replace")) is None
+
+
+def box_pdf(key: str) -> Path:
+    """Where the render of *key* is cached."""
+    return BOX_CACHE_DIR / f"{key}.pdf"
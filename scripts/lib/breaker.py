@@ -0,0 +1,285 @@
+"""
+lib/breaker.py — Optimal page breaking for one column of boxes.
+
+layout.py's greedy breaker fills each page as far as it can and splits at
+the last boundary that fits. This one searches every way of cutting the
+column into pages and picks the best:
+
+    1. fewest pages
+    (1b. with tight_end: the column's last page ends at the highest row,
+         so a band stacked below it starts as high as it can)
+    2. then lowest badness, summed over pages:
+         - unused rows at the bottom of every page but the column's last,
+           squared (so one half-empty page costs more than two short ones)
+         - a fixed cost per split (each split repeats the box title)
+         - split parts shorter than TINY_PART_ROWS content rows, squared
+           (a two-line "(cont.)" box or a lone heading at a page bottom)
+         - the difference between this column's last row and the other
+           column's on the same page, squared (left/right balance)
+
+Sections may be split at any of their boundaries, more than once if they
+are taller than a page (-p1, -p2, -p3, ...). Split parts smaller than
+min_split_rows are never produced.
+
+The search is a shortest path over states "next content starts at section
+j, boundary c": one edge per possible page, from the state the page starts
+at to the state the next page starts at. Edges only go forward, so one pass
+in state order solves it. A page holds at most a page's worth of
+boundaries, so the work is O(boundaries × boundaries per page): for 500
+boxes with a split point every third line, 0.1-0.4 s per column depending
+on the machine, and twice that with first_y (it also solves from a fresh
+page). layout.plan_layout runs it for every column of up to two dry plans.
+
+Pure: no file I/O. layout.py supplies the heights and boundaries and
+writes the split files.
+
+Item dicts (one per section, in column order):
+    rows         measured content rows of the whole section
+    total_lines  line count of its .tex file
+    boundaries   line indices where it may be split
+    hints        {"start:end": rows} measured heights of earlier split
+                 parts (layout.py --converge); optional
+"""
+
+from __future__ import annotations
+
+import math
+
+from lib.config import box_rows
+
+# Badness weights. Only their ratios matter.
+SPLIT_COST = 100.0
+TINY_PART_ROWS = 6
+TINY_PART_WEIGHT = 20.0
+BALANCE_WEIGHT = 1.0
+
+
+class _Column:
+    """Cut positions and fragment heights for one column's items."""
+
+    def __init__(self, items: list[dict]):
+        self.items = items
+        # cuts[j] = [0, boundary, ..., total_lines]; a fragment runs between
+        # two cut indices a < b.
+        self.cuts: list[list[int]] = []
+        for item in items:
+            total = item["total_lines"]
+            inner = sorted({b for b in item["boundaries"] if 0 < b < total})
+            self.cuts.append([0, *inner, total])
+
+    def last(self, j: int) -> int:
+        return len(self.cuts[j]) - 1
+
+    def rows(self, j: int, a: int, b: int) -> int:
+        """Content rows of item *j* between cut indices *a* and *b*."""
+        item = self.items[j]
+        if a == 0 and b == self.last(j):
+            return item["rows"]
+        cuts = self.cuts[j]
+        measured = item.get("hints", {}).get(f"{cuts[a]}:{cuts[b]}")
+        if measured is not None:
+            return measured
+        total = item["total_lines"] or 1
+        return max(1, math.ceil(item["rows"] * (cuts[b] - cuts[a]) / total))
+
+
+def break_column(
+    items: list[dict],
+    geom: dict,
+    balance: dict[int, float] | None = None,
+    first_y: float | None = None,
+    tight_end: bool = False,
+) -> list[list[tuple[int, int, int, int]]]:
+    """Break one column into pages.
+
+    *geom* holds start_y, max_y, gap, pad_top, pad_bot and min_split (grid
+    rows). *balance* maps page number → the row the other column ends at on
+    that page. *first_y* is where the column starts on page 1 when
+    something (a full-width band) is already above it; the column may also
+    leave page 1 empty and start on page 2. *tight_end* ranks, among the
+    breakings with the fewest pages, the one whose last page ends highest
+    first (layout.plan_layout, when another band follows the column).
+
+    Returns one list per page of (item index, start line, end line, rows)
+    fragments. A box taller than a page is placed alone and overflows, as
+    with the greedy breaker.
+    """
+    if not items:
+        return []
+
+    col = _Column(items)
+    start_y = geom["start_y"]
+    max_y = geom["max_y"]
+    gap = geom["gap"]
+    min_split = geom["min_split"]
+    balance = balance or {}
+    first_y = start_y if first_y is None else first_y
+
+    def box(r: int) -> float:
+        return box_rows(r, geom["pad_top"], geom["pad_bot"])
+
+    # State (j, c) → flat index; the end state is n_states.
+    offsets: list[int] = []
+    n_states = 0
+    for j in range(len(items)):
+        offsets.append(n_states)
+        n_states += col.last(j)
+
+    def state(j: int, c: int) -> int:
+        return n_states if j == len(items) else offsets[j] + c
+
+    def part_cost(r: int, partial: bool) -> float:
+        if not partial:
+            return 0.0
+        return TINY_PART_WEIGHT * max(0, TINY_PART_ROWS - r) ** 2
+
+    # Heads (item m from its start to cut h) and whole items are tried from
+    # every earlier state, so their heights and costs are computed once.
+    heads: list[list[tuple[int, float, float]]] = []
+    whole: list[float] = []
+    for m in range(len(items)):
+        heads.append([
+            (h, box(r), part_cost(r, True) + SPLIT_COST)
+            for h in range(1, col.last(m))
+            if (r := col.rows(m, 0, h)) >= min_split
+        ])
+        whole.append(box(items[m]["rows"]))
+
+    def solve(top: float, shift: int) -> tuple[int, float, float, list] | None:
+        """Best breaking with page 1 starting at row *top*; *shift* offsets
+        page numbers for *balance*. Returns (pages, badness, last page's end
+        row, pages); None if nothing fits below *top*."""
+        # best[s] = (pages, badness, previous state, end y of the page into s)
+        best: list[tuple[int, float, int, float] | None] = [None] * (n_states + 1)
+        best[0] = (0, 0.0, -1, 0.0)
+
+        def relax(src: int, dst: int, end_y: float, cost: float) -> None:
+            pages, badness = best[src][0] + 1, best[src][1] + cost
+            if dst != n_states:
+                badness += (max_y - end_y) ** 2
+            if pages + shift in balance:
+                badness += BALANCE_WEIGHT * (end_y - balance[pages + shift]) ** 2
+            cur = best[dst]
+            if cur is None:
+                best[dst] = (pages, badness, src, end_y)
+            elif tight_end and dst == n_states:
+                if (pages, end_y, badness) < (cur[0], cur[3], cur[1]):
+                    best[dst] = (pages, badness, src, end_y)
+            elif (pages, badness) < (cur[0], cur[1]):
+                best[dst] = (pages, badness, src, end_y)
+
+        for j in range(len(items)):
+            for c in range(col.last(j)):
+                src = state(j, c)
+                if best[src] is None:
+                    continue
+                found = False
+
+                # First box on the page: item j from cut c to cut e.
+                for e in range(c + 1, col.last(j) + 1):
+                    r = col.rows(j, c, e)
+                    partial = c > 0 or e < col.last(j)
+                    if partial and r < min_split:
+                        continue
+                    y = (top if src == 0 else start_y) + box(r)
+                    if y > max_y:
+                        break
+                    cost = part_cost(r, partial)
+                    if e < col.last(j):
+                        # Page ends inside item j.
+                        relax(src, state(j, e), y, cost + SPLIT_COST)
+                        found = True
+                        continue
+
+                    # Item j finished: end the page, or keep adding items.
+                    relax(src, state(j + 1, 0), y, cost)
+                    found = True
+                    for m in range(j + 1, len(items)):
+                        y_gap = y + gap
+                        for h, h_box, h_cost in heads[m]:
+                            if y_gap + h_box > max_y:
+                                break
+                            relax(src, offsets[m] + h, y_gap + h_box, cost + h_cost)
+                        y_whole = y_gap + whole[m]
+                        if y_whole > max_y:
+                            break
+                        y = y_whole
+                        relax(src, state(m + 1, 0), y, cost)
+
+                if not found and src == 0 and top != start_y:
+                    # Nothing fits below first_y: the caller tries a fresh page.
+                    continue
+                if not found:
+                    # Nothing fits: place the next piece alone and overflow.
+                    e = c + 1
+                    r = col.rows(j, c, e)
+                    dst = state(j, e) if e < col.last(j) else state(j + 1, 0)
+                    relax(
+                        src, dst, start_y + box(r),
+                        part_cost(r, c > 0 or e < col.last(j))
+                        + (SPLIT_COST if e < col.last(j) else 0.0),
+                    )
+
+        if best[n_states] is None:
+            return None
+
+        # Walk back from the end state, then rebuild each page's fragments.
+        path = [n_states]
+        while best[path[-1]][2] >= 0:
+            path.append(best[path[-1]][2])
+        path.reverse()
+
+        flat = [(j, c) for j in range(len(items)) for c in range(col.last(j))]
+        flat.append((len(items), 0))
+
+        pages: list[list[tuple[int, int, int, int]]] = []
+        for src, dst in zip(path, path[1:]):
+            (j, c), (m, e) = flat[src], flat[dst]
+            page: list[tuple[int, int, int, int]] = []
+            while (j, c) != (m, e):
+                stop = e if j == m else col.last(j)
+                cuts = col.cuts[j]
+                page.append((j, cuts[c], cuts[stop], col.rows(j, c, stop)))
+                if stop == col.last(j):
+                    j, c = j + 1, 0
+                else:
+                    c = stop
+            pages.append(page)
+        return best[n_states][0], best[n_states][1], best[n_states][3], pages
+
+    def rank(result: tuple[int, float, float, list]) -> tuple:
+        pages, badness, end_y, _ = result
+        return (pages, end_y, badness) if tight_end else (pages, badness)
+
+    result = solve(first_y, 0)
+    if first_y > start_y:
+        # Or leave the rest of the current page empty and start afresh.
+        fresh = solve(start_y, 1)
+        if fresh is not None:
+            fresh = (
+                fresh[0] + 1, fresh[1] + (max_y - first_y) ** 2, fresh[2],
+                [[], *fresh[3]],
+            )
+            if result is None or rank(fresh) < rank(result):
+                result = fresh
+    return result[3]
+
+
+def page_end_rows(
+    pages: list[list[tuple[int, int, int, int]]],
+    geom: dict,
+    first_y: float | None = None,
+) -> dict[int, float]:
+    """Page number → the row *pages* ends at (input for *balance*). Empty
+    pages are left out."""
+    ends: dict[int, float] = {}
+    for number, page in enumerate(pages, 1):
+        if not page:
+            continue
+        y = first_y if number == 1 and first_y is not None else geom["start_y"]
+        for i, (_, _, _, r) in enumerate(page):
+            if i > 0:
+                y += geom["gap"]
+            y += box_rows(r, geom["pad_top"], geom["pad_bot"])
+        ends[number] = y
+    return ends
@@ -1,6 +1,6 @@
 """
 lib/config.py — Single source of truth for grid math, YAML loading,
-                preamble parsing, and error helpers.
+                paths, and error helpers.
 
 Every script in scripts/ imports from here. Nothing is duplicated.
 
@@ -13,8 +13,8 @@ mirror, kept in ONE place.
 
 from __future__ import annotations
 
+import json
 import math
-import re
 import sys
 from pathlib import Path
 
@@ -36,11 +36,26 @@ ROOT = Path(__file__).resolve().parent.parent.parent          # repo root
 CONTENT_DIR = ROOT / "content"
 GENERATED_DIR = ROOT / "generated"
 PREAMBLE_PATH = ROOT / "engine" / "preamble.tex"
+PARAMS_YAML = ROOT / "engine" / "params.yaml"                 # layout parameters (lib/params.py)
 CONTACT_YAML = CONTENT_DIR / "contact.yaml"
 LAYOUT_YAML = CONTENT_DIR / "layout.yaml"
 BUILD_DIR = ROOT / "build"
 BOXHEIGHTS_PATH = BUILD_DIR / "boxheights.dat"
+BOXPROFILE_GLOB = "boxprofile-*.dat"                          # CV_PROFILE=1 only, per pass
+REUSE_PASS1_PATH = BUILD_DIR / "reuse-pass1"                  # layout == measure canvas
+SERIAL_PASS1_PATH = BUILD_DIR / "serial-pass1"                # compile pass 1 whole
+MEASURED_HEIGHTS_PATH = BUILD_DIR / "boxheights-measure.dat"  # pass-1 copy (--converge)
+LAYOUT_PLAN_PATH = BUILD_DIR / "layout-plan.json"             # last --layout plan
+LAYOUT_HINTS_PATH = BUILD_DIR / "layout-hints.json"           # measured split-part heights
+LAYOUT_REPORT_PATH = BUILD_DIR / "layout-report.txt"          # --converge report
+CACHE_DIR = BUILD_DIR / "cache"                               # content-addressed caches
 CANVAS_TEX_PATH = GENERATED_DIR / "canvas.tex"
+PARAMS_TEX_PATH = GENERATED_DIR / "params.tex"                # \newcommands from params.yaml
+FONTS_TEX_PATH = GENERATED_DIR / "fonts.tex"                  # scripts/fontsubset.py faces
+FIT_PATH = GENERATED_DIR / "fit.json"                         # scripts/fit.py winner
+HEADER_FIT_PATH = GENERATED_DIR / "header.json"               # scripts/header.py auto-fit
+PRUNE_PATH = GENERATED_DIR / "prune.json"                     # scripts/prune.py drops
+PRUNE_REPORT_PATH = BUILD_DIR / "prune-report.txt"            # what prune.py dropped
 
 
 # ---------------------------------------------------------------------------
@@ -58,6 +73,10 @@ PAGE_SIZES: dict[str, tuple[float, float]] = {
 # ---------------------------------------------------------------------------
 VALID_HEADER_THEMES = ("classic", "mainframe", "crt")
 
+# Page breakers selectable via content/layout.yaml "breaker"
+VALID_BREAKERS = ("greedy", "optimal")
+DEFAULT_BREAKER = "greedy"                                    # when "breaker" is absent
+
 # Header theme → engine file mapping
 HEADER_ENGINE_FILES: dict[str, str] = {
     "classic": "engine/header.tex",
@@ -96,6 +115,12 @@ def load_contact() -> dict:
         die(f"{CONTACT_YAML} is empty")
     require(data.get("paper_size"), "paper_size", "content/contact.yaml")
     require(data.get("margin"), "margin", "content/contact.yaml")
+    fit = load_fit()
+    if fit:
+        data["margin"] = fit["margin"]
+    header = load_header_fit(data.get("header_theme"))
+    if header:
+        data["header_theme"] = header["theme"]
     return data
 
 
@@ -121,61 +146,63 @@ def load_layout() -> list[dict]:
     return sections
 
 
+def load_breaker() -> str:
+    """Return the page breaker named in content/layout.yaml (default greedy)."""
+    data = yaml.safe_load(LAYOUT_YAML.read_text(encoding="utf-8"))
+    breaker = data.get("breaker") or DEFAULT_BREAKER
+    if breaker not in VALID_BREAKERS:
+        die(
+            f"breaker must be one of: {', '.join(VALID_BREAKERS)}, "
+            f"got '{breaker}' in content/layout.yaml"
+        )
+    return breaker
+
+
 # ---------------------------------------------------------------------------
-# Preamble parser
-# ---------------------------------------------------------------------------
-
-REQUIRED_PREAMBLE_PARAMS = [
-    "GridFontSize",
-    "MonoWidthRatio",
-    "ContentWidthScale",
-    "HeaderHeight",
-    "GapHeaderToContent",
-    "GapBoxToBox",
-    "LeftBoxWidth",
-    "ColumnGap",
-    "LeftBoxPadLeft",
-    "LeftBoxPadRight",
-    "LeftBoxPadTop",
-    "LeftBoxPadBot",
-    "RightBoxPadLeft",
-    "RightBoxPadRight",
-    "RightBoxPadTop",
-    "RightBoxPadBot",
-    "FullBoxPadLeft",
-    "FullBoxPadRight",
-    "FullBoxPadTop",
-    "FullBoxPadBot",
-    "MinSplitContentRows",
-]
-
-
-def parse_preamble() -> dict[str, float]:
-    r"""Parse \newcommand{\Name}{Value} from preamble.tex."""
-    if not PREAMBLE_PATH.exists():
-        die(f"{PREAMBLE_PATH} not found")
-    text = PREAMBLE_PATH.read_text(encoding="utf-8")
-
-    pattern = re.compile(r"\\newcommand\{\\(\w+)\}\{([^}]+)\}")
-
-    found: dict[str, str] = {}
-    for m in pattern.finditer(text):
-        found[m.group(1)] = m.group(2).strip()
-
-    params: dict[str, float] = {}
-    for name in REQUIRED_PREAMBLE_PARAMS:
-        raw = found.get(name)
-        if raw is None:
-            die(f"required parameter '\\{name}' not found in preamble.tex")
-        try:
-            params[name] = float(raw)
-        except ValueError:
-            die(
-                f"parameter '\\{name}' in preamble.tex has non-numeric "
-                f"value '{raw}'"
-            )
+# Fit override (scripts/fit.py)
+# ---------------------------------------------------------------------------
+
+def load_fit() -> dict | None:
+    """Return the margin and font size chosen by scripts/fit.py, or None.
+
+    generated/fit.json overrides contact.yaml's margin and params.yaml's
+    GridFontSize for every script, and generate.py passes it on to TeX
+    through settings.tex, so all of them agree on the grid.
+    """
+    if not FIT_PATH.exists():
+        return None
+    try:
+        data = json.loads(FIT_PATH.read_text(encoding="utf-8"))
+        return {
+            "margin": float(data["margin"]),
+            "font_size": float(data["font_size"]),
+        }
+    except (ValueError, KeyError, TypeError):
+        die(f"{FIT_PATH} is malformed. Re-run scripts/fit.py or delete it.")
 
-    return params
+
+# ---------------------------------------------------------------------------
+# Header auto-fit (scripts/header.py)
+# ---------------------------------------------------------------------------
+
+def load_header_fit(requested_theme) -> dict | None:
+    """Return the header scripts/header.py settled on, or None.
+
+    header.py falls back to another theme when the name art does not fit
+    the grid (see header.choose_header). generated/header.json records that
+    choice for the header_theme contact.yaml asked for; it is ignored once
+    contact.yaml asks for a different one (header.py has not run since).
+    """
+    if not HEADER_FIT_PATH.exists():
+        return None
+    try:
+        data = json.loads(HEADER_FIT_PATH.read_text(encoding="utf-8"))
+        requested, theme = str(data["requested"]), str(data["theme"])
+    except (ValueError, KeyError, TypeError):
+        die(f"{HEADER_FIT_PATH} is malformed. Re-run scripts/header.py or delete it.")
+    if requested != str(requested_theme).lower() or theme not in VALID_HEADER_THEMES:
+        return None
+    return {"theme": theme}
 
 
 # ---------------------------------------------------------------------------
@@ -187,7 +214,7 @@ PT_TO_MM = 25.4 / 72.0
 
 
 def compute_grid(contact: dict, params: dict[str, float]) -> dict:
-    """Compute grid dimensions from contact.yaml + preamble.tex params."""
+    """Compute grid dimensions from contact.yaml + lib.params.load_params()."""
     paper_size = contact["paper_size"].lower()
     if paper_size not in PAGE_SIZES:
         die(
@@ -230,9 +257,33 @@ def compute_grid(contact: dict, params: dict[str, float]) -> dict:
     }
 
 
+def content_widths(grid_cols: int, params: dict[str, float]) -> dict[str, float]:
+    """Content width per column type in grid cols (preamble.tex §6)."""
+    scale = params["ContentWidthScale"]
+    right_box = grid_cols - params["LeftBoxWidth"] - params["ColumnGap"]
+    return {
+        "left": (params["LeftBoxWidth"] - params["LeftBoxPadLeft"]
+                 - params["LeftBoxPadRight"]) * scale,
+        "right": (right_box - params["RightBoxPadLeft"]
+                  - params["RightBoxPadRight"]) * scale,
+        "full": (grid_cols - params["FullBoxPadLeft"]
+                 - params["FullBoxPadRight"]) * scale,
+    }
+
+
+# Slack for truncating a float sum of decimal parameters (box_rows,
+# engine/arith.lua, engine/pagebreak.lua): far above binary rounding error,
+# far below pgfmath's 1sp (1/65536) resolution
+TRUNC_EPS = 1e-9
+
+
 def box_rows(content_rows: int, pad_top: float, pad_bot: float) -> int:
     """Total box height: top border + padding + content + padding + bottom border.
 
-    Matches TeX's \\pgfmathtruncatemacro which truncates (floors for positive).
+    Matches TeX's \\IntDef (engine/arith.lua) and the \\pgfmathtruncatemacro
+    before it, which truncate (floor for positive). The pads are decimals,
+    so their sum can land a hair below a whole row in binary floating point
+    (0.13 + 0.87 → 0.9999999999999999); TRUNC_EPS lifts it back, as
+    pgfmath's fixed-point sum never fell short (tests/test_arith.py).
     """
-    return int(1 + pad_top + content_rows + pad_bot + 1)
+    return int(1 + pad_top + content_rows + pad_bot + 1 + TRUNC_EPS)
@@ -0,0 +1,217 @@
+"""
+lib/params.py — Layout parameters from engine/params.yaml.
+
+engine/params.yaml is the single source of truth for the parameters both
+TeX and Python read (grid font size, gaps, header height, column widths,
+box padding, split threshold). From it this module builds:
+
+    generated/params.tex            — \\newcommand per parameter, input by
+                                      engine/preamble.tex §2; a per-theme
+                                      value becomes an \\ifx\\HeaderTheme
+                                      chain, so one file serves every theme
+    build/cache/params/<sha>.json   — the values resolved for every header
+                                      theme, plus the text of params.tex
+
+Both are keyed by the SHA-256 of params.yaml (and PARAMS_VERSION), so an
+unchanged file costs one hash + one JSON load per process, and later
+calls in the same process are free. YAML is only parsed on a miss.
+
+    params = load_params(contact["header_theme"])
+    params["HeaderHeight"]   # 7 for mainframe/crt, 6 for classic
+
+generated/fit.json's font size (scripts/fit.py) replaces GridFontSize in
+the returned values, as preamble.tex does with \\GridFontSizeFit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+
+import yaml
+
+from lib.config import (
+    CACHE_DIR,
+    PARAMS_TEX_PATH,
+    PARAMS_YAML,
+    ROOT,
+    VALID_HEADER_THEMES,
+    die,
+    load_fit,
+)
+
+# Bump when the snapshot or params.tex format changes so old entries miss.
+PARAMS_VERSION = 1
+
+PARAMS_CACHE_DIR = CACHE_DIR / "params"
+
+# The theme the preamble falls back to when \HeaderTheme matches none
+DEFAULT_THEME = "classic"
+
+# Parameter names become TeX control words: letters only
+_NAME_RE = re.compile(r"[A-Za-z]+")
+
+_snapshot: dict | None = None
+
+
+class Params(dict):
+    """Resolved parameters; a missing name is a build error, not a KeyError."""
+
+    def __missing__(self, name: str) -> float:
+        die(f"parameter '{name}' not defined in {PARAMS_YAML.relative_to(ROOT)}")
+        return 0.0  # unreachable
+
+
+# ---------------------------------------------------------------------------
+# params.yaml → snapshot
+# ---------------------------------------------------------------------------
+
+def _number(value, where: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        die(f"{where} in {PARAMS_YAML.relative_to(ROOT)} must be a number, got {value!r}")
+    return value
+
+
+def _parse(data: bytes) -> dict[str, object]:
+    """Return {name: number or {theme: number}} in file order."""
+    source = PARAMS_YAML.relative_to(ROOT)
+    try:
+        groups = yaml.safe_load(data.decode("utf-8"))
+    except (UnicodeDecodeError, yaml.YAMLError) as e:
+        die(f"invalid YAML in {source}: {e}")
+    if not isinstance(groups, dict) or not groups:
+        die(f"{source} must map group names to parameters")
+
+    params: dict[str, object] = {}
+    for group, entries in groups.items():
+        if not isinstance(entries, dict):
+            die(f"group '{group}' in {source} must map parameter names to values")
+        for name, value in entries.items():
+            if not isinstance(name, str) or not _NAME_RE.fullmatch(name):
+                die(f"parameter name {name!r} in {source} must be letters only")
+            if name in params:
+                die(f"parameter '{name}' is defined twice in {source}")
+            if isinstance(value, dict):
+                themes = {str(t).lower(): v for t, v in value.items()}
+                if set(themes) != set(VALID_HEADER_THEMES):
+                    die(
+                        f"per-theme parameter '{name}' in {source} must list "
+                        f"exactly: {', '.join(VALID_HEADER_THEMES)}"
+                    )
+                params[name] = {
+                    t: _number(themes[t], f"'{name}' ({t})") for t in VALID_HEADER_THEMES
+                }
+            else:
+                params[name] = _number(value, f"'{name}'")
+    return params
+
+
+def _params_tex(params: dict[str, object], digest: str) -> str:
+    """The content of generated/params.tex."""
+    lines = [
+        "% !! AUTO-GENERATED by scripts/lib/params.py — DO NOT EDIT !!",
+        f"% Source: engine/params.yaml (sha256 {digest})",
+        "",
+    ]
+    others = [t for t in VALID_HEADER_THEMES if t != DEFAULT_THEME]
+    if any(isinstance(v, dict) for v in params.values()):
+        for theme in others:
+            lines.append(f"\\def\\ParamsTheme{theme.capitalize()}{{{theme}}}")
+        lines.append("")
+    for name, value in params.items():
+        if not isinstance(value, dict):
+            lines.append(f"\\newcommand{{\\{name}}}{{{value}}}")
+            continue
+        # \ifx chain on \HeaderTheme (generated/settings.tex); the default
+        # theme is the \else branch, as for any unknown theme
+        for i, theme in enumerate(others):
+            lead = "\\ifx" if i == 0 else "\\else\\ifx"
+            lines.append(
+                f"{lead}\\HeaderTheme\\ParamsTheme{theme.capitalize()}"
+                f" \\newcommand{{\\{name}}}{{{value[theme]}}}%"
+            )
+        lines.append(f"\\else \\newcommand{{\\{name}}}{{{value[DEFAULT_THEME]}}}%")
+        lines.append("\\fi" * len(others))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _build(data: bytes, digest: str) -> dict:
+    """Parse params.yaml into the cached snapshot."""
+    params = _parse(data)
+    return {
+        "version": PARAMS_VERSION,
+        "digest": digest,
+        "themes": {
+            theme: {
+                name: float(v[theme] if isinstance(v, dict) else v)
+                for name, v in params.items()
+            }
+            for theme in VALID_HEADER_THEMES
+        },
+        "tex": _params_tex(params, digest),
+    }
+
+
+def load_snapshot() -> dict:
+    """Return the snapshot of params.yaml, building it and params.tex if stale."""
+    global _snapshot
+    if _snapshot is not None:
+        return _snapshot
+    if not PARAMS_YAML.exists():
+        die(f"{PARAMS_YAML} not found")
+    data = PARAMS_YAML.read_bytes()
+    h = hashlib.sha256(f"params-v{PARAMS_VERSION}\0".encode())
+    h.update(data)
+    digest = h.hexdigest()
+
+    cache_path = PARAMS_CACHE_DIR / f"{digest}.json"
+    snap = None
+    if cache_path.exists():
+        try:
+            snap = json.loads(cache_path.read_text(encoding="utf-8"))
+            if snap.get("version") != PARAMS_VERSION or snap.get("digest") != digest:
+                snap = None
+        except (OSError, ValueError, AttributeError):
+            snap = None  # corrupt cache entry — rebuild below
+    if snap is None:
+        snap = _build(data, digest)
+        PARAMS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snap), encoding="utf-8")
+        tmp.replace(cache_path)
+
+    # Rewritten only when it differs, so its mtime (latexmk) stays put
+    current = None
+    if PARAMS_TEX_PATH.exists():
+        current = PARAMS_TEX_PATH.read_text(encoding="utf-8")
+    if current != snap["tex"]:
+        PARAMS_TEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = PARAMS_TEX_PATH.with_suffix(".tmp")
+        tmp.write_text(snap["tex"], encoding="utf-8")
+        tmp.replace(PARAMS_TEX_PATH)
+
+    _snapshot = snap
+    return snap
+
+
+# ---------------------------------------------------------------------------
+# Public entry point
+# ---------------------------------------------------------------------------
+
+def load_params(theme) -> Params:
+    """Return the parameters for header *theme*, fit.json applied."""
+    if not theme:
+        die("required field 'header_theme' not found in content/contact.yaml")
+    theme = str(theme).lower()
+    if theme not in VALID_HEADER_THEMES:
+        die(
+            f"unknown header_theme '{theme}' in contact.yaml "
+            f"(must be one of: {', '.join(VALID_HEADER_THEMES)})"
+        )
+    params = Params(load_snapshot()["themes"][theme])
+    fit = load_fit()
+    if fit:
+        params["GridFontSize"] = fit["font_size"]
+    return params
@@ -0,0 +1,168 @@
+"""
+lib/priority.py — Optional priorities on CV content, and the pruned view.
+
+Bullets (work and research experience) and skill items may be written as
+plain strings or with a priority; research subsections take a priority
+key next to their heading:
+
+    bullets:
+      - "Always kept"
+      - text: "Dropped before anything with a higher priority"
+        priority: 1
+    subsections:
+      - heading: "Side project"
+        priority: 2
+        bullets: [...]
+
+Lower priorities are dropped first. Content without a priority is never
+dropped, and a bullet or skill list always keeps at least one item.
+
+scripts/prune.py chooses what to drop and records it in generated/prune.json
+as item ids ("work_experience:entries[0].bullets[2]") with their text.
+generate.py applies that file to the YAML it loads, so the designed and ATS
+CVs are built from the same pruned content. An id whose text no longer
+matches the YAML (the content was edited since) is ignored with a warning.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from lib.config import PRUNE_PATH, die
+
+# content YAML name → the designed component its items render into
+PRUNABLE_SECTIONS = {
+    "work_experience": "work_experience.tex",
+    "research_experience": "research_experience.tex",
+    "skills": "skills.tex",
+}
+
+
+class Prunable(NamedTuple):
+    """One item that may be dropped."""
+    id: str
+    section: str          # content YAML name
+    priority: int
+    text: str             # bullet / skill text, or subsection heading
+    children: tuple[str, ...]  # ids of a subsection's bullets
+    siblings: str | None  # list that must keep one item (None: subsection)
+
+
+def item_text(item) -> str:
+    """Text of a bullet or skill item (plain string or {text, priority})."""
+    if isinstance(item, dict):
+        return str(item.get("text", ""))
+    return str(item)
+
+
+def item_priority(item) -> int | None:
+    """Priority of an item or subsection, None if it has none."""
+    if not isinstance(item, dict) or item.get("priority") is None:
+        return None
+    try:
+        return int(item["priority"])
+    except (TypeError, ValueError):
+        die(f"priority must be an integer, got '{item['priority']}'")
+
+
+def prunables(name: str, data: dict) -> Iterator[Prunable]:
+    """Yield every item of content/<name>.yaml that has a priority."""
+    if name == "skills":
+        for g, group in enumerate(data.get("groups", [])):
+            for i, item in enumerate(group.get("items", [])):
+                if (p := item_priority(item)) is not None:
+                    yield Prunable(f"{name}:groups[{g}].items[{i}]", name, p,
+                                   item_text(item), (), f"{name}:groups[{g}]")
+        return
+
+    for e, entry in enumerate(data.get("entries", [])):
+        base = f"{name}:entries[{e}]"
+        for b, bullet in enumerate(entry.get("bullets", [])):
+            if (p := item_priority(bullet)) is not None:
+                yield Prunable(f"{base}.bullets[{b}]", name, p,
+                               item_text(bullet), (), base)
+        for s, sub in enumerate(entry.get("subsections", [])):
+            sub_id = f"{base}.subsections[{s}]"
+            bullets = sub.get("bullets", [])
+            for b, bullet in enumerate(bullets):
+                if (p := item_priority(bullet)) is not None:
+                    yield Prunable(f"{sub_id}.bullets[{b}]", name, p,
+                                   item_text(bullet), (), sub_id)
+            if (p := item_priority(sub)) is not None:
+                yield Prunable(
+                    sub_id, name, p, str(sub.get("heading", "")),
+                    tuple(f"{sub_id}.bullets[{b}]" for b in range(len(bullets))),
+                    None,
+                )
+
+
+def apply_drops(name: str, data: dict, dropped: set[str]) -> dict:
+    """Return *data* without the dropped items (the input is not changed)."""
+    if not dropped or name not in PRUNABLE_SECTIONS:
+        return data
+    if name == "skills":
+        return {**data, "groups": [
+            {**group, "items": [
+                item for i, item in enumerate(group.get("items", []))
+                if f"{name}:groups[{g}].items[{i}]" not in dropped
+            ]}
+            for g, group in enumerate(data.get("groups", []))
+        ]}
+
+    entries = []
+    for e, entry in enumerate(data.get("entries", [])):
+        base = f"{name}:entries[{e}]"
+        entry = dict(entry)
+        if "bullets" in entry:
+            entry["bullets"] = [
+                b for i, b in enumerate(entry["bullets"])
+                if f"{base}.bullets[{i}]" not in dropped
+            ]
+        if "subsections" in entry:
+            entry["subsections"] = [
+                {**sub, "bullets": [
+                    b for i, b in enumerate(sub.get("bullets", []))
+                    if f"{base}.subsections[{s}].bullets[{i}]" not in dropped
+                ]}
+                for s, sub in enumerate(entry["subsections"])
+                if f"{base}.subsections[{s}]" not in dropped
+            ]
+        entries.append(entry)
+    return {**data, "entries": entries}
+
+
+def load_drops(
+    contents: dict[str, dict], key: str = "dropped"
+) -> dict[str, set[str]]:
+    """Dropped ids per section from generated/prune.json ({} if none).
+
+    *contents* maps YAML name → loaded data, to check each id still names
+    the same text. *key* "measured_with" reads the drops the last build's
+    heights were measured with instead (scripts/prune.py).
+    """
+    if not PRUNE_PATH.exists():
+        return {}
+    try:
+        recorded = json.loads(PRUNE_PATH.read_text(encoding="utf-8"))[key]
+    except (ValueError, KeyError, TypeError):
+        die(f"{PRUNE_PATH} is malformed. Re-run scripts/prune.py or delete it.")
+
+    current = {
+        p.id: p.text
+        for name, data in contents.items() if name in PRUNABLE_SECTIONS
+        for p in prunables(name, data)
+    }
+    drops: dict[str, set[str]] = {}
+    for entry in recorded:
+        if current.get(entry["id"]) != entry["text"]:
+            print(
+                f"WARNING: {PRUNE_PATH.name}: '{entry['id']}' no longer matches "
+                "the content — kept (re-run scripts/prune.py)",
+                file=sys.stderr,
+            )
+            continue
+        drops.setdefault(entry["id"].split(":", 1)[0], set()).add(entry["id"])
+    return drops
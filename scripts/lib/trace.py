@@ -0,0 +1,138 @@
+"""
+lib/trace.py — Build-stage timing in Chrome trace-event format.
+
+Every pipeline stage (generate.py, header.py, layout.py, and each latexmk
+pass via scripts/tracing.py run) appends its events to ONE file:
+
+    build/trace.json
+
+Open it in chrome://tracing or https://ui.perfetto.dev. Each stage is a
+complete ("X") event carrying wall-clock duration plus, in its args, the
+CPU time it used and any counters it recorded (files written, bytes,
+boxes measured, ...). Counters are also emitted as "C" events so they
+plot as tracks.
+
+The file uses the JSON *array* form of the format with the closing "]"
+omitted, which the viewers explicitly accept. That lets every process
+append its events with a single O_APPEND write — no read-modify-write,
+no locking, and a crashed stage still leaves a readable trace.
+
+Tracing is off unless the pipeline asks for it: the container build
+exports CV_TRACE=1 and starts a fresh file with `tracing.py reset`, so a
+script run on its own (a benchmark, fit.py by hand) leaves no trace.
+
+Environment:
+    CV_TRACE=1           record events (CV_TRACE=0 turns a build's off)
+    CV_TRACE_FILE=path   write somewhere other than build/trace.json
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from lib.config import BUILD_DIR
+
+TRACE_PATH = Path(os.environ.get("CV_TRACE_FILE", BUILD_DIR / "trace.json"))
+ENABLED = os.environ.get("CV_TRACE") == "1"
+
+# Counters accumulated by count() are attached to every open span, so a
+# stage's totals include whatever its inner spans recorded.
+_stack: list[dict[str, float]] = []
+
+
+def _now_us() -> float:
+    """Wall clock in µs since the epoch — comparable across processes."""
+    return time.time() * 1e6
+
+
+def _emit(event: dict) -> None:
+    """Append one event to the trace file (atomic for a single line)."""
+    if not ENABLED:
+        return
+    TRACE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(event, separators=(",", ":")) + ",\n"
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    fd = os.open(TRACE_PATH, flags, 0o644)
+    try:
+        if os.fstat(fd).st_size == 0:
+            line = "[\n" + line
+        os.write(fd, line.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def reset() -> None:
+    """Start a fresh trace file (called once at the start of a build)."""
+    if TRACE_PATH.exists():
+        TRACE_PATH.unlink()
+
+
+def _base(name: str, cat: str, ph: str) -> dict:
+    return {
+        "name": name,
+        "cat": cat,
+        "ph": ph,
+        "pid": os.getpid(),
+        "tid": threading.get_ident() % 100000,
+        "ts": round(_now_us(), 1),
+    }
+
+
+def count(name: str, value: float = 1) -> None:
+    """Add *value* to counter *name* on every open span."""
+    for counters in _stack:
+        counters[name] = counters.get(name, 0) + value
+
+
+def counter(name: str, cat: str = "stage", **values: float) -> None:
+    """Emit a standalone counter ("C") event, e.g. counter("grid", rows=85)."""
+    event = _base(name, cat, "C")
+    event["args"] = values
+    _emit(event)
+
+
+def instant(name: str, cat: str = "stage", **args) -> None:
+    """Emit an instant ("i") event marking a point in time."""
+    event = _base(name, cat, "i")
+    event["s"] = "p"
+    event["args"] = args
+    _emit(event)
+
+
+@contextmanager
+def span(name: str, cat: str = "python", **args) -> Iterator[dict[str, float]]:
+    """Time the enclosed block as a complete ("X") event.
+
+    Yields the span's counter dict; count() also writes into it.
+    """
+    counters: dict[str, float] = {}
+    _stack.append(counters)
+    event = _base(name, cat, "X")
+    wall0 = time.perf_counter()
+    cpu0 = time.process_time()
+    try:
+        yield counters
+    finally:
+        _stack.pop()
+        event["dur"] = round((time.perf_counter() - wall0) * 1e6, 1)
+        event["args"] = {
+            **args,
+            "cpu_ms": round((time.process_time() - cpu0) * 1e3, 3),
+            **counters,
+        }
+        _emit(event)
+        if counters:
+            counter(name, cat, **counters)
+
+
+def stage_name(argv: list[str] | None = None) -> str:
+    """'layout.py --measure' style name for the running script."""
+    argv = sys.argv if argv is None else argv
+    return " ".join([Path(argv[0]).name, *argv[1:]])
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+measure.py — Measure every section's content height, in parallel and cached.
+
+A box's content rows depend only on its content file, its column (width
+and typography) and the typesetting setup, so each section is measured
+in its own small document (engine/measure.tex) instead of one serial
+pass over the whole CV. Documents run concurrently, one LuaLaTeX process
+per core, so the measurement takes about as long as the slowest section.
+
+Each result is cached under build/cache/heights/<sha256>, keyed by the
+content file bytes, the column, and the setup every section shares
+(engine/preamble.tex, engine/arith.*, engine/measure.tex,
+generated/settings.tex, generated/params.tex and the font files). Only sections whose key
+changed are compiled.
+
+Usage:
+    measure.py [-j JOBS]      (default: one job per CPU)
+
+Inputs:
+    content/layout.yaml    — sections and their columns
+    generated/*.tex        — content files (generate.py)
+
+Outputs:
+    build/boxheights.dat   — same format as the LuaLaTeX measurement pass,
+                             read by layout.py --layout
+    build/measure/<name>/  — per-section documents and logs (misses only)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Shared infrastructure — single source of truth
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lib.config import (  # noqa: E402
+    ROOT,
+    BUILD_DIR,
+    BOXHEIGHTS_PATH,
+    CACHE_DIR,
+    GENERATED_DIR,
+    PARAMS_TEX_PATH,
+    PREAMBLE_PATH,
+    die,
+    load_layout,
+)
+from lib import trace  # noqa: E402
+from lib.boxcache import COLUMN_PREFIX  # noqa: E402
+
+# Bump when the measurement document changes shape so old entries miss.
+MEASURE_VERSION = 2
+
+MEASURE_DIR = BUILD_DIR / "measure"
+HEIGHT_CACHE_DIR = CACHE_DIR / "heights"
+MEASURE_TEX_PATH = ROOT / "engine" / "measure.tex"
+ARITH_PATHS = (ROOT / "engine" / "arith.tex", ROOT / "engine" / "arith.lua")
+SETTINGS_PATH = GENERATED_DIR / "settings.tex"
+FONT_DIR = ROOT / "fonts"
+SETUP_PATHS = (PREAMBLE_PATH, *ARITH_PATHS, MEASURE_TEX_PATH, SETTINGS_PATH, PARAMS_TEX_PATH)
+
+
+def setup_digest() -> str:
+    """Hash of everything every section's measurement shares."""
+    h = hashlib.sha256(f"measure-v{MEASURE_VERSION}".encode())
+    for path in SETUP_PATHS:
+        if not path.exists():
+            die(f"{path} not found. Run scripts/generate.py first.")
+        h.update(path.read_bytes())
+    # Font files by name and size: re-hashing megabytes of TTF per build
+    # would cost more than it saves
+    if FONT_DIR.exists():
+        for font in sorted(FONT_DIR.rglob("*.[ot]tf")):
+            h.update(f"{font.relative_to(FONT_DIR)}:{font.stat().st_size}".encode())
+    return h.hexdigest()
+
+
+def section_key(setup: str, content: str, column: str) -> str:
+    """Cache key of one section's measurement."""
+    path = GENERATED_DIR / content
+    if not path.exists():
+        die(f"{path} not found. Run scripts/generate.py first.")
+    h = hashlib.sha256(setup.encode())
+    h.update(column.encode())
+    h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def cached_height(setup: str, content: str, column: str) -> int | None:
+    """Content rows of one section from build/cache/heights, None on a miss."""
+    cache_path = HEIGHT_CACHE_DIR / section_key(setup, content, column)
+    if not cache_path.exists():
+        return None
+    return int(cache_path.read_text(encoding="utf-8"))
+
+
+def measure_document(content: str, column: str) -> str:
+    """Return the one-section measurement document (without hyperref)."""
+    return (
+        "% !! AUTO-GENERATED by scripts/measure.py — DO NOT EDIT !!\n"
+        "\\def\\CVNoLinks{1}\n"
+        "\\input{engine/preamble.tex}\n"
+        "\\input{engine/measure.tex}\n"
+        "\\begin{document}\n"
+        f"\\MeasureContent{{{COLUMN_PREFIX[column]}}}{{generated/{content}}}\n"
+        "\\end{document}\n"
+    )
+
+
+def run_lualatex(tex_path: Path) -> bool:
+    """Compile one document into its own directory; True on success.
+
+    Runs from the repo root so \\input paths resolve as in main.tex;
+    \\openout files (boxheights.dat) land in the output directory.
+    """
+    result = subprocess.run(
+        [
+            "lualatex", "-interaction=nonstopmode", "-halt-on-error",
+            f"-output-directory={tex_path.parent.relative_to(ROOT)}",
+            str(tex_path.relative_to(ROOT)),
+        ],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+def compile_section(content: str, column: str) -> int:
+    """Typeset one section on its own; return its content rows."""
+    name = Path(content).stem
+    out_dir = MEASURE_DIR / name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tex_path = out_dir / "measure.tex"
+    tex_path.write_text(measure_document(content, column), encoding="utf-8")
+    heights_path = out_dir / "boxheights.dat"
+    heights_path.unlink(missing_ok=True)
+
+    key = f"generated/{content}"
+    if not run_lualatex(tex_path) or not heights_path.exists():
+        die(f"measuring {key} failed — see {(out_dir / 'measure.log').relative_to(ROOT)}")
+    for line in heights_path.read_text(encoding="utf-8").splitlines():
+        name_, _, rows = line.partition("=")
+        if name_.strip() == key:
+            return int(rows)
+    die(f"{heights_path.relative_to(ROOT)} has no height for {key}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure every section's content height in parallel."
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="LuaLaTeX processes to run at once (default: CPU count)",
+    )
+    args = parser.parse_args()
+
+    sections = load_layout()
+    setup = setup_digest()
+    HEIGHT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    heights: dict[str, int] = {}
+    misses: list[tuple[str, str, Path]] = []
+    for sec in sections:
+        key = f"generated/{sec['content']}"
+        if key in heights:
+            continue
+        rows = cached_height(setup, sec["content"], sec["column"])
+        if rows is not None:
+            heights[key] = rows
+        else:
+            heights[key] = -1            # keeps layout.yaml order
+            cache_path = HEIGHT_CACHE_DIR / section_key(setup, sec["content"], sec["column"])
+            misses.append((sec["content"], sec["column"], cache_path))
+    trace.count("height cache hits", len(heights) - len(misses))
+    trace.count("boxes measured", len(misses))
+
+    if misses:
+        if shutil.which("lualatex") is None:
+            die("lualatex not found — run the build in Docker (./build.sh)")
+        jobs = max(1, min(args.jobs, len(misses)))
+        print(f"Measuring {len(misses)} of {len(heights)} section(s), {jobs} at a time...")
+        with trace.span("measure sections", jobs=jobs):
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                rows = list(pool.map(lambda m: compile_section(m[0], m[1]), misses))
+        for (content, _, cache_path), n in zip(misses, rows):
+            heights[f"generated/{content}"] = n
+            tmp = cache_path.with_suffix(".tmp")
+            tmp.write_text(str(n), encoding="utf-8")
+            tmp.replace(cache_path)
+    else:
+        print(f"All {len(heights)} section heights cached — nothing to compile")
+
+    BOXHEIGHTS_PATH.write_text(
+        "".join(f"{key}={n}\n" for key, n in heights.items()), encoding="utf-8"
+    )
+    for key, n in heights.items():
+        print(f"  {key}: {n} rows")
+    print(f"  Generated {BOXHEIGHTS_PATH.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+profile_report.py — Rank the TeX templates by compile time.
+
+Reads (written by engine/profile.tex when the designed CV is built with
+CV_PROFILE=1, ./build.sh -p):
+    build/boxprofile-<pass>.dat          — one per latexmk / lualatex pass
+    build/measure/*/boxprofile-*.dat     — scripts/measure.py documents
+    build/boxes/*/boxprofile-*.dat       — scripts/render.py documents
+
+Only files written by the latest build count (newer than
+generated/settings.tex, which generate.py writes first): sections that hit
+the measure or render cache leave last build's profile behind. Every pass
+is reported on its own; the measure and render documents are summed into
+one pass each.
+
+Each record is "step label page cpu_ms wall_ms calls":
+
+    measure / frame / place   one per box; label = content file
+    header                    one per page
+    pagebreak                 one per page break (includes the repeated
+                              header and the previous page's shipout)
+    shipout                   page output (textpos blocks are set here)
+    packages, fonts           preamble loading, once
+    document                  whole document body, once
+    tree-*, timeline-*        summed over every item (label "*")
+
+Prints three tables: time per step (what kind of work is expensive), the
+hottest boxes (which section is expensive), and the share of the document
+body each step accounts for. Accumulated tree/timeline steps run INSIDE
+measure and place (content is typeset twice per box), so their time is
+already included there — they show how much of it the prefixes cost.
+
+Usage:
+    profile_report.py [--top N] [--wall] [--pass NAME]
+
+--pass reports only the passes whose name contains NAME (e.g. "pass-2",
+"measure").
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lib.config import ROOT, BUILD_DIR, BOXPROFILE_GLOB, GENERATED_DIR, die  # noqa: E402
+from measure import MEASURE_DIR  # noqa: E402
+from render import RENDER_DIR  # noqa: E402
+
+BOX_STEPS = ("measure", "frame", "place")
+
+
+def profile_passes() -> list[tuple[str, list[Path]]]:
+    """Return (pass name, profile files) for the latest build, oldest first."""
+    settings = GENERATED_DIR / "settings.tex"
+    since = settings.stat().st_mtime if settings.exists() else 0.0
+
+    def current(paths) -> list[Path]:
+        return sorted(p for p in paths if p.stat().st_mtime >= since)
+
+    passes = [
+        (p.stem.removeprefix("boxprofile-"), [p])
+        for p in current(BUILD_DIR.glob(BOXPROFILE_GLOB))
+    ]
+    for script, root in (("measure.py", MEASURE_DIR), ("render.py", RENDER_DIR)):
+        docs = current(root.glob(f"*/{BOXPROFILE_GLOB}"))
+        if docs:
+            passes.append((f"{script} ({len(docs)} documents)", docs))
+    passes.sort(key=lambda kv: max(p.stat().st_mtime for p in kv[1]))
+    return passes
+
+
+def load_profile(path: Path) -> list[dict]:
+    """Parse one boxprofile-*.dat into a list of record dicts."""
+    records: list[dict] = []
+    for n, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) != 6:
+            die(f"{path.name}:{n}: expected 6 fields, got {len(fields)}: '{line}'")
+        step, label, page, cpu_ms, wall_ms, calls = fields
+        try:
+            records.append({
+                "step": step,
+                "label": label,
+                "page": page,
+                "cpu_ms": float(cpu_ms),
+                "wall_ms": float(wall_ms),
+                "calls": int(calls),
+            })
+        except ValueError:
+            die(f"{path.name}:{n}: invalid number in '{line}'")
+    return records
+
+
+def _rel(path: Path) -> Path:
+    return path.relative_to(ROOT) if path.is_relative_to(ROOT) else path
+
+
+def report(records: list[dict], top: int, metric: str) -> None:
+    """Print the step, box and share tables, ranked by *metric*."""
+    # --- By step -------------------------------------------------------------
+    steps: dict[str, dict[str, float]] = defaultdict(
+        lambda: {"cpu_ms": 0.0, "wall_ms": 0.0, "calls": 0}
+    )
+    for r in records:
+        s = steps[r["step"]]
+        s["cpu_ms"] += r["cpu_ms"]
+        s["wall_ms"] += r["wall_ms"]
+        s["calls"] += r["calls"]
+
+    print("Time by step")
+    print(f"{'cpu ms':>10}  {'wall ms':>10}  {'calls':>6}  {'ms/call':>8}  step")
+    for name, s in sorted(steps.items(), key=lambda kv: -kv[1][metric]):
+        per_call = s[metric] / s["calls"] if s["calls"] else 0.0
+        print(
+            f"{s['cpu_ms']:10.1f}  {s['wall_ms']:10.1f}  {s['calls']:6d}  "
+            f"{per_call:8.3f}  {name}"
+        )
+
+    # --- By box --------------------------------------------------------------
+    boxes: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for r in records:
+        if r["step"] in BOX_STEPS:
+            box = boxes[r["label"]]
+            box[r["step"]] += r[metric]
+            box["total"] += r[metric]
+
+    if boxes:
+        unit = "cpu" if metric == "cpu_ms" else "wall"
+        print()
+        print(f"Hottest boxes ({unit} ms)")
+        print(
+            f"{'total':>8}  {'measure':>8}  {'frame':>8}  {'place':>8}  content"
+        )
+        ranked = sorted(boxes.items(), key=lambda kv: -kv[1]["total"])
+        for label, box in ranked[:top]:
+            print(
+                f"{box['total']:8.1f}  {box['measure']:8.1f}  "
+                f"{box['frame']:8.1f}  {box['place']:8.1f}  {label}"
+            )
+        if len(ranked) > top:
+            print(f"  ... {len(ranked) - top} more")
+
+    # --- Share of the document body -----------------------------------------
+    body = steps.get("document", {}).get(metric, 0.0)
+    first_header = sum(
+        r[metric] for r in records if r["step"] == "header" and r["page"] == "1"
+    )
+    # \CVPageBreak ships out the previous page, so every shipout except the
+    # last one ran inside a pagebreak record.
+    shipouts = [r for r in records if r["step"] == "shipout"]
+    inner_shipout = sum(r[metric] for r in shipouts[:-1])
+    pagebreak = steps.get("pagebreak", {}).get(metric, 0.0) - inner_shipout
+    if body > 0:
+        print()
+        print("Share of document body")
+        shares = [
+            ("dot frames", steps.get("frame", {}).get(metric, 0.0)),
+            ("content typesetting (measure + place)",
+             sum(steps.get(s, {}).get(metric, 0.0) for s in ("measure", "place"))),
+            ("  of which tree/timeline prefixes",
+             sum(v[metric] for k, v in steps.items() if k.endswith("-prefix"))),
+            # pagebreak already contains the repeated header of pages 2+
+            ("header + page breaks", first_header + pagebreak),
+            ("page output", steps.get("shipout", {}).get(metric, 0.0)),
+        ]
+        for name, ms in shares:
+            print(f"{100 * ms / body:6.1f}%  {ms:10.1f}  {name}")
+        preamble = sum(
+            steps.get(s, {}).get(metric, 0.0) for s in ("packages", "fonts")
+        )
+        print(
+            f"Preamble (not in body): packages + fonts = {preamble:.1f} ms, "
+            f"of which fonts {steps.get('fonts', {}).get(metric, 0.0):.1f} ms"
+        )
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    top = 10
+    metric = "cpu_ms"
+    only = None
+    while args:
+        arg = args.pop(0)
+        if arg == "--top" and args and args[0].isdigit():
+            top = int(args.pop(0))
+        elif arg == "--wall":
+            metric = "wall_ms"
+        elif arg == "--pass" and args:
+            only = args.pop(0)
+        else:
+            print(
+                "Usage: profile_report.py [--top N] [--wall] [--pass NAME]",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+    passes = profile_passes()
+    if only is not None:
+        passes = [(name, paths) for name, paths in passes if only in name]
+    if not passes:
+        die(
+            f"no {BOXPROFILE_GLOB} from the latest build under "
+            f"{_rel(BUILD_DIR)}. Build with profiling enabled first "
+            "(./build.sh -p, or CV_PROFILE=1)."
+        )
+    for n, (name, paths) in enumerate(passes):
+        if n:
+            print()
+        print(f"=== {name} ===")
+        report([r for path in paths for r in load_profile(path)], top, metric)
+        where = _rel(paths[0]) if len(paths) == 1 else _rel(paths[0].parent.parent)
+        print(f"Profile: {where}")
+
+
+if __name__ == "__main__":
+    main()
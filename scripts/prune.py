@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+prune.py — Drop the lowest-priority content until the designed CV fits N pages.
+
+Usage:
+    prune.py --pages N
+    prune.py --clear         (delete generated/prune.json, keep everything)
+
+Candidates are the bullets, research subsections and skill items that
+carry a priority (see lib/priority.py). They sit in a min-heap keyed by
+priority, later items first among equals; the lowest is popped and
+dropped, and layout.py's planner (dry run) predicts the page count and
+the rows run off a page again, until it is N pages with nothing off a
+page or nothing droppable is left.
+
+Height model: every section's measured height (the last build) is shared
+out over its rendered lines in proportion to 1 + characters / content
+width, so each item's rows are known up front. Dropping an item subtracts
+its rows from its section, an O(1) update; nothing is re-measured. The
+next build measures the pruned sections exactly, and
+layout.py --converge corrects any estimate error.
+
+Inputs:
+    content/*.yaml, content/layout.yaml, content/contact.yaml,
+    engine/params.yaml
+    build/boxheights-measure.dat (or build/boxheights.dat) — from a build
+
+Outputs:
+    generated/prune.json   — the dropped items; generate.py applies it to
+                             both CVs on every build
+    generated/work_experience.tex, research_experience.tex, skills.tex
+                           — regenerated without the dropped items
+    build/prune-report.txt — what was dropped, and the predicted page count
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Callable
+
+# ---------------------------------------------------------------------------
+# Shared infrastructure — single source of truth
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lib.config import (  # noqa: E402
+    ROOT,
+    BOXHEIGHTS_PATH,
+    MEASURED_HEIGHTS_PATH,
+    PRUNE_PATH,
+    PRUNE_REPORT_PATH,
+    load_contact,
+    load_layout,
+    load_breaker,
+    compute_grid,
+    content_widths,
+)
+from lib.priority import (  # noqa: E402
+    PRUNABLE_SECTIONS,
+    Prunable,
+    apply_drops,
+    item_text,
+    load_drops,
+    prunables,
+)
+from lib import trace  # noqa: E402
+from lib.params import load_params  # noqa: E402
+from generate import (  # noqa: E402
+    escape_latex,
+    gen_designed_research,
+    gen_designed_skills,
+    gen_designed_work,
+    load_yaml,
+    write_component,
+)
+from layout import load_boxheights, overflow_rows, plan_layout  # noqa: E402
+
+GENERATORS = {
+    "work_experience": gen_designed_work,
+    "research_experience": gen_designed_research,
+    "skills": gen_designed_skills,
+}
+
+
+def _weight(text: str, width: float) -> float:
+    """Relative height of one rendered line of *text* (1 = one short line)."""
+    return 1.0 + len(text) / width
+
+
+def _rendered_weight(name: str, data: dict, width: float) -> float:
+    """Total weight of a section's designed .tex (comments and blanks skipped)."""
+    return sum(
+        _weight(line.strip(), width)
+        for line in GENERATORS[name](data).splitlines()
+        if line.strip() and not line.lstrip().startswith("%")
+    )
+
+
+def _lists(name: str, data: dict) -> dict[str, list[str]]:
+    """Texts of every bullet / skill list, keyed like Prunable.siblings."""
+    if name == "skills":
+        return {
+            f"{name}:groups[{g}]": [item_text(i) for i in group.get("items", [])]
+            for g, group in enumerate(data.get("groups", []))
+        }
+    lists: dict[str, list[str]] = {}
+    for e, entry in enumerate(data.get("entries", [])):
+        base = f"{name}:entries[{e}]"
+        lists[base] = [item_text(b) for b in entry.get("bullets", [])]
+        for s, sub in enumerate(entry.get("subsections", [])):
+            lists[f"{base}.subsections[{s}]"] = [
+                item_text(b) for b in sub.get("bullets", [])
+            ]
+    return lists
+
+
+def drop_until_fits(
+    target: int,
+    heap: list[tuple[int, int, str]],
+    items: dict[str, Prunable],
+    weight: dict[str, float],
+    alive: dict[str, int],
+    drop: Callable[[Prunable, float], float],
+    predict: Callable[[], tuple[int, int]],
+) -> tuple[tuple[int, int], tuple[int, int], list[tuple[Prunable, float]]]:
+    """Pop *heap* and drop items until *predict* fits *target* pages.
+
+    predict() gives (rows off a page, pages); a layout fits when the first
+    is 0 and the second at most *target*, so an overflowing box keeps
+    items dropping whatever the page count. drop(item, weight) applies a
+    drop and returns its rows. Returns (prediction before, prediction
+    after, [(item, rows)] kept); out of candidates, only the drops up to
+    the last one that improved the prediction are kept.
+    """
+    before = state = predict()
+    dropped: list[tuple[Prunable, float]] = []
+    dropped_ids: set[str] = set()
+    useful = 0          # drops up to the last one that improved the prediction
+    while (state[0] or state[1] > target) and heap:
+        _, _, pid = heapq.heappop(heap)
+        p = items[pid]
+        if p.siblings in dropped_ids:
+            continue                       # its subsection is gone
+        if p.siblings is not None:
+            if alive[p.siblings] <= 1:
+                continue                   # last item of its list
+            alive[p.siblings] -= 1
+            if p.siblings in weight:
+                weight[p.siblings] -= weight[pid]
+        dropped.append((p, drop(p, weight[pid])))
+        dropped_ids.add(pid)
+        after = predict()
+        if after < state:
+            useful = len(dropped)
+        state = after
+    if state[0] or state[1] > target:
+        # Out of candidates: keep only the drops that helped
+        del dropped[useful:]
+    return before, state, dropped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drop the lowest-priority content until the CV fits N pages."
+    )
+    parser.add_argument("--pages", type=int, help="target page count")
+    parser.add_argument(
+        "--clear", action="store_true",
+        help="delete generated/prune.json (keep all content again)",
+    )
+    args = parser.parse_args()
+
+    if args.clear:
+        PRUNE_PATH.unlink(missing_ok=True)
+        print(f"Removed {PRUNE_PATH.relative_to(ROOT)} — rebuild to restore content")
+        return
+    if args.pages is None or args.pages < 1:
+        parser.error("--pages N (N >= 1) is required")
+    target = args.pages
+
+    heights_path = (
+        MEASURED_HEIGHTS_PATH if MEASURED_HEIGHTS_PATH.exists() else BOXHEIGHTS_PATH
+    )
+    measured = load_boxheights(heights_path)
+    sections = load_layout()
+    breaker = load_breaker()
+    contact = load_contact()
+    params = load_params(contact.get("header_theme"))
+    grid = compute_grid(contact, params)
+    widths = content_widths(grid["grid_cols"], params)
+    contents = {name: load_yaml(name) for name in PRUNABLE_SECTIONS}
+
+    # Drops in effect when the heights were measured: the current ones,
+    # unless prune.json was rewritten after that build.
+    stale = (
+        PRUNE_PATH.exists()
+        and PRUNE_PATH.stat().st_mtime > heights_path.stat().st_mtime
+    )
+    measured_drops = load_drops(contents, "measured_with" if stale else "dropped")
+
+    # Section heights with nothing dropped, and rows per unit of weight
+    remaining: dict[str, float] = {}
+    rows_per_weight: dict[str, float] = {}
+    width_of: dict[str, float] = {}
+    for sec in sections:
+        name = Path(sec["content"]).stem
+        key = f"generated/{sec['content']}"
+        if name not in PRUNABLE_SECTIONS or key not in measured:
+            continue
+        width = widths[sec["column"]]
+        built = apply_drops(name, contents[name], measured_drops.get(name, set()))
+        k = measured[key] / max(_rendered_weight(name, built, width), 1.0)
+        rows_per_weight[name] = k
+        width_of[name] = width
+        remaining[name] = k * _rendered_weight(name, contents[name], width)
+
+    heights = dict(measured)
+
+    def set_height(name: str) -> None:
+        key = f"generated/{PRUNABLE_SECTIONS[name]}"
+        heights[key] = max(1, math.ceil(remaining[name] - 1e-9))
+
+    def predict() -> tuple[int, int]:
+        placements, pages = plan_layout(sections, grid, heights, breaker, dry_run=True)
+        return overflow_rows(placements, grid), pages
+
+    def drop(p: Prunable, item_weight: float) -> float:
+        rows = rows_per_weight[p.section] * item_weight
+        remaining[p.section] -= rows
+        set_height(p.section)
+        return rows
+
+    # Item weights; a subsection weighs its heading plus its live bullets
+    items: dict[str, Prunable] = {}
+    weight: dict[str, float] = {}
+    alive: dict[str, int] = {}
+    heap: list[tuple[int, int, str]] = []
+    for name in remaining:
+        set_height(name)
+        lists = _lists(name, contents[name])
+        alive.update((list_id, len(texts)) for list_id, texts in lists.items())
+        for order, p in enumerate(prunables(name, contents[name])):
+            items[p.id] = p
+            weight[p.id] = sum(
+                _weight(escape_latex(text), width_of[name])
+                for text in [p.text, *(lists[p.id] if p.children else [])]
+            )
+            heapq.heappush(heap, (p.priority, -order, p.id))
+
+    with trace.span("prune"):
+        (_, before), (overflow, pages), dropped = drop_until_fits(
+            target, heap, items, weight, alive, drop, predict)
+    trace.count("pruned", len(dropped))
+
+    # Regenerate the pruned components now; generate.py reapplies
+    # prune.json on every later build.
+    drops = {name: {p.id for p, _ in dropped if p.section == name} for name in remaining}
+    PRUNE_PATH.write_text(json.dumps({
+        "target_pages": target,
+        "predicted_pages": pages,
+        "predicted_overflow": overflow,
+        "dropped": [
+            {"id": p.id, "text": p.text, "priority": p.priority}
+            for p, _ in dropped
+        ],
+        "measured_with": [
+            {"id": p.id, "text": p.text}
+            for name in remaining for p in prunables(name, contents[name])
+            if p.id in measured_drops.get(name, set())
+        ],
+    }, indent=2) + "\n", encoding="utf-8")
+    for name in remaining:
+        write_component(
+            name, GENERATORS[name](apply_drops(name, contents[name], drops[name]))
+        )
+
+    report = [f"Target {target} page(s): {before} predicted before pruning, {pages} after"]
+    if not dropped:
+        report.append("Nothing dropped.")
+    for p, rows in dropped:
+        text = p.text if len(p.text) <= 60 else p.text[:57] + "..."
+        kind = "subsection" if p.children else "item"
+        report.append(
+            f"  dropped {kind} {p.id} (priority {p.priority}, ~{rows:.1f} rows): {text}"
+        )
+    if overflow:
+        report.append(
+            f"WARNING: {overflow} row(s) still run off a page — add priorities "
+            "to more content or use scripts/fit.py"
+        )
+    if pages > target:
+        report.append(
+            f"WARNING: still {pages} page(s) — add priorities to more content "
+            "or use scripts/fit.py"
+        )
+    PRUNE_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    PRUNE_REPORT_PATH.write_text("\n".join(report) + "\n", encoding="utf-8")
+    print("\n".join(report))
+    print(f"Wrote {PRUNE_PATH.relative_to(ROOT)} — rebuild to apply")
+
+
+if __name__ == "__main__":
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+render.py — Render every box the canvas places from the cache, once.
+
+generated/canvas.tex places each box with \\CachedBox and a key
+(lib/boxcache.py: title, content bytes, column, box rows and the
+typesetting setup). This script compiles every key that has no PDF under
+build/cache/boxes/ yet, each box on its own exactly box-sized page
+(\\RenderBox, engine/boxcache.tex), concurrently, one LuaLaTeX process per
+core. The final pass then includes each page as a form XObject instead of
+typesetting the box again, so after editing one bullet only that box is
+rendered.
+
+Run after layout.py --layout (and after every --converge that rewrote the
+canvas), before the final compile. A box that is still missing is
+typeset live by \\CachedBox, so a skipped run costs time, not correctness.
+
+Usage:
+    render.py [-j JOBS]      (default: one job per CPU)
+
+Inputs:
+    generated/canvas.tex   — \\CachedBox lines (layout.py)
+    generated/*.tex        — box content files
+
+Outputs:
+    build/cache/boxes/<key>.pdf — one page per box
+    build/boxes/<key>/          — render documents and logs (misses only)
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Shared infrastructure — single source of truth
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lib.config import ROOT, BUILD_DIR, CANVAS_TEX_PATH, die  # noqa: E402
+from lib.boxcache import BOX_CACHE_DIR, box_pdf  # noqa: E402
+from lib import trace  # noqa: E402
+from measure import run_lualatex  # noqa: E402
+
+RENDER_DIR = BUILD_DIR / "boxes"
+
+# \CachedBox{Prefix}{key}{TITLE}{content}, one per canvas line
+_CACHED_BOX_RE = re.compile(
+    r"^\\CachedBox\{(\w+)\}\{([0-9a-f]+)\}\{(.*)\}\{([^{}]+)\}$"
+)
+
+
+def render_document(prefix: str, title: str, content: str) -> str:
+    """Return the one-box render document (without hyperref: boxes with
+    links are never cached, see lib/boxcache.cacheable)."""
+    return (
+        "% !! AUTO-GENERATED by scripts/render.py — DO NOT EDIT !!\n"
+        "\\def\\CVNoLinks{1}\n"
+        "\\input{engine/preamble.tex}\n"
+        "\\input{engine/leftbox.tex}\n"
+        "\\input{engine/rightbox.tex}\n"
+        "\\input{engine/fullbox.tex}\n"
+        "\\input{engine/boxcache.tex}\n"
+        "\\begin{document}\n"
+        "\\pagestyle{empty}\n"
+        f"\\RenderBox{{{prefix}}}{{{title}}}{{{content}}}\n"
+        "\\end{document}\n"
+    )
+
+
+def render_box(prefix: str, key: str, title: str, content: str) -> None:
+    """Render one box and move its page into the cache."""
+    out_dir = RENDER_DIR / key
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tex_path = out_dir / "box.tex"
+    tex_path.write_text(render_document(prefix, title, content), encoding="utf-8")
+    pdf_path = out_dir / "box.pdf"
+    pdf_path.unlink(missing_ok=True)
+
+    if not run_lualatex(tex_path) or not pdf_path.exists():
+        die(f"rendering {content} failed — see {(out_dir / 'box.log').relative_to(ROOT)}")
+    tmp = box_pdf(key).with_suffix(".tmp")
+    shutil.copyfile(pdf_path, tmp)
+    tmp.replace(box_pdf(key))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Render the canvas's cached boxes that are not cached yet."
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="LuaLaTeX processes to run at once (default: CPU count)",
+    )
+    args = parser.parse_args()
+
+    if not CANVAS_TEX_PATH.exists():
+        die(f"{CANVAS_TEX_PATH} not found. Run layout.py --layout first.")
+    boxes: dict[str, tuple[str, str, str]] = {}
+    for line in CANVAS_TEX_PATH.read_text(encoding="utf-8").splitlines():
+        if m := _CACHED_BOX_RE.match(line.strip()):
+            prefix, key, title, content = m.groups()
+            boxes[key] = (prefix, title, content)
+    misses = [(key, *box) for key, box in boxes.items() if not box_pdf(key).exists()]
+    trace.count("box cache hits", len(boxes) - len(misses))
+    trace.count("boxes rendered", len(misses))
+
+    if not boxes:
+        print("No cached boxes in the canvas (CV_BOX_CACHE=1 to use it) — nothing to render")
+        return
+    if not misses:
+        print(f"All {len(boxes)} boxes cached — nothing to render")
+        return
+    if shutil.which("lualatex") is None:
+        die("lualatex not found — run the build in Docker (./build.sh)")
+
+    BOX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    jobs = max(1, min(args.jobs, len(misses)))
+    print(f"Rendering {len(misses)} of {len(boxes)} box(es), {jobs} at a time...")
+    with trace.span("render boxes", jobs=jobs):
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(
+                lambda m: render_box(m[1], m[0], m[2], m[3]), misses
+            ))
+    for key, _, title, content in misses:
+        print(f"  {content} ({title}) → {box_pdf(key).relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    with trace.span(trace.stage_name(), cat="stage"):
+        main()
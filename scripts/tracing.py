@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+tracing.py — Wrap build commands as spans in build/trace.json.
+
+The Python stages trace themselves (lib/trace.py). This wrapper covers
+everything else — in particular each latexmk pass, so a slow build can be
+attributed to pass 1 (measure) or pass 2 (final).
+
+Usage:
+    tracing.py reset                      Start a new trace for this build
+    tracing.py run NAME -- CMD [ARGS...]  Run CMD, recording it as span NAME
+    tracing.py summary                    Print a per-stage table of the trace
+
+`run` passes the command's output through unchanged and exits with its
+exit code. It records wall-clock time, the CPU time of the command and
+all its children (latexmk → lualatex), and counts the LaTeX engine runs
+latexmk reports ("Run number N of rule ...") as an extra counter and as
+instant events, so repeated reruns inside one pass are visible. It also
+sets CV_PROFILE_PASS=NAME for the command, which names the pass's profile
+file when profiling is on (engine/profile.tex).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lib.config import ROOT, die  # noqa: E402
+from lib import trace  # noqa: E402
+
+RUN_NUMBER = re.compile(r"Run number (\d+) of rule '([^']+)'")
+
+
+def _children_cpu_s() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def cmd_run(name: str, command: list[str]) -> int:
+    """Run *command* inside a span named *name*; return its exit code."""
+    if not command:
+        die("tracing.py run: no command given after '--'")
+    cpu0 = _children_cpu_s()
+    # Names the pass's TeX profile (engine/profile.tex, CV_PROFILE=1)
+    env = {**os.environ, "CV_PROFILE_PASS": name}
+    with trace.span(name, cat="command", command=" ".join(command)) as counters:
+        try:
+            proc = subprocess.Popen(
+                command,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace",
+            )
+        except FileNotFoundError:
+            die(f"tracing.py run: command not found: {command[0]}")
+            return 127  # unreachable
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            sys.stdout.write(line)
+            m = RUN_NUMBER.search(line)
+            if m:
+                trace.count("engine_runs")
+                trace.instant(f"{m.group(2)} run {m.group(1)}", cat="command")
+        returncode = proc.wait()
+        counters["child_cpu_ms"] = round((_children_cpu_s() - cpu0) * 1e3, 3)
+        counters["exit_code"] = returncode
+    sys.stdout.flush()
+    return returncode
+
+
+def cmd_summary() -> None:
+    """Print one line per complete event, in start order."""
+    if not trace.TRACE_PATH.exists():
+        die(f"{trace.TRACE_PATH} not found — run a build first")
+    text = trace.TRACE_PATH.read_text(encoding="utf-8").rstrip().rstrip(",")
+    if not text.endswith("]"):
+        text += "]"
+    events = [e for e in json.loads(text) if e.get("ph") == "X"]
+    if not events:
+        print("No spans recorded.")
+        return
+    events.sort(key=lambda e: e["ts"])
+    t0 = events[0]["ts"]
+    print(f"{'start s':>8}  {'wall s':>8}  {'cpu s':>8}  stage")
+    for e in events:
+        args = e.get("args", {})
+        cpu_ms = args.get("child_cpu_ms", 0) + args.get("cpu_ms", 0)
+        extras = ", ".join(
+            f"{k}={v}" for k, v in args.items()
+            if k not in ("cpu_ms", "child_cpu_ms", "command")
+        )
+        print(
+            f"{(e['ts'] - t0) / 1e6:8.3f}  {e['dur'] / 1e6:8.3f}  "
+            f"{cpu_ms / 1e3:8.3f}  {e['name']}" + (f"  [{extras}]" if extras else "")
+        )
+    print(f"Trace: {trace.TRACE_PATH.relative_to(ROOT) if trace.TRACE_PATH.is_relative_to(ROOT) else trace.TRACE_PATH}")
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    if args == ["reset"]:
+        trace.reset()
+    elif args == ["summary"]:
+        cmd_summary()
+    elif len(args) >= 3 and args[0] == "run" and args[2] == "--":
+        sys.exit(cmd_run(args[1], args[3:]))
+    else:
+        print(
+            "Usage: tracing.py reset\n"
+            "       tracing.py run NAME -- CMD [ARGS...]\n"
+            "       tracing.py summary",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
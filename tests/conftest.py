@@ -0,0 +1,27 @@
+"""Make scripts/ (and its lib package) importable, as the scripts do themselves,
+and provide the sandbox fixture shared by the layout and fit tests."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch):
+    """layout.py and lib/params.py reading and writing under *tmp_path*."""
+    import layout
+    from lib import config, params
+
+    (tmp_path / "generated").mkdir()
+    monkeypatch.setattr(layout, "ROOT", tmp_path)
+    monkeypatch.setattr(layout, "GENERATED_DIR", tmp_path / "generated")
+    monkeypatch.setattr(config, "FIT_PATH", tmp_path / "generated" / "fit.json")
+    monkeypatch.setattr(params, "PARAMS_TEX_PATH", tmp_path / "generated" / "params.tex")
+    monkeypatch.setattr(params, "PARAMS_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(params, "_snapshot", None)
+    return tmp_path
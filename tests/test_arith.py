@@ -0,0 +1,213 @@
+"""engine/arith.lua: the same rows as pgfmath and lib/config.box_rows().
+
+A corpus of the expressions the templates evaluate, each with the result
+\\pgfmathtruncatemacro gave before engine/arith.tex, the result arith.lua
+gives now, and box_rows() where Python computes the same number. The
+pgfmath column is pinned, and re-derived from a model of pgfmath's
+fixed-point rules (_pgf_*): every number is a TeX dimension in scaled
+points (1/65536 pt), sums are exact in sp, and a division by a whole
+number of pt truncates the quotient to sp.
+
+Run it directly to print the table:
+
+    python3 tests/test_arith.py
+
+arith.lua runs under texlua when it is installed, else under lupa.
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))  # when run directly
+from lib.config import box_rows  # noqa: E402
+
+ARITH_LUA = ROOT / "engine" / "arith.lua"
+
+PT = 65536  # sp per pt
+
+# Box rows: "1 + pad_top + content_rows + pad_bot + 1" (leftbox.tex etc.)
+# (pad_top, content_rows, pad_bot, pgfmath, lua)
+BOX_ROWS = [
+    ("1.2", 14, "1", 18, 18),       # the shipped pads
+    ("1.2", 0, "1", 4, 4),
+    ("1.2", 14, "0.8", 18, 18),     # 0.8 + 1.2 is whole
+    ("0.5", 3, "0.5", 6, 6),
+    ("0.13", 7, "0.87", 10, 10),    # float sum 9.999999999999998
+    ("0.18", 1, "0.82", 4, 4),      # float sum 3.9999999999999996
+    ("1.01", 14, "0.99", 18, 18),
+    ("1.22", 7, "1.78", 12, 12),
+    ("1.901", 43, "1.099", 48, 48),
+    ("2.844", 2, "1.156", 8, 8),
+    ("0.99999", 5, "0", 7, 7),      # just below a row stays below
+    ("0.1", 5, "0.2", 7, 7),
+]
+
+# Content rows: "ptceil(height, module)", pgfmath's "ceil(height / module)"
+# (leftbox.tex, measure.tex), both read in sp (\Sp). An overhang smaller
+# than pgfmath's quotient resolution is not a row, in either.
+# (height sp, module sp, pgfmath, lua)
+CONTENT_ROWS = [
+    (7 * 9 * PT, 9 * PT, 7, 7),            # exactly 7 rows of 9pt
+    (7 * 9 * PT - 1, 9 * PT, 7, 7),
+    (7 * 9 * PT + 1, 9 * PT, 7, 7),        # 1sp over: below the resolution
+    (7 * 9 * PT + 8, 9 * PT, 7, 7),
+    (7 * 9 * PT + 9, 9 * PT, 8, 8),        # first overhang that counts
+    (40 * 557056, 557056, 40, 40),         # 8.5pt grid (fit.py)
+    (40 * 557056 + 5, 557056, 40, 40),
+    (40 * 557056 + 6, 557056, 41, 41),
+    (12 * 589824 + 294912, 589824, 13, 13),
+    (0, 9 * PT, 0, 0),
+]
+
+# int() and round() edge cases (header.tex, tree prefixes)
+# (expression, pgfmath, lua)
+EDGES = [
+    ("int(7 / 2)", 3, 3),
+    ("int(-7 / 2)", -3, -3),
+    ("round(2.5)", 3, 3),
+    ("round(-2.5)", -3, -3),
+    ("max(0, min(3, 17 / 5))", 3, 3),
+    ("max(0, ceil(1769472 / (1.0 * 589824)) - 1)", 2, 2),
+]
+
+
+# ---------------------------------------------------------------------------
+# pgfmath model
+# ---------------------------------------------------------------------------
+
+def _pgf_sp(number: str) -> int:
+    """A decimal constant in scaled points, rounded as TeX reads it."""
+    whole, _, frac = number.partition(".")
+    acc = 0
+    for digit in reversed(frac[:17]):
+        acc = (acc + int(digit) * 2 * PT) // 10
+    return int(whole or 0) * PT + (acc + 1) // 2
+
+
+def _pgf_box_rows(pad_top: str, rows: int, pad_bot: str) -> int:
+    total = sum(_pgf_sp(t) for t in ("1", pad_top, str(rows), pad_bot, "1"))
+    return total // PT
+
+
+def _pgf_ceil_div(height: int, module: int) -> int:
+    """ceil(height / module), pgfmath's division and ceil."""
+    if module % PT == 0:
+        # \divide by the whole-pt divisor, truncating in sp
+        quotient = height // (module // PT)
+    else:
+        # Long division to five decimals, read back as pt
+        whole, rest = divmod(height, module)
+        digits = ""
+        for _ in range(5):
+            digit, rest = divmod(rest * 10, module)
+            digits += str(digit)
+        quotient = _pgf_sp(f"{whole}.{digits}")
+    return quotient // PT + (quotient % PT != 0)
+
+
+# ---------------------------------------------------------------------------
+# arith.lua
+# ---------------------------------------------------------------------------
+
+_RUNNER = """
+local out = {}
+tex = {
+    sprint = function(s) out[#out + 1] = s end,
+    error = function(msg) error(msg) end,
+}
+local M = dofile(%s)
+local results = {}
+for _, expr in ipairs(EXPRS) do
+    out = {}
+    M.int(expr)
+    results[#results + 1] = table.concat(out)
+end
+return table.concat(results, "\\n")
+"""
+
+
+def lua_int(exprs: list[str]) -> list[int]:
+    """\\IntEval of every expression, by engine/arith.lua."""
+    listing = "{" + ", ".join(json.dumps(e) for e in exprs) + "}"
+    source = f"EXPRS = {listing}\n" + _RUNNER % json.dumps(str(ARITH_LUA))
+    texlua = shutil.which("texlua")
+    if texlua:
+        with tempfile.TemporaryDirectory() as tmp:
+            script = Path(tmp) / "corpus.lua"
+            script.write_text(f"print((function() {source} end)())", encoding="utf-8")
+            out = subprocess.run(
+                [texlua, str(script)], capture_output=True, text=True, check=True,
+            ).stdout
+    else:
+        lupa = pytest.importorskip("lupa")
+        out = lupa.LuaRuntime().execute(source)
+    return [int(v) for v in out.split()]
+
+
+def corpus() -> list[tuple[str, int, int, int | None]]:
+    """(expression, pinned pgfmath, pinned lua, box_rows() or None)."""
+    rows = [
+        (f"1 + {pt} + {n} + {pb} + 1", pgf, lua, box_rows(n, float(pt), float(pb)))
+        for pt, n, pb, pgf, lua in BOX_ROWS
+    ]
+    rows += [
+        (f"ptceil({h}, {m})", pgf, lua, None) for h, m, pgf, lua in CONTENT_ROWS
+    ]
+    rows += [(expr, pgf, lua, None) for expr, pgf, lua in EDGES]
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_pgfmath_model_gives_the_pinned_results():
+    for pt, n, pb, pgf, _ in BOX_ROWS:
+        assert _pgf_box_rows(pt, n, pb) == pgf, (pt, n, pb)
+    for h, m, pgf, _ in CONTENT_ROWS:
+        assert _pgf_ceil_div(h, m) == pgf, (h, m)
+
+
+def test_arith_lua_gives_the_pinned_results():
+    table = corpus()
+    assert lua_int([expr for expr, *_ in table]) == [lua for _, _, lua, _ in table]
+
+
+def test_box_rows_matches_arith_lua_and_pgfmath():
+    for _, pgf, lua, py in corpus()[:len(BOX_ROWS)]:
+        assert py == lua == pgf
+
+
+def test_arith_lua_matches_pgfmath_everywhere():
+    for expr, pgf, lua, _ in corpus():
+        assert lua == pgf, expr
+
+
+def test_ptceil_matches_the_pgfmath_model_over_a_sweep():
+    # Whole-pt and fractional-pt modules, heights up to a page and around
+    # every multiple of the module.
+    cases = []
+    for m in (9 * PT, 8 * PT, 557056, 606208, 600000, 589825):
+        for rows in range(0, 90, 7):
+            cases += [
+                (rows * m + d, m) for d in (-7, -1, 0, 1, 5, 6, 9, 11, 37)
+                if rows * m + d >= 0
+            ]
+    got = lua_int([f"ptceil({h}, {m})" for h, m in cases])
+    assert got == [_pgf_ceil_div(h, m) for h, m in cases]
+
+
+if __name__ == "__main__":
+    table = corpus()
+    lua = lua_int([expr for expr, *_ in table])
+    print(f"{'expression':46} {'pgfmath':>7} {'lua':>5} {'box_rows':>8}")
+    for (expr, pgf, _, py), got in zip(table, lua):
+        mark = "" if got == pgf else "  (differs from pgfmath)"
+        print(f"{expr:46} {pgf:7d} {got:5d} {'' if py is None else py:>8}{mark}")
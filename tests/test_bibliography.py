@@ -0,0 +1,110 @@
+"""lib/bibliography.py: the BibTeX parser and author formatting."""
+
+import pytest
+
+from lib.bibliography import (
+    BibParseError,
+    format_authors,
+    parse_bibtex,
+    parse_bibtex_name,
+    tex_to_text,
+)
+
+
+def test_entry_without_fields_does_not_swallow_the_next():
+    records = parse_bibtex(
+        "@misc{nokey}\n"
+        "@inproceedings{b2, title = {Second}, year = 2020}\n"
+    )
+    assert [(r["type"], r["key"]) for r in records] == [
+        ("misc", "nokey"), ("inproceedings", "b2"),
+    ]
+    assert records[0]["fields"] == {}
+    assert records[1]["fields"] == {"title": "Second", "year": "2020"}
+
+
+def test_entry_without_fields_in_parentheses():
+    records = parse_bibtex("@misc(nokey)\n@article(a1, title = \"T\")")
+    assert [r["key"] for r in records] == ["nokey", "a1"]
+
+
+def test_braced_and_quoted_values():
+    (rec,) = parse_bibtex(
+        '@article{k,\n'
+        '  title  = {The {RNA} World},\n'
+        '  journal = "Nature {"}Weekly{"}",\n'
+        '  note = {a \\} b},\n'
+        '  pages = 12,\n'
+        '}'
+    )
+    assert rec["fields"]["title"] == "The {RNA} World"
+    assert rec["fields"]["journal"] == 'Nature {"}Weekly{"}'
+    assert rec["fields"]["note"] == "a \\} b"
+    assert rec["fields"]["pages"] == "12"
+
+
+def test_string_macros_and_concatenation():
+    (rec,) = parse_bibtex(
+        '@string{acm = "ACM"}\n'
+        '@string(proc = acm # " Proceedings")\n'
+        '@inproceedings{k, booktitle = proc # { of X}, month = jan}'
+    )
+    assert rec["fields"]["booktitle"] == "ACM Proceedings of X"
+    assert rec["fields"]["month"] == "January"
+
+
+def test_comment_and_preamble_are_skipped():
+    records = parse_bibtex(
+        "@comment{ @article{hidden, title = {no}} }\n"
+        '@preamble{"\\newcommand{\\x}{y}"}\n'
+        "stray text @ not an entry\n"
+        "@book{b, title = {Yes}}"
+    )
+    assert [r["key"] for r in records] == ["b"]
+
+
+def test_unterminated_entry_raises():
+    with pytest.raises(BibParseError):
+        parse_bibtex("@article{k, title = {open")
+
+
+@pytest.mark.parametrize("text", [
+    '@string{foo = "bar"',
+    '@string(foo = "bar"',
+    '@preamble{"\\newcommand{\\x}{y}"',
+    "@article{k,}\n@preamble(\"x\"",
+])
+def test_unterminated_string_or_preamble_raises(text):
+    with pytest.raises(BibParseError, match="unterminated @"):
+        parse_bibtex(text)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Durst, Fred", ("Durst", "Fred")),
+    ("Fred Durst", ("Durst", "Fred")),
+    ("Ludwig van Beethoven", ("van Beethoven", "Ludwig")),
+    ("King, Jr, Martin Luther", ("King Jr", "Martin Luther")),
+    ("{World Health Organization}", ("World Health Organization", "")),
+    ("M{\\\"u}ller, J{\\\"o}rg", ("Müller", "Jörg")),
+])
+def test_parse_bibtex_name(raw, expected):
+    assert parse_bibtex_name(raw) == expected
+
+
+def test_format_authors_abbreviates_given_names():
+    names = [("Durst", "Fred"), ("Dupont", "Jean-Paul"), ("Scott", "W. Walter")]
+    assert format_authors(names, None) == "Durst, F., Dupont, J.-P., & Scott, W. W."
+    assert format_authors(names[:2], None) == "Durst, F. & Dupont, J.-P."
+    assert format_authors(names, 2) == "Durst, F., Dupont, J.-P., et al."
+    assert format_authors([("WHO", "")], None) == "WHO"
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('M{\\"u}ller', "Müller"),
+    ("{\\'\\i}", "í"),
+    ("\\o{}re", "øre"),
+    ("\\c{c}a", "ça"),
+    ("Caf\\'e \\& Bar", "Café & Bar"),
+])
+def test_tex_to_text(raw, expected):
+    assert tex_to_text(raw) == expected
@@ -0,0 +1,49 @@
+"""lib/breaker.py: optimal page breaking of one column (break_column)."""
+
+from lib.breaker import break_column
+
+GEOM = {"start_y": 7, "max_y": 85, "gap": 1, "pad_top": 1.2, "pad_bot": 1, "min_split": 3}
+
+
+def _item(rows: int, every: int = 0) -> dict:
+    """A section of *rows* lines, one row each, splittable every *every* lines."""
+    return {
+        "rows": rows,
+        "total_lines": rows,
+        "boundaries": list(range(every, rows, every)) if every else [],
+    }
+
+
+def test_splits_to_take_the_fewest_pages():
+    # Three 44-row boxes: two never share a 78-row page whole, so without
+    # splits this takes three pages.
+    pages = break_column([_item(40, 2), _item(40, 2), _item(40, 2)], GEOM)
+    assert len(pages) == 2
+    assert len(break_column([_item(40), _item(40), _item(40)], GEOM)) == 3
+    # Every line is placed once, in order
+    for j in range(3):
+        frags = [(a, b) for page in pages for i, a, b, _ in page if i == j]
+        assert frags[0][0] == 0 and frags[-1][1] == 40
+        assert all(b == a2 for (_, b), (a2, _) in zip(frags, frags[1:]))
+
+
+def test_never_produces_a_part_below_min_split():
+    geom = {**GEOM, "min_split": 12}
+    pages = break_column([_item(50), _item(60, 1), _item(45, 1)], geom)
+    for page in pages:
+        for j, start, end, rows in page:
+            if (start, end) != (0, [50, 60, 45][j]):
+                assert rows >= 12
+
+
+def test_box_taller_than_a_page_is_placed_alone_and_overflows():
+    pages = break_column([_item(10), _item(100), _item(10)], GEOM)
+    assert [[(j, rows) for j, _, _, rows in page] for page in pages] == [
+        [(0, 10)], [(1, 100)], [(2, 10)],
+    ]
+
+
+def test_first_y_can_leave_page_one_empty():
+    # 70 rows do not fit below row 60 and cannot split: start on page 2.
+    pages = break_column([_item(70)], GEOM, first_y=60)
+    assert pages == [[], [(0, 0, 70, 70)]]
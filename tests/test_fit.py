@@ -0,0 +1,57 @@
+"""fit.py: the height model (predict_heights) and the ranking."""
+
+import fit
+from lib import params
+from lib.config import compute_grid
+
+
+def _cand(font: float, widths: dict[str, float]) -> dict:
+    return {"font_size": font, "widths": widths}
+
+
+def test_same_setting_keeps_rows():
+    heights = {"generated/a.tex": 30}
+    widths = {"left": 57, "right": 40, "full": 100}
+    predicted = fit.predict_heights(
+        heights, {"generated/a.tex": "right"}, widths, 9, [_cand(9, widths)])
+    assert predicted == [{"generated/a.tex": 30}]
+
+
+def test_fixed_size_text_in_a_larger_grid_takes_fewer_rows():
+    # Same grid cols at twice the font: the box is twice as wide in mm
+    # (half the text height) and every row is twice as tall.
+    heights = {"generated/a.tex": 40}
+    widths = {"left": 57, "right": 40, "full": 100}
+    predicted = fit.predict_heights(
+        heights, {"generated/a.tex": "left"}, widths, 8, [_cand(16, widths)])
+    assert predicted == [{"generated/a.tex": 10}]
+
+
+def test_narrower_column_rewraps_to_more_rows():
+    heights = {"generated/a.tex": 20}
+    base = {"left": 57, "right": 40, "full": 100}
+    narrow = {**base, "right": 20}
+    predicted = fit.predict_heights(
+        heights, {"generated/a.tex": "right"}, base, 9, [_cand(9, narrow)])
+    assert predicted == [{"generated/a.tex": 40}]
+
+
+def test_overflowing_candidate_never_ranks_as_fitting(sandbox):
+    # One unsplittable box: at the larger font it is taller than a page and
+    # is placed alone, still "1 page" but running off it. Only the smaller
+    # font fits.
+    (sandbox / "generated" / "a.tex").write_text("line\n", encoding="utf-8")
+    grid = compute_grid(
+        {"paper_size": "a4", "margin": 12}, params.load_params("classic")
+    )
+    sections = [{"title": "A", "content": "a.tex", "column": "left"}]
+    small = {"font_size": 8, "skew": 0, "grid": grid}
+    large = {"font_size": 10, "skew": 0, "grid": grid}
+    for cand, rows in ((small, 60), (large, 90)):
+        cand["pages"], cand["fill"], cand["overflow"] = fit.evaluate(
+            sections, cand, {"generated/a.tex": rows}, "optimal")
+
+    assert small["overflow"] == 0
+    assert large["overflow"] > 0 and large["pages"] == 1
+    ranked = sorted([large, small], key=lambda c: fit.rank_key(c, 1))
+    assert ranked[0] is small
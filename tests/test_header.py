@@ -0,0 +1,42 @@
+"""header.py: the classic header always fits (plan_classic)."""
+
+import header
+
+CONTACT = {
+    "name": "Ada Byron Lovelace",
+    "title": "Analyst",
+    "email": "ada@example.com",
+    "phone": "+44 20 7946 0000",
+    "linkedin": "linkedin.com/in/ada",
+    "location": "London",
+}
+
+
+def test_fitting_header_is_drawn_as_given():
+    plan = header.plan_classic(CONTACT, 102, 3)
+    assert plan["shortened"] == []
+    tex = header.generate_classic_header_tex(CONTACT, 102, 3)
+    assert "\\def\\ClassicName#1{#1}" in tex
+    assert "\\def\\ClassicTitle#1{#1}" in tex
+
+
+def test_long_name_falls_back_to_initials():
+    plan = header.plan_classic(CONTACT, 22, 3)
+    assert plan["name"] == "A. B. Lovelace"
+
+
+def test_name_without_a_fitting_form_is_cut_short():
+    contact = {**CONTACT, "name": "Wolfeschlegelsteinhausenbergerdorff"}
+    plan = header.plan_classic(contact, 30, 3)
+    assert plan["name"] == "Wolfeschlegelsteinhause…"
+    assert len(plan["name"]) == 30 - 6
+
+
+def test_contact_items_are_cut_until_they_fit_two_rows():
+    contact = {**CONTACT, "email": "a-very-long-address@an-even-longer-domain.example.com"}
+    plan = header.plan_classic(contact, 40, 3)
+    assert plan["shortened"] == ["email"]
+    assert plan["contacts"][0].endswith("…")
+    # generate_classic_header_tex asserts every row is exactly 40 columns
+    tex = header.generate_classic_header_tex(contact, 40, 3)
+    assert plan["contacts"][0] in tex
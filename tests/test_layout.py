@@ -0,0 +1,94 @@
+"""layout.py: page packing across bands (plan_layout)."""
+
+import layout
+from lib import params
+from lib.config import compute_grid
+
+
+def _content(root, name: str, lines: int, every: int = 0) -> None:
+    """A content file of *lines* lines, splittable every *every* lines."""
+    text = [
+        "\\JobSep" if every and i and i % every == 0 else f"line {i}"
+        for i in range(lines)
+    ]
+    (root / "generated" / name).write_text("\n".join(text) + "\n", encoding="utf-8")
+
+
+def _pages(sections, heights, breaker):
+    grid = compute_grid(
+        {"paper_size": "a4", "margin": 12}, params.load_params("classic")
+    )
+    return layout.plan_layout(sections, grid, heights, breaker, dry_run=True)[1]
+
+
+def test_optimal_never_needs_more_pages_than_greedy(sandbox):
+    # Balancing the left column against the short right one used to split
+    # the 70-row box early, pushing the full-width band onto page 3.
+    spec = [
+        ("r1.tex", "right", 11, 0),
+        ("r2.tex", "right", 3, 0),
+        ("l1.tex", "left", 18, 0),
+        ("l2.tex", "left", 70, 6),
+        ("f1.tex", "full", 40, 0),
+    ]
+    sections, heights = [], {}
+    for name, column, rows, every in spec:
+        _content(sandbox, name, rows, every)
+        sections.append({"title": name.upper(), "content": name, "column": column})
+        heights[f"generated/{name}"] = rows
+
+    greedy = _pages(sections, heights, "greedy")
+    assert greedy == 2
+    assert _pages(sections, heights, "optimal") == greedy
+
+
+def test_optimal_does_not_take_an_overflowing_greedy_plan(sandbox):
+    # Greedy fits this in fewer pages only by running boxes off the page.
+    _content(sandbox, "a.tex", 60, 5)
+    _content(sandbox, "b.tex", 90, 5)
+    sections = [
+        {"title": "A", "content": "a.tex", "column": "left"},
+        {"title": "B", "content": "b.tex", "column": "left"},
+    ]
+    heights = {"generated/a.tex": 60, "generated/b.tex": 90}
+    grid = compute_grid(
+        {"paper_size": "a4", "margin": 12}, params.load_params("classic")
+    )
+    greedy = layout.plan_layout(sections, grid, heights, "greedy", dry_run=True)
+    optimal = layout.plan_layout(sections, grid, heights, "optimal", dry_run=True)
+    assert layout.overflow_rows(greedy[0], grid) > 0
+    assert layout.overflow_rows(optimal[0], grid) == 0
+    assert optimal[1] > greedy[1]
+
+
+def test_preview_takes_a_cached_measurement_for_the_new_column(sandbox, monkeypatch):
+    import measure
+
+    setup_paths = []
+    for name in ("preamble.tex", "settings.tex"):
+        (sandbox / name).write_text(name, encoding="utf-8")
+        setup_paths.append(sandbox / name)
+    for module in (layout, measure):
+        monkeypatch.setattr(module, "SETUP_PATHS", tuple(setup_paths))
+    monkeypatch.setattr(measure, "GENERATED_DIR", sandbox / "generated")
+    monkeypatch.setattr(measure, "HEIGHT_CACHE_DIR", sandbox / "heights")
+    monkeypatch.setattr(measure, "FONT_DIR", sandbox / "fonts")
+    monkeypatch.setattr(layout, "MEASURED_HEIGHTS_PATH", sandbox / "none.dat")
+    monkeypatch.setattr(layout, "BOXHEIGHTS_PATH", sandbox / "boxheights.dat")
+    monkeypatch.setattr(layout, "LAYOUT_PLAN_PATH", sandbox / "none.json")
+
+    _content(sandbox, "a.tex", 40)
+    (sandbox / "boxheights.dat").write_text("generated/a.tex=20\n", encoding="utf-8")
+    cache = sandbox / "heights"
+    cache.mkdir()
+    key = measure.section_key(measure.setup_digest(), "a.tex", "right")
+    (cache / key).write_text("33", encoding="utf-8")
+
+    grid = compute_grid(
+        {"paper_size": "a4", "margin": 12}, params.load_params("classic")
+    )
+    sections = [{"title": "A", "content": "a.tex", "column": "right"}]
+    heights, estimated = layout.preview_heights(
+        sections, grid, params.load_params("classic"))
+    assert heights == {"generated/a.tex": 33}
+    assert not estimated
@@ -0,0 +1,54 @@
+"""prune.py: the drop loop (drop_until_fits)."""
+
+import heapq
+
+import prune
+from lib.priority import Prunable
+
+
+def _heap(*specs):
+    """Items and their heap from (id, priority, siblings) in content order."""
+    items, heap = {}, []
+    for order, (pid, priority, siblings) in enumerate(specs):
+        items[pid] = Prunable(pid, "skills", priority, pid, (), siblings)
+        heapq.heappush(heap, (priority, -order, pid))
+    return items, heap
+
+
+def _run(target, items, heap, predictions, alive=None):
+    """drop_until_fits with predict() stepping through *predictions*."""
+    steps = iter(predictions)
+    weight = {pid: 1.0 for pid in items}
+    return prune.drop_until_fits(
+        target, heap, items, weight, alive or {},
+        lambda p, w: w, lambda: next(steps),
+    )
+
+
+def test_drops_lowest_priority_first_and_stops_once_it_fits():
+    # Lowest priority first; among equals the later item goes first.
+    items, heap = _heap(("a", 2, None), ("b", 1, None), ("c", 1, None), ("d", 3, None))
+    before, after, dropped = _run(1, items, heap, [(0, 3), (0, 2), (0, 1), (0, 1)])
+    assert [p.id for p, _ in dropped] == ["c", "b"]
+    assert before == (0, 3) and after == (0, 1)
+    assert len(heap) == 2
+
+
+def test_overflow_keeps_dropping_at_the_target_page_count():
+    items, heap = _heap(("a", 1, None), ("b", 2, None), ("c", 3, None))
+    _, after, dropped = _run(1, items, heap, [(5, 1), (2, 1), (0, 1)])
+    assert [p.id for p, _ in dropped] == ["a", "b"]
+    assert after == (0, 1)
+
+
+def test_keeps_the_last_item_of_a_list():
+    items, heap = _heap(("a", 1, "list"), ("b", 1, "list"), ("c", 2, None))
+    _, _, dropped = _run(1, items, heap, [(0, 2), (0, 2), (0, 1)], {"list": 2})
+    assert [p.id for p, _ in dropped] == ["b", "c"]
+
+
+def test_out_of_candidates_keeps_only_drops_that_helped():
+    items, heap = _heap(("a", 1, None), ("b", 2, None), ("c", 3, None))
+    _, after, dropped = _run(1, items, heap, [(0, 3), (0, 2), (0, 2), (0, 2)])
+    assert [p.id for p, _ in dropped] == ["a"]
+    assert after == (0, 2)